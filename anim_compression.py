@@ -0,0 +1,303 @@
+"""
+Deferred animation compression for bulk AnimSequence imports.
+
+Importing an animation compresses it right away with its bone compression settings, and the
+project default codec (a search over several codecs per track) is most of the import time of
+a large animation batch. In deferred mode animations are imported with the cheap recorder
+codec instead and queued, a separate CompressionPass then compresses them with their final
+settings: on editor ticks within a time budget per tick, or headless with
+batch_import.py --compress-pending.
+
+The FBX import has no option to skip compression, so the cheap codec is what new animations
+get from the AnimSequence class defaults while importing (DeferredCompression), and what an
+existing animation is switched to before it is reimported. Until the pass reaches them the
+animations play fine, with a larger memory footprint and some error on fine motion.
+
+The queue is kept in Saved/AssetImporter/anim_compression_queue.json, so whatever an
+interrupted pass didn't reach is compressed by the next one. Shard workers queue into a
+file of their own, merged into the project queue by shard_import.
+"""
+import os
+import json
+import time
+
+import unreal
+
+import ue_utils
+import import_trace
+
+IMMEDIATE = "immediate"  # compressed while importing, as before
+DEFERRED = "deferred"  # cheap codec while importing, compressed right after the batch
+QUEUED = "queued"  # cheap codec while importing, compressed by a later pass (editor ticks or headless)
+MODES = (IMMEDIATE, DEFERRED, QUEUED)
+
+# engine content: uniform keys, no codec search
+DEFERRED_BONE_COMPRESSION = "/Engine/Animation/DefaultRecorderBoneCompression.DefaultRecorderBoneCompression"
+DEFAULT_BONE_COMPRESSION = "/Engine/Animation/DefaultAnimBoneCompressionSettings.DefaultAnimBoneCompressionSettings"
+
+
+def _settings_path(settings):
+    return settings.get_path_name() if settings is not None else DEFAULT_BONE_COMPRESSION
+
+def _set_without_recompression(anim, settings):
+    # a plain property write, recompressing with the cheap codec right away would be wasted work
+    anim.set_editor_property("bone_compression_settings", settings, unreal.PropertyAccessChangeNotifyMode.NEVER)
+
+
+class CompressionQueue(object):
+    """
+    Animations waiting for compression, object path -> final bone compression settings.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.entries = dict()
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[anim compression] ignoring unreadable queue {self.path}: {e}")
+
+    def save(self):
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self.entries, f, indent=1)
+        os.replace(temp_path, self.path)
+        self.dirty = False
+
+    def add(self, object_paths, settings=DEFAULT_BONE_COMPRESSION):
+        for object_path in object_paths:
+            self.entries[str(object_path)] = settings
+            self.dirty = True
+
+    def remove(self, object_paths):
+        for object_path in object_paths:
+            if self.entries.pop(object_path, None) is not None:
+                self.dirty = True
+
+    def __len__(self):
+        return len(self.entries)
+
+
+_queues = globals().get("_queues", {})
+
+# set by shard_import for its workers
+COMPRESSION_QUEUE_VARIABLE = "ASSET_IMPORTER_COMPRESSION_QUEUE"
+
+def get_queue(path=None):
+    # queue of the current project, loaded once per process
+    if path is None:
+        path = os.environ.get(COMPRESSION_QUEUE_VARIABLE) or os.path.join(unreal.Paths.project_saved_dir(), "AssetImporter", "anim_compression_queue.json")
+    queue = _queues.get(path)
+    if queue is None:
+        queue = _queues[path] = CompressionQueue(path)
+    return queue
+
+
+class DeferredCompression(object):
+    """
+    Imports animations with the cheap codec while active: new animations through the
+    AnimSequence class defaults, existing ones through defer_existing() before their reimport.
+    The final settings of every animation are remembered for queue_imported().
+    """
+    def __init__(self, queue=None):
+        self.queue = queue if queue is not None else get_queue()
+        self.final = dict()  # object path -> final settings of reimported animations
+        self.default_final = DEFAULT_BONE_COMPRESSION
+        self._defaults = None
+        self._original = None
+        self._cheap = None
+
+    def begin(self):
+        # can be entered around every single import, so nothing else imported meanwhile gets the cheap codec
+        if self.active:
+            return self
+        if self._cheap is None:
+            self._cheap = unreal.load_object(None, DEFERRED_BONE_COMPRESSION)
+            if self._cheap is None:
+                unreal.log_warning(f"[anim compression] {DEFERRED_BONE_COMPRESSION} not found, compressing while importing")
+                return self
+        self._defaults = unreal.get_default_object(unreal.AnimSequence)
+        self._original = self._defaults.get_editor_property("bone_compression_settings")
+        self.default_final = _settings_path(self._original)
+        _set_without_recompression(self._defaults, self._cheap)
+        return self
+
+    def end(self):
+        # anything else creating animations gets the project codec again
+        if self._defaults is not None:
+            _set_without_recompression(self._defaults, self._original)
+            self._defaults = None
+
+    def __enter__(self):
+        return self.begin()
+
+    def __exit__(self, *exc_info):
+        self.end()
+        return False
+
+    @property
+    def active(self):
+        return self._defaults is not None
+
+    def defer_existing(self, object_path):
+        # an animation about to be reimported keeps its own settings, switched to the cheap codec meanwhile
+        if not self.active or not object_path:
+            return
+        anim = unreal.load_object(None, object_path)
+        if anim is None:
+            return
+        settings = _settings_path(anim.get_editor_property("bone_compression_settings"))
+        if object_path in self.queue.entries:
+            # still queued from an earlier deferred import
+            settings = self.queue.entries[object_path]
+        if settings != DEFERRED_BONE_COMPRESSION:
+            self.final[object_path] = settings
+            _set_without_recompression(anim, self._cheap)
+
+    def queue_imported(self, object_paths, root="/Game"):
+        """
+        Queues the AnimSequences among object_paths (registry metadata, nothing is loaded),
+        after the import, once they have their final names.
+        """
+        if self._cheap is None:
+            # nothing was deferred
+            return 0
+        content_index = ue_utils.get_content_index(root)
+        anims = [path for path in object_paths if content_index.get(path) and content_index.get(path).asset_class == "AnimSequence"]
+        for path in anims:
+            self.queue.add([path], self.final.get(path, self.default_final))
+        self.queue.save()
+        return len(anims)
+
+
+class CompressionPass(object):
+    """
+    Compresses the queued animations with their final settings, chunk_size at a time and
+    saved through a PackageSaver. start() runs on the editor tick, spending at most
+    tick_budget seconds per tick so the editor stays responsive, run_blocking() in one go.
+    """
+    def __init__(self, queue=None, chunk_size=4, tick_budget=0.05, save_every=50):
+        self.queue = queue if queue is not None else get_queue()
+        self.pending = list(self.queue.entries)
+        self.chunk_size = max(1, int(chunk_size))
+        self.tick_budget = tick_budget
+        # an animation leaves the queue once its compressed package is on disk
+        self.saver = ue_utils.PackageSaver(ue_utils.SAVE_EVERY_N, save_every, on_saved=self._on_saved)
+        self.cursor = 0
+        self.compressed = 0
+        self.failed = list()
+        self.cancelled = False
+        self.finished = False
+        self.start_time = None
+        self.end_time = None
+        self.progress_callbacks = list()  # callback(compression pass)
+        self.finished_callbacks = list()  # callback(compression pass)
+        self._tick_handle = None
+
+    @property
+    def total(self):
+        return len(self.pending)
+
+    @property
+    def done(self):
+        return self.cursor
+
+    def elapsed(self):
+        if self.start_time is None:
+            return 0.0
+        return (self.end_time or time.perf_counter()) - self.start_time
+
+    def start(self):
+        self.start_time = time.perf_counter()
+        if not self.total:
+            self._finish()
+            return
+        unreal.log(f"[anim compression] compressing {self.total} animation(s) on editor ticks")
+        self._tick_handle = unreal.register_slate_post_tick_callback(self._on_tick)
+
+    def run_blocking(self):
+        self.start_time = time.perf_counter()
+        while self.step():
+            pass
+        self._finish()
+        return self.report()
+
+    def cancel(self):
+        # what isn't compressed yet stays queued
+        self.cancelled = True
+
+    def step(self):
+        """
+        Compresses the next chunk. Returns False once there is nothing left to do.
+        """
+        if self.cancelled or self.cursor >= self.total:
+            return False
+        chunk = self.pending[self.cursor:self.cursor + self.chunk_size]
+        with import_trace.span(f"compress at {self.cursor}", "compression", assets=len(chunk)):
+            for object_path in chunk:
+                self.compress(object_path)
+        self.cursor += len(chunk)
+        for callback in self.progress_callbacks:
+            callback(self)
+        return self.cursor < self.total and not self.cancelled
+
+    def compress(self, object_path):
+        anim = unreal.load_object(None, object_path)
+        settings = unreal.load_object(None, self.queue.entries[object_path])
+        if anim is None or settings is None:
+            self.failed.append(object_path)
+            unreal.log_warning(f"[anim compression] skipping {object_path}, {'asset' if anim is None else 'compression settings'} not found")
+            self.queue.remove([object_path])
+            return
+        # setting the codec recompresses the animation
+        unreal.AnimationLibrary.set_bone_compression_settings(anim, settings)
+        self.compressed += 1
+        import_trace.count("anims_compressed")
+        self.saver.add([object_path])
+
+    def _on_saved(self, object_paths):
+        self.queue.remove(object_paths)
+        self.queue.save()
+
+    def _on_tick(self, delta_seconds):
+        if self.finished:
+            return
+        deadline = time.perf_counter() + self.tick_budget
+        try:
+            more = self.step()
+            while more and time.perf_counter() < deadline:
+                more = self.step()
+        except Exception as e:
+            unreal.log_error(f"[anim compression] pass failed: {e}")
+            self.cancelled = True
+            more = False
+        if not more:
+            self._finish()
+
+    def _finish(self):
+        if self._tick_handle is not None:
+            unreal.unregister_slate_post_tick_callback(self._tick_handle)
+            self._tick_handle = None
+        self.saver.flush()
+        self.queue.save()
+        self.end_time = time.perf_counter()
+        self.finished = True
+        if self.total:
+            state = "cancelled" if self.cancelled else "finished"
+            unreal.log(f"[anim compression] {state}: {self.compressed}/{self.total} animation(s) in {self.elapsed():.1f}s, "
+                       f"{len(self.queue)} still queued")
+        for callback in self.finished_callbacks:
+            callback(self)
+
+    def report(self):
+        return {"compressed": self.compressed, "failed": self.failed, "queued": len(self.queue), "seconds": round(self.elapsed(), 4),
+                "save": self.saver.report()}
@@ -1,27 +1,41 @@
 import os
 import sys
 import unreal
-from unreal import Paths, EditorAssetLibrary
-from importlib import reload
+from collections import Counter
+from unreal import Paths
 from functools import partial
 
 import ue_utils
+import fbx_preflight
+import import_cache
+import import_scheduler
+import import_trace
+import import_journal
+import source_stage
+import anim_compression
+import watch_folder
+import shard_import
 
 from PySide6.QtWidgets import (QWidget, QDialog, QApplication, QHBoxLayout, QVBoxLayout, 
                                QListWidget, QPushButton, QLabel, QSpacerItem, QSizePolicy, 
-                               QLineEdit, QFileDialog, QAbstractItemView, QMessageBox, QTableWidget,
-                               QTableWidgetItem, QHeaderView, QLineEdit)
-from PySide6.QtCore import Qt, QObject, QRunnable, QThreadPool, Signal, Slot
-from PySide6.QtGui import QDropEvent
+                               QLineEdit, QFileDialog, QAbstractItemView, QMessageBox, QTableView,
+                               QHeaderView, QLineEdit, QProgressBar, QComboBox, QStyledItemDelegate, QPlainTextEdit)
+from PySide6.QtCore import (Qt, QObject, QRunnable, QThreadPool, QTimer, Signal, Slot,
+                            QAbstractTableModel, QModelIndex, QSortFilterProxyModel)
+from PySide6.QtGui import QDropEvent, QFontDatabase
 
 class SelectSkeletonDialog(QDialog):
-    def __init__(self, all_skeletons):
+    def __init__(self, all_skeletons, anims=None):
         super().__init__()
         self.all_skeletons = all_skeletons
         self.selected_skeleton = None
         self.setWindowTitle("Choose Skeleton")
         self.setFixedWidth(600)
         self.label = QLabel("Skeletons needed to import anim. Please select any one of skeleton below:")
+        if anims:
+            # fallback for animations the skeleton matcher couldn't resolve
+            self.label.setText(f"No matching skeleton found for {len(anims)} animation(s). Please select any one of skeleton below:")
+            self.label.setToolTip("\n".join(os.path.basename(anim) for anim in anims))
         self.main_layout = QVBoxLayout()
         self.buttons_layout = QHBoxLayout()
         self.select_button = QPushButton("Select Skeleton")
@@ -49,67 +63,387 @@ class SelectSkeletonDialog(QDialog):
     def abort_selection(self):
         self.reject()
 
-class ExistingAssetsDialog(QDialog):
-    def __init__(self, assets):
+class ImportPlanModel(QAbstractTableModel):
+    """
+    Import plan entries (see ue_utils.plan_imports), one row per source. The action column
+    is editable, rows only offer the actions ue_utils.allowed_actions gives them.
+    """
+    HEADERS = ("Asset Name", "Action", "Destination")
+    ACTION_COLUMN = 1
+    ALLOWED_ACTIONS_ROLE = Qt.UserRole
+
+    def __init__(self, entries, parent=None):
+        super().__init__(parent)
+        self.entries = list(entries)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.entries)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        entry = self.entries[index.row()]
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return (entry["asset_name"], entry["action"], entry["destination"])[index.column()]
+        if role == Qt.ToolTipRole:
+            return entry["source"]
+        if role == self.ALLOWED_ACTIONS_ROLE:
+            return ue_utils.allowed_actions(entry)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.isValid() and index.column() == self.ACTION_COLUMN:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or index.column() != self.ACTION_COLUMN or role != Qt.EditRole:
+            return False
+        entry = self.entries[index.row()]
+        if value not in ue_utils.allowed_actions(entry):
+            return False
+        entry["action"] = value
+        self.dataChanged.emit(index, index)
+        return True
+
+    def set_actions(self, rows, action):
+        # bulk override, rows that don't allow the action keep theirs
+        changed = [row for row in rows if action in ue_utils.allowed_actions(self.entries[row])]
+        for row in changed:
+            self.entries[row]["action"] = action
+        if changed:
+            self.dataChanged.emit(self.index(min(changed), self.ACTION_COLUMN), self.index(max(changed), self.ACTION_COLUMN))
+        return len(changed)
+
+    def actions(self):
+        return {entry["source"]: entry["action"] for entry in self.entries}
+
+class ActionDelegate(QStyledItemDelegate):
+    """
+    Combo box editor for the action column, only created for the row being edited.
+    """
+    def createEditor(self, parent, option, index):
+        editor = QComboBox(parent)
+        editor.addItems(index.data(ImportPlanModel.ALLOWED_ACTIONS_ROLE))
+        editor.activated.connect(lambda: self.commitData.emit(editor))
+        return editor
+
+    def setEditorData(self, editor, index):
+        editor.setCurrentText(index.data(Qt.EditRole))
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.currentText(), Qt.EditRole)
+
+class ImportPlanView(QTableView):
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self.setModel(model)
+        self.setItemDelegateForColumn(ImportPlanModel.ACTION_COLUMN, ActionDelegate(self))
+        self.setEditTriggers(QAbstractItemView.EditTrigger.DoubleClicked | QAbstractItemView.EditTrigger.SelectedClicked)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.setWordWrap(False)
+        self.verticalHeader().setVisible(False)
+        # fixed sizes, content based sizing has to visit every row
+        self.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        header = self.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.Interactive)
+        header.resizeSection(0, 200)
+        header.setSectionResizeMode(1, QHeaderView.Interactive)
+        header.resizeSection(1, 90)
+        header.setSectionResizeMode(2, QHeaderView.Stretch)
+
+    def selected_rows(self):
+        return sorted(index.row() for index in self.selectionModel().selectedRows())
+
+class ImportPlanDialog(QDialog):
+    """
+    Lists what happens to every source, actions can be changed per row or for the selection.
+    """
+    def __init__(self, entries, title="Import Preview", description="The following assets will be imported:"):
         super().__init__()
-        self.result = None
-        self.assets = assets
-        self.setWindowTitle("Existing assets found.")
-        # self.setFixedWidth(300)
+        self.setWindowTitle(title)
+        self.setMinimumSize(700, 400)
+        self.model = ImportPlanModel(entries, self)
+        self.view = ImportPlanView(self.model)
         self.main_layout = QVBoxLayout()
-        self.list_layout = QVBoxLayout()
+        self.bulk_layout = QHBoxLayout()
         self.buttons_layout = QHBoxLayout()
-        self.description_text = QLabel("These assets are already imported.\nPlease choose operation.")
-        self.reimport_button = QPushButton("Re-import")
-        self.import_button = QPushButton("Import")
+        self.description_text = QLabel(description)
+        self.summary_label = QLabel()
+        self.action_combo_box = QComboBox()
+        self.action_combo_box.addItems([ue_utils.NEW, ue_utils.REIMPORT, ue_utils.SKIP, ue_utils.CACHE_HIT])
+        self.apply_button = QPushButton("Set selected")
+        self.apply_button.setToolTip("Set the action of the selected rows, or of all rows if none is selected")
+        self.ok_button = QPushButton("OK")
         self.cancel_button = QPushButton("Cancel")
-        
-        for asset in self.assets:
-            asset_name = os.path.basename(asset).strip('.fbx')
-            label = QLabel(f" - {asset_name}")
-            self.list_layout.addWidget(label)
-        
-        self.buttons_layout.addWidget(self.reimport_button)
-        self.buttons_layout.addWidget(self.import_button)
+
+        self.bulk_layout.addWidget(self.summary_label)
+        self.bulk_layout.addSpacerItem(QSpacerItem(1, 1, QSizePolicy.Expanding, QSizePolicy.Minimum))
+        self.bulk_layout.addWidget(self.action_combo_box)
+        self.bulk_layout.addWidget(self.apply_button)
+        self.buttons_layout.addWidget(self.ok_button)
         self.buttons_layout.addWidget(self.cancel_button)
 
         self.main_layout.addWidget(self.description_text)
-        self.main_layout.addLayout(self.list_layout)
+        self.main_layout.addWidget(self.view)
+        self.main_layout.addLayout(self.bulk_layout)
         self.main_layout.addLayout(self.buttons_layout)
         self.setLayout(self.main_layout)
 
-        self.reimport_button.clicked.connect(self.do_reimport)
-        self.import_button.clicked.connect(self.do_import)
-        self.cancel_button.clicked.connect(self.do_abort)
+        self.apply_button.clicked.connect(self.apply_action)
+        self.ok_button.clicked.connect(self.accept)
+        self.cancel_button.clicked.connect(self.reject)
+        self.model.dataChanged.connect(self.update_summary)
+        self.update_summary()
 
-        # self.exec()
+    def apply_action(self):
+        rows = self.view.selected_rows() or range(self.model.rowCount())
+        self.model.set_actions(rows, self.action_combo_box.currentText())
 
-    def do_import(self):
-        self.result = "import"
-        self.accept()
-    
-    def do_reimport(self):
-        self.result = "replace"
-        self.accept()
+    def update_summary(self, *args):
+        counts = Counter(self.model.actions().values())
+        self.summary_label.setText(", ".join(f"{count:,} {action}" for action, count in sorted(counts.items())) or "Nothing to import")
 
-    def do_abort(self):
-        # self.result = "abort"
-        self.reject()
+    def actions(self):
+        return self.model.actions()
+
+class ExistingAssetsDialog(ImportPlanDialog):
+    def __init__(self, entries):
+        super().__init__(entries, title="Existing assets found.",
+                         description="These assets are already imported.\nPlease choose operation per asset.")
+        self.ok_button.setText("Continue")
+
+class ImportSignals(QObject):
+    progress = Signal(int, int, float, float, str)  # done, total, assets per second, eta in seconds, current asset
+    finished = Signal(bool)  # cancelled
+
+class ImportProgressDialog(QDialog):
+    def __init__(self, scheduler, title="Importing assets"):
+        super().__init__()
+        self.scheduler = scheduler
+        self.signals = ImportSignals()
+        self.setWindowTitle(title)
+        self.setFixedWidth(500)
+        self.main_layout = QVBoxLayout()
+        self.current_label = QLabel("Starting import...")
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, max(1, scheduler.total))
+        self.stats_label = QLabel()
+        self.cancel_button = QPushButton("Cancel")
+
+        self.main_layout.addWidget(self.current_label)
+        self.main_layout.addWidget(self.progress_bar)
+        self.main_layout.addWidget(self.stats_label)
+        self.main_layout.addWidget(self.cancel_button)
+        self.setLayout(self.main_layout)
+
+        self.cancel_button.clicked.connect(self.do_cancel)
+        self.signals.progress.connect(self.update_progress)
+        self.signals.finished.connect(self.accept)
+        scheduler.progress_callbacks.append(self.emit_progress)
+        scheduler.finished_callbacks.append(self.emit_finished)
 
-class AssetListWidget(QTableWidget):
+    def emit_progress(self, scheduler, current_files):
+        current = ", ".join(os.path.basename(f) for f in current_files)
+        self.signals.progress.emit(scheduler.done, scheduler.total, scheduler.throughput(), scheduler.eta(), current)
+        # chunks run inside the editor tick, give Qt a chance to repaint between them
+        QApplication.processEvents()
+
+    def emit_finished(self, scheduler):
+        self.signals.finished.emit(scheduler.cancelled)
+
+    @Slot(int, int, float, float, str)
+    def update_progress(self, done, total, throughput, eta, current):
+        self.progress_bar.setValue(done)
+        self.current_label.setText(f"Imported: {current}")
+        self.stats_label.setText(f"{done}/{total} assets - {throughput:.2f} assets/s - ETA {eta:.0f}s")
+
+    def do_cancel(self):
+        self.cancel_button.setEnabled(False)
+        self.current_label.setText("Cancelling after current chunk...")
+        self.scheduler.cancel()
+
+class AssetListModel(QAbstractTableModel):
+    """
+    Listed source files, stored as plain columns. Rows are only materialized by the view
+    for what is on screen, the path index makes dedupe O(1).
+    """
+    HEADERS = ("Asset Name", "Source Path")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.names = list()
+        self.paths = list()
+        self.path_index = set()
+
+    @staticmethod
+    def path_key(path):
+        return os.path.normcase(os.path.normpath(path))
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.paths)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            column = self.names if index.column() == 0 else self.paths
+            return column[index.row()]
+        if role == Qt.ToolTipRole:
+            return self.paths[index.row()]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def add_paths(self, paths):
+        new_paths = list()
+        for path in paths:
+            key = self.path_key(path)
+            if key not in self.path_index:
+                self.path_index.add(key)
+                new_paths.append(path)
+        if new_paths:
+            first = len(self.paths)
+            self.beginInsertRows(QModelIndex(), first, first + len(new_paths) - 1)
+            self.paths.extend(new_paths)
+            self.names.extend(ue_utils.source_asset_name(path) for path in new_paths)
+            self.endInsertRows()
+        return len(new_paths)
+
+    def remove_rows(self, rows):
+        # remove contiguous ranges from the bottom up so row numbers stay valid
+        rows = sorted(set(rows), reverse=True)
+        i = 0
+        while i < len(rows):
+            last = first = rows[i]
+            i += 1
+            while i < len(rows) and rows[i] == first - 1:
+                first = rows[i]
+                i += 1
+            self.beginRemoveRows(QModelIndex(), first, last)
+            for path in self.paths[first:last + 1]:
+                self.path_index.discard(self.path_key(path))
+            del self.paths[first:last + 1]
+            del self.names[first:last + 1]
+            self.endRemoveRows()
+
+class DirectoryScanSignals(QObject):
+    found = Signal(list)  # batch of source paths
+    finished = Signal(int)  # number of files found
+
+class DirectoryScanner(QRunnable):
+    """
+    Walks dropped folders on a pool thread and reports source files in batches.
+    """
+    def __init__(self, folders, extensions=(".fbx", ".obj"), batch_size=500):
+        super().__init__()
+        self.folders = list(folders)
+        self.extensions = extensions
+        self.batch_size = batch_size
+        self.cancelled = False
+        self.signals = DirectoryScanSignals()
+
+    def cancel(self):
+        self.cancelled = True
+
+    @Slot()
+    def run(self):
+        batch = list()
+        found = 0
+        stack = list(self.folders)
+        try:
+            while stack and not self.cancelled:
+                folder = stack.pop()
+                try:
+                    entries = sorted(os.scandir(folder), key=lambda entry: entry.name)
+                except OSError:
+                    continue
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        # unreadable entry, e.g. a broken network share or a permission error
+                        continue
+                    if is_dir:
+                        stack.append(entry.path)
+                    elif entry.name.lower().endswith(self.extensions):
+                        batch.append(entry.path.replace("\\", "/"))
+                        if len(batch) >= self.batch_size:
+                            found += len(batch)
+                            self.signals.found.emit(batch)
+                            batch = list()
+            if batch and not self.cancelled:
+                found += len(batch)
+                self.signals.found.emit(batch)
+        except Exception as e:
+            print(f"[scan] failed: {e}")
+        # also releases the scanner after a failed walk
+        self.signals.finished.emit(found)
+
+class ShardImportSignals(QObject):
+    finished = Signal(object)  # merged report, None if the coordinator failed
+
+class ShardImportRunner(QRunnable):
+    """
+    Runs a shard_import.ShardCoordinator on a pool thread, the workers are separate editor
+    processes so the editor stays responsive while they import.
+    """
+    def __init__(self, coordinator):
+        super().__init__()
+        self.coordinator = coordinator
+        self.signals = ShardImportSignals()
+
+    @Slot()
+    def run(self):
+        report = None
+        try:
+            report = self.coordinator.run()
+        except Exception as e:
+            print(f"[shard import] failed: {e}")
+        self.signals.finished.emit(report)
+
+class AssetListWidget(QTableView):
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.source_model = AssetListModel(self)
+        self.proxy_model = QSortFilterProxyModel(self)
+        self.proxy_model.setSourceModel(self.source_model)
+        self.proxy_model.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self.proxy_model.setFilterKeyColumn(-1)
+        self.setModel(self.proxy_model)
+        self.scanners = list()
+
         self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self.setAcceptDrops(True)
         self.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
-        self.setColumnCount(2)
-        self.setHorizontalHeaderLabels(["Asset Name", "Source Path"])
+        self.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.setSortingEnabled(True)
+        self.sortByColumn(-1, Qt.AscendingOrder)  # keep drop order until a header is clicked
+        self.setWordWrap(False)
         self.verticalHeader().setVisible(False)
+        # fixed sizes, content based sizing has to visit every row
+        self.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
         header = self.horizontalHeader()
-        header.setSectionResizeMode(0, QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(0, QHeaderView.Interactive)
+        header.resizeSection(0, 180)
         header.setSectionResizeMode(1, QHeaderView.Stretch)
-        self.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
-    
+
     def dragEnterEvent(self, event):
         if event.mimeData().hasUrls():
             event.acceptProposedAction()
@@ -124,29 +458,57 @@ class AssetListWidget(QTableWidget):
 
     def dropEvent(self, event: QDropEvent):
         if event.mimeData().hasUrls():
+            files, folders = list(), list()
             for url in event.mimeData().urls():
                 file_path = url.toLocalFile()
                 if file_path:
-                    self.addItem(file_path)
+                    (folders if os.path.isdir(file_path) else files).append(file_path)
+            self.add_paths(files)
+            if folders:
+                self.scan_folders(folders)
             event.acceptProposedAction()
         else:
             event.ignore()
 
     def keyPressEvent(self, event):
         if event.key() == Qt.Key_Delete:
-            selected_rows = set()
-            for item in self.selectedItems():
-                selected_rows.add(item.row())
-            
-            for row in sorted(selected_rows, reverse=True):
-                self.removeRow(row)
-    
+            self.remove_selected()
+        else:
+            super().keyPressEvent(event)
+
+    def scan_folders(self, folders):
+        scanner = DirectoryScanner(folders)
+        scanner.setAutoDelete(False)
+        scanner.signals.found.connect(self.add_paths)
+        scanner.signals.finished.connect(partial(self.scan_finished, scanner))
+        self.scanners.append(scanner)
+        QThreadPool.globalInstance().start(scanner)
+
+    def scan_finished(self, scanner, found):
+        print(f"Found {found} file(s) in {', '.join(scanner.folders)}")
+        if scanner in self.scanners:
+            self.scanners.remove(scanner)
+
+    def cancel_scans(self):
+        for scanner in self.scanners:
+            scanner.cancel()
+
+    @Slot(list)
+    def add_paths(self, file_paths):
+        return self.source_model.add_paths(file_paths)
+
     def addItem(self, file_path):
-        asset_name = os.path.basename(file_path).strip('.fbx')
-        row = self.rowCount()
-        self.insertRow(row)
-        self.setItem(row, 0, QTableWidgetItem(asset_name))
-        self.setItem(row, 1, QTableWidgetItem(file_path))
+        self.add_paths([file_path])
+
+    def remove_selected(self):
+        rows = [self.proxy_model.mapToSource(index).row() for index in self.selectionModel().selectedRows()]
+        self.source_model.remove_rows(rows)
+
+    def set_filter(self, text):
+        self.proxy_model.setFilterFixedString(text)
+
+    def all_paths(self):
+        return list(self.source_model.paths)
 
 class UEAssetImporter(QWidget):
     def __init__(self):
@@ -155,6 +517,37 @@ class UEAssetImporter(QWidget):
         self.CONTENT_ROOT = Paths.project_content_dir()
         self.GAME_ROOT = "/Game"
         self.destination_path = self.GAME_ROOT  # default path /Game/Content
+        self.imported_assets = list()  # object paths produced by the current import
+        self.import_mode = "background"  # "background": chunked on editor tick, "blocking": single import call, "sharded": headless editor workers
+        self.shard_workers = max(1, (os.cpu_count() or 2) // 4)  # editor processes of a sharded import
+        self.shard_runner = None
+        self.scheduler = None  # import running on the editor tick, one at a time
+        self.import_chunk_size = 4
+        self.save_policy = ue_utils.SAVE_DEFERRED  # see ue_utils.SAVE_POLICIES
+        self.save_every = 50  # assets per bulk save with ue_utils.SAVE_EVERY_N
+        self.package_saver = None
+        self.trace_heap = True  # python heap deltas in the import trace, tracemalloc slows imports down a bit
+        self.trace_folder = os.path.join(Paths.project_saved_dir(), "AssetImporter", "traces")
+        self.import_cancelled = False
+        self.progress_dialog = None
+        self.preflight = dict()  # source path -> fbx_preflight info
+        self.sources_by_kind = dict()  # fbx_preflight kind -> source paths
+        self.cache_keys = dict()  # source path -> import_cache options key
+        self.cache_hits = list()  # unchanged sources skipped by the current import
+        self.plan = dict()  # source path -> ue_utils.plan_imports entry, actions as confirmed by the user
+        self.skeleton_validations = list()  # validate_skeleton results of the current import
+        self.journal = None  # import_journal.ImportJournal of the current import, or of the batch being resumed
+        self.stage_sources = "auto"  # copy sources to a local cache ahead of the import: "auto" (network shares only), "always", "never"
+        self.stage_cache_gb = 20
+        self.stage_ahead = 8  # files copied ahead of the import
+        self.memory_ceiling_gb = 0  # imported assets are saved and unloaded in chunks to stay under it, 0 for no limit
+        self.memory_budget = None
+        # "deferred": cheap codec while importing, final compression on editor ticks afterwards,
+        # "queued": cheap codec while importing, compressed later with batch_import.py --compress-pending
+        self.anim_compression = anim_compression.IMMEDIATE
+        self.deferred_compression = None  # anim_compression.DeferredCompression of the current import
+        self.compression_pass = None
+        self.anim_nodes = list()  # (import node, post-process node) of the animations of the current import
         self.init_ui()
         self.callbacks()
     
@@ -168,6 +561,22 @@ class UEAssetImporter(QWidget):
         self.asset_list_widget = AssetListWidget()
         self.add_assets_button = QPushButton("[+]Add asset")
         self.remove_assets_button = QPushButton("[-]Remove asset")
+        self.filter_line_edit = QLineEdit()
+        self.filter_line_edit.setPlaceholderText("Filter")
+        self.filter_line_edit.setClearButtonEnabled(True)
+        self.asset_count_label = QLabel("0 assets")
+        self.trace_summary_button = QPushButton("Stats")
+        self.trace_summary_button.setCheckable(True)
+        self.trace_summary_button.setToolTip("Timings of the last import")
+        self.watch_button = QPushButton("Watch")
+        self.watch_button.setCheckable(True)
+        self.watch_button.setChecked(watch_folder.service() is not None)
+        self.watch_button.setToolTip("Import new or changed FBX files from the watch folders automatically")
+        self.trace_summary_text = QPlainTextEdit()
+        self.trace_summary_text.setReadOnly(True)
+        self.trace_summary_text.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.trace_summary_text.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        self.trace_summary_text.setVisible(False)
         self.destination_path_label = QLabel("Import to: ")
         self.destination_path_line_edit = QLineEdit()
         self.destination_path_line_edit.setClearButtonEnabled(True)
@@ -175,22 +584,30 @@ class UEAssetImporter(QWidget):
         self.destination_path_browse_button.setFixedWidth(40)
         self.destination_path_browse_button.setToolTip("Browse import path")
         self.import_button = QPushButton("Import")
+        self.resume_button = QPushButton("Resume")
+        self.resume_button.setToolTip("Import what the last batch didn't finish")
         self.close_button = QPushButton("Exit")
 
         spacer = QSpacerItem(1, 1, QSizePolicy.Expanding, QSizePolicy.Minimum)
         self.browse_layout.addWidget(self.add_assets_button)
         self.browse_layout.addWidget(self.remove_assets_button)
         self.browse_layout.addSpacerItem(spacer)
+        self.browse_layout.addWidget(self.filter_line_edit)
+        self.browse_layout.addWidget(self.asset_count_label)
+        self.browse_layout.addWidget(self.trace_summary_button)
+        self.browse_layout.addWidget(self.watch_button)
         
         self.buttons_layout.addWidget(self.destination_path_label)
         self.buttons_layout.addWidget(self.destination_path_line_edit)
         self.buttons_layout.addWidget(self.destination_path_browse_button)
         self.buttons_layout.addSpacerItem(QSpacerItem(20, 40, QSizePolicy.Fixed, QSizePolicy.Fixed))
         self.buttons_layout.addWidget(self.close_button)
+        self.buttons_layout.addWidget(self.resume_button)
         self.buttons_layout.addWidget(self.import_button)
         
         self.main_layout.addLayout(self.browse_layout)
         self.main_layout.addWidget(self.asset_list_widget)
+        self.main_layout.addWidget(self.trace_summary_text)
         self.main_layout.addLayout(self.buttons_layout)
 
         self.setLayout(self.main_layout)
@@ -200,23 +617,52 @@ class UEAssetImporter(QWidget):
         self.destination_path_browse_button.clicked.connect(partial(self.open_file_browser, path=self.CONTENT_ROOT, type="dir"))
         self.remove_assets_button.clicked.connect(self.remove_assets)
         self.import_button.clicked.connect(self.do_imports)
+        self.resume_button.clicked.connect(self.resume_last_batch)
         self.close_button.clicked.connect(self.close)        
+        self.filter_line_edit.textChanged.connect(self.asset_list_widget.set_filter)
+        self.trace_summary_button.toggled.connect(self.show_trace_summary)
+        self.watch_button.toggled.connect(self.toggle_watch_folders)
+        for signal in (self.asset_list_widget.source_model.rowsInserted, self.asset_list_widget.source_model.rowsRemoved):
+            signal.connect(self.update_asset_count)
+
+    def update_asset_count(self, *args):
+        self.asset_count_label.setText(f"{self.asset_list_widget.source_model.rowCount():,} assets")
+
+    def show_trace_summary(self, show):
+        # the summary panel takes the place of the asset list
+        if show:
+            path = import_trace.latest_trace(self.trace_folder)
+            if path is None:
+                self.trace_summary_text.setPlainText("No import traced yet.")
+            else:
+                self.trace_summary_text.setPlainText(f"{import_trace.format_summary(import_trace.load_summary(path))}\n\n{path}")
+        self.trace_summary_text.setVisible(show)
+        self.asset_list_widget.setVisible(not show)
+
+    def toggle_watch_folders(self, enabled):
+        if not enabled:
+            watch_folder.stop()
+            return
+        config = watch_folder.load_config()
+        if not config["folders"]:
+            # first use, watch one folder into the current destination
+            folder = QFileDialog.getExistingDirectory(self, "Select Watch Folder", self.PROJECT_ROOT, options=QFileDialog.Option.ShowDirsOnly)
+            if not folder:
+                self.watch_button.setChecked(False)
+                return
+            config["folders"] = [{"path": folder, "destination": self.destination_path}]
+            watch_folder.save_config(config)
+        watch_folder.start(config)
+        self.watch_button.setToolTip("\n".join(f"{folder['path']} -> {folder['destination']}" for folder in config["folders"]))
 
     def get_all_listed_assets(self):
-        all_assets = list()
-        for i in range(self.asset_list_widget.rowCount()):
-            item = self.asset_list_widget.item(i, 1)
-            all_assets.append(item.text())
-        return all_assets
+        return self.asset_list_widget.all_paths()
 
     def open_file_browser(self, path=None, type=None):
-        current_items = self.get_all_listed_assets()
-        print(current_items)
         if type == "file":
             file_paths = QFileDialog.getOpenFileNames(self, "Select Asset Files", path, "3D assets (*.obj, *.fbx)")[0]
-            for path in file_paths:
-                if path not in current_items:
-                    self.asset_list_widget.addItem(path)
+            # duplicates are dropped by the list model
+            self.asset_list_widget.add_paths(file_paths)
         elif type == "dir":
             selected_dir = QFileDialog.getExistingDirectory(self, "Select Destination Folder", path, options=QFileDialog.Option.ShowDirsOnly)
             if selected_dir:
@@ -228,14 +674,142 @@ class UEAssetImporter(QWidget):
 
     def remove_assets(self):
         print("removing assets")
-        selected_rows = set()
-        for item in self.asset_list_widget.selectedItems():
-            selected_rows.add(item.row())
-        
-        for row in sorted(selected_rows, reverse=True):
-            self.asset_list_widget.removeRow(row)
+        self.asset_list_widget.remove_selected()
+
+    def run_preflight(self):
+        """
+        Inspects the listed FBX files in parallel before anything is imported and sorts them
+        by content. Returns False if the user aborts because of rejected files.
+        """
+        listed_assets = self.get_all_listed_assets()
+        fbx_files = [a for a in listed_assets if a.lower().endswith('.fbx')]
+        with import_trace.span("preflight_files", "preflight", files=len(fbx_files)):
+            self.preflight = fbx_preflight.preflight_files(fbx_files)
+        import_trace.count("fbx_inspected", len(self.preflight))
+        self.sources_by_kind = dict()
+        rejected = list()
+        for asset in listed_assets:
+            info = self.preflight.get(asset)
+            kind = info['kind'] if info else fbx_preflight.UNKNOWN
+            if kind in (fbx_preflight.SKELETAL_MESH, fbx_preflight.ANIMATION):
+                self.sources_by_kind.setdefault(kind, list()).append(asset)
+                continue
+            if info is None:
+                reasons = ["not an FBX file"]
+            else:
+                reasons = fbx_preflight.problems(info, fbx_preflight.name_hint(asset) or kind) or [f"unsupported asset type ({kind})"]
+            rejected.append(f"{os.path.basename(asset)}: {', '.join(reasons)}")
+
+        if rejected:
+            unreal.log_warning(f"Preflight rejected {len(rejected)} file(s)")
+            message = QMessageBox(self)
+            message.setWindowTitle("Preflight")
+            message.setIcon(QMessageBox.Warning)
+            message.setText(f"{len(rejected)} file(s) can't be imported and will be skipped.")
+            message.setDetailedText("\n".join(rejected))
+            if self.sources_by_kind:
+                message.setStandardButtons(QMessageBox.Ok | QMessageBox.Abort)
+            else:
+                message.setStandardButtons(QMessageBox.Abort)
+            if message.exec() != QMessageBox.Ok:
+                return False
+        return True
+
+    def run_scheduler(self, scheduler, on_finished=None):
+        """
+        Runs an import scheduler with the current import mode and calls on_finished(scheduler)
+        once it is done.
+        """
+        def scheduler_done(scheduler):
+            try:
+                self.imported_assets.extend(scheduler.produced)
+                self.import_cancelled = self.import_cancelled or scheduler.cancelled
+                if on_finished:
+                    on_finished(scheduler)
+            finally:
+                self.scheduler = None
+                self.import_button.setEnabled(True)
+                self.resume_button.setEnabled(True)
+
+        self.scheduler = scheduler
+        self.import_button.setEnabled(False)
+        self.resume_button.setEnabled(False)
+
+        if self.import_mode == "blocking" or not scheduler.total:
+            scheduler.run_blocking()
+            scheduler_done(scheduler)
+            return
+        self.progress_dialog = ImportProgressDialog(scheduler)
+        self.progress_dialog.show()
+        # continue outside of the editor tick so follow up dialogs don't block it
+        scheduler.finished_callbacks.append(lambda s: QTimer.singleShot(0, partial(scheduler_done, s)))
+        scheduler.start()
+
+    def build_plan(self):
+        """
+        Plans every preflighted source. Animations are matched to the skeletons that exist now,
+        the ones waiting for a skeleton from this batch are planned by existence only.
+        """
+        skm_list = self.sources_by_kind.get(fbx_preflight.SKELETAL_MESH, list())
+        anim_list = self.sources_by_kind.get(fbx_preflight.ANIMATION, list())
+        self.plan = ue_utils.plan_imports(skm_list, fbx_preflight.SKELETAL_MESH, self.destination_path, self.preflight, root=self.GAME_ROOT)
+        if anim_list:
+            anim_skeletons, _ = ue_utils.match_skeletons({anim: self.preflight.get(anim) for anim in anim_list}, self.GAME_ROOT)
+            self.plan.update(ue_utils.plan_imports(anim_list, fbx_preflight.ANIMATION, self.destination_path, self.preflight, anim_skeletons, root=self.GAME_ROOT))
+        if self.journal is not None:
+            # resumed sources may have been recorded in the import manifest but never saved
+            for entry in self.plan.values():
+                if entry["action"] == ue_utils.CACHE_HIT:
+                    entry["action"] = ue_utils.REIMPORT
+
+    def resolve_plan(self, sources, kind, skeletons=None):
+        """
+        Plan entries for sources. Sources the preview didn't cover are planned now, existing
+        ones are confirmed per asset in ExistingAssetsDialog. Returns None if the user aborts.
+        """
+        unplanned = [source for source in sources if source not in self.plan]
+        if unplanned:
+            plan = ue_utils.plan_imports(unplanned, kind, self.destination_path, self.preflight, skeletons, root=self.GAME_ROOT)
+            existing = [entry for entry in plan.values() if entry["existing"] and entry["action"] != ue_utils.CACHE_HIT]
+            if existing:
+                unreal.log("Existing assets found")
+                dialog = ExistingAssetsDialog(existing)
+                if dialog.exec() != QDialog.Accepted:
+                    return None
+                for source, action in dialog.actions().items():
+                    plan[source]["action"] = action
+            self.plan.update(plan)
+        return [self.plan[source] for source in sources]
+
+    def planned_imports(self, entries):
+        """
+        Entries whose action imports something, logs the skipped ones.
+        """
+        to_import = list()
+        for entry in entries:
+            if entry["action"] == ue_utils.CACHE_HIT:
+                print(f"[cache hit] {entry['source']} unchanged since last import. Skipping")
+                self.cache_hits.append(entry["source"])
+            elif entry["action"] == ue_utils.SKIP:
+                print(f"[skip] {entry['source']}")
+            else:
+                to_import.append(entry)
+        return to_import
+
+    @staticmethod
+    def task_mode(entry):
+        return 'replace' if entry["action"] == ue_utils.REIMPORT else 'import'
+
+    def record_imports(self, tasks):
+        sources = [source_stage.original(task.filename) for task in tasks]
+        file_hashes = {source: self.preflight[source]['hash'] for source in sources if source in self.preflight}
+        ue_utils.record_imports(tasks, self.cache_keys, file_hashes)
 
-    def do_validate_skm(self):
+    def do_validate_skm(self, results=None):
+        """
+        results: validate_skeleton results to report, validates the skeletons of
+        imported_assets if not given
+        """
         unreal.log("Validating Skeletons")
 
         dialog = QDialog()
@@ -246,21 +820,29 @@ class UEAssetImporter(QWidget):
         main_layout = QVBoxLayout()
         ok_btn = QPushButton("OK")
         
-        # load skeleton objects
-        all_skeleton = [sk for sk in ue_utils.get_all_assets(self.GAME_ROOT) if 'Skeleton' in sk]
-        result = ue_utils.validate_skeleton(all_skeleton)
-        if result:
-            if isinstance(result, str):
-                result_label.setText(result)
+        if results is None:
+            # only skeletons created by this import are loaded, the others come from the fingerprint cache
+            content_index = ue_utils.get_content_index(self.GAME_ROOT)
+            new_skeletons = [path for path in self.imported_assets if content_index.get(path) and content_index.get(path).asset_class == 'Skeleton']
+            results = [ue_utils.validate_skeleton(new_skeletons, self.GAME_ROOT)]
+        # one report for the skeletons validated character by character
+        msg, skel_groups = "All skeletons are A-OK!", dict()
+        for result in results:
             if isinstance(result, tuple):
-                result_str = ""
-                msg, skel_groups = result
-                for index, (bone_count, skel_names) in enumerate(skel_groups.items(), start=1):
-                    skel_names = "\n".join([f"  - {name.split('.')[0]}" for name in skel_names])
-                    if index > 1:
-                        result_str += "\n" * 2                    
-                    result_str += f"""[Skeleton with bone count: {bone_count}]\n{skel_names}"""
-                result_label.setText(result_str)
+                msg = result[0]
+                for hierarchy, skel_names in result[1].items():
+                    group = skel_groups.setdefault(hierarchy, list())
+                    group.extend(name for name in skel_names if name not in group)
+        if not skel_groups:
+            result_label.setText(msg)
+        else:
+            result_str = f"{msg}\n\n"
+            for index, (hierarchy, skel_names) in enumerate(skel_groups.items(), start=1):
+                skel_names = "\n".join([f"  - {name.split('.')[0]}" for name in skel_names])
+                if index > 1:
+                    result_str += "\n" * 2                    
+                result_str += f"""[Skeleton with {hierarchy}]\n{skel_names}"""
+            result_label.setText(result_str)
 
         main_layout.addWidget(result_label)
         main_layout.addWidget(ok_btn)
@@ -269,150 +851,394 @@ class UEAssetImporter(QWidget):
         ok_btn.clicked.connect(dialog.accept)
         dialog.exec()
 
-    def do_import_skm(self):
-        print("\nStarting Skeleton Import Process")
-        tasks = list()
-        existing_assets = list()
-        cb_assets = [os.path.basename(asset).split('.')[-1] for asset in ue_utils.get_all_assets(self.GAME_ROOT) if 'SKM_' in asset and 'Skeleton' not in asset and 'Physic' not in asset]
-        # import skm assets process
-        skm_list = [skm for skm in self.get_all_listed_assets() if 'SKM_' in skm]
-        for asset in skm_list:
-            if os.path.basename(asset).strip('.fbx') in cb_assets:
-                existing_assets.append(asset)
-            else:
-                # import new skm assets
-                print(f"[SKM import] {asset} not yet imported. Importing")
-                if self.destination_path:
-                    task = ue_utils.skeletal_mesh_import_task(asset, mode='import', destination_path=self.destination_path)
-                    tasks.append(task)
-        # import or reimport skm assets
-        if existing_assets:
-            unreal.log("Existing skeletons found")
-            dialog = ExistingAssetsDialog(existing_assets)
-            if dialog.exec() == QDialog.Accepted:
-                mode = dialog.result
-                for asset in existing_assets:
-                    print(f"{mode}ing {asset}")
-                    task = ue_utils.skeletal_mesh_import_task(asset, mode=mode, destination_path=self.destination_path)
-                    tasks.append(task)
+    def assign_skeletons(self, anim_list, mesh_sources):
+        """
+        Skeleton per animation: an existing skeleton's object path, or the source of a
+        skeletal mesh in this batch whose skeleton doesn't exist yet. Asks the user for the
+        animations that match neither.
+        """
+        content_index = ue_utils.get_content_index(self.GAME_ROOT)
+        anim_skeletons, unresolved = ue_utils.match_skeletons({anim: self.preflight.get(anim) for anim in anim_list}, self.GAME_ROOT)
+        if unresolved and mesh_sources:
+            matched, unresolved = ue_utils.match_source_skeletons({anim: self.preflight.get(anim) for anim in unresolved},
+                                                                  {mesh: self.preflight.get(mesh) for mesh in mesh_sources})
+            anim_skeletons.update(matched)
+        if unresolved:
+            for anim, reason in unresolved.items():
+                unreal.log_warning(f"[skeleton match] {os.path.basename(anim)}: {reason}")
+            all_skeletons = content_index.object_paths('Skeleton')
+            if all_skeletons:
+                dialog = SelectSkeletonDialog(all_skeletons, list(unresolved))
+                if dialog.exec() == QDialog.Accepted:
+                    for anim in unresolved:
+                        anim_skeletons[anim] = dialog.selected_skeleton
+                elif not anim_skeletons:
+                    message = QMessageBox.critical(self, "Aborting import", "Skeleton not selected.\nAborting import.", QMessageBox.Ok)
+                else:
+                    unreal.log_warning(f"Skeleton not selected, skipping {len(unresolved)} animation(s)")
             else:
-                self.close()
-                return "abort"
+                unreal.log_error(f"No skeleton found, skipping {len(unresolved)} animation(s)")
+        return anim_skeletons
+
+    def do_import(self, on_finished=None):
+        """
+        Plans skeletal meshes and animations, then imports them as one dependency graph.
+        """
+        print("\nStarting Import Process")
+        skm_list = self.sources_by_kind.get(fbx_preflight.SKELETAL_MESH, list())
+        skm_entries = self.resolve_plan(skm_list, fbx_preflight.SKELETAL_MESH)
+        if skm_entries is None:
+            import_trace.deactivate()
+            self.close_journal()
+            self.close()
+            return "abort"
+        skm_entries = self.planned_imports(skm_entries)
 
-        if tasks:
-            asset_tools = ue_utils.get_asset_tools()
-            asset_tools.import_asset_tasks(tasks)
+        anim_list = self.sources_by_kind.get(fbx_preflight.ANIMATION, list())
+        # animations planned as skipped don't need a skeleton
+        kept = {entry["source"] for entry in self.planned_imports([self.plan[anim] for anim in anim_list if anim in self.plan])}
+        anim_list = [anim for anim in anim_list if anim not in self.plan or anim in kept]
+        anim_skeletons = self.assign_skeletons(anim_list, [entry["source"] for entry in skm_entries])
+        anim_list = [anim for anim in anim_list if anim in anim_skeletons]
+        anim_entries = self.resolve_plan(anim_list, fbx_preflight.ANIMATION,
+                                         {anim: skeleton for anim, skeleton in anim_skeletons.items() if skeleton not in skm_list})
+        anim_entries = self.planned_imports(anim_entries or list())
 
-        self.do_validate_skm()
+        self.journal_batch(self.get_all_listed_assets(), {entry["source"] for entry in skm_entries + anim_entries})
+        self.start_staging([entry["source"] for entry in skm_entries + anim_entries])
+        if self.anim_compression != anim_compression.IMMEDIATE and anim_entries:
+            # active around each animation import only, see build_import_graph
+            self.deferred_compression = anim_compression.DeferredCompression()
+        scheduler = self.build_import_graph(skm_entries, anim_entries, anim_skeletons)
+        self.run_scheduler(scheduler, partial(self.import_finished, on_finished))
 
-        for asset in self.get_all_listed_assets():
-            if 'ANIM' in asset:
-                self.do_import_anim_seq()
-                break
-    
-    def do_import_anim_seq(self):
-        unreal.log("\nStarting Anim Sequence Import Process")
-        tasks = list()
-        existing_assets = list()
-        cb_assets = ue_utils.get_all_assets(self.GAME_ROOT)
-        all_skeletons = [skel for skel in cb_assets if 'Skeleton' in skel]
-        if all_skeletons:
-            dialog = SelectSkeletonDialog(all_skeletons)
-            if dialog.exec() == QDialog.Accepted:
-                skeleton = unreal.load_object(None, dialog.selected_skeleton)
-                anim_list = [anim for anim in self.get_all_listed_assets() if 'ANIM_' in anim]
-                cb_anim_assets = [unreal.load_object(None, anim).get_name() for anim in cb_assets if 'ANIM' in anim]
-                for asset in anim_list:
-                    if os.path.basename(asset).strip('.fbx') in cb_anim_assets:
-                        existing_assets.append(asset)
-                    else:
-                        # import new anim seq assets
-                        print(f"{asset} not yet imported. Importing")
-                        task = ue_utils.anim_sequence_import_task(asset, skeleton, mode='import', destination_path=self.destination_path)
-                        tasks.append(task)
-
-                # import or reimport anim seq assets
-                if existing_assets:
-                    unreal.log("Existing animations found")
-                    dialog = ExistingAssetsDialog(existing_assets)
-                    if dialog.exec() == QDialog.Accepted:
-                        mode = dialog.result
-                        for asset in existing_assets:
-                            print(f"{mode}ing {asset}")
-                            task = ue_utils.anim_sequence_import_task(asset, skeleton, mode=mode, destination_path=self.destination_path)
-                            tasks.append(task)
-                    else:
-                        dialog.close()
-            else:
-                message = QMessageBox.critical(self, "Aborting import", "Skeleton not selected.\nAborting import.", QMessageBox.Ok)
-            
-        if tasks:
-            asset_tools = ue_utils.get_asset_tools()
-            asset_tools.import_asset_tasks(tasks)
+    def build_import_graph(self, skm_entries, anim_entries, anim_skeletons):
+        """
+        skeletal mesh -> validation -> renaming (with its skeleton, physics asset, materials
+        and textures) -> animations on its skeleton -> renaming. Animations on existing
+        skeletons don't wait for anything.
+        """
+        self.package_saver = ue_utils.PackageSaver(self.save_policy, self.save_every, on_saved=self.journal and self.journal.saved)
+        self.memory_budget = None
+        if self.memory_ceiling_gb > 0:
+            self.memory_budget = ue_utils.MemoryBudget(self.memory_ceiling_gb * ue_utils.GB, chunk_size=self.import_chunk_size)
+        scheduler = import_scheduler.ImportGraphScheduler(chunk_size=self.import_chunk_size, root=self.GAME_ROOT, saver=self.package_saver,
+                                                          journal=self.journal, memory=self.memory_budget)
+        # recorded under the imported names, post-process renames follow in the manifest
+        scheduler.imported_callbacks.append(lambda node: self.record_imports([node.task]))
+        self.skeleton_validations = list()
+        mesh_nodes = dict()  # skeletal mesh source -> its post-process node
+        for entry in skm_entries:
+            asset, mode = entry["source"], self.task_mode(entry)
+            print(f"[SKM import] {mode}ing {asset}")
+            self.cache_keys[asset] = entry["cache_key"]
+            imported = scheduler.add_import(asset, partial(self.skm_import_task, entry))
+            validated = scheduler.add(f"{import_scheduler.VALIDATE}:{asset}", import_scheduler.VALIDATE, self.validate_imported, [imported], asset)
+            mesh_nodes[asset] = scheduler.add(f"{import_scheduler.POST_PROCESS}:{asset}", import_scheduler.POST_PROCESS, self.post_process_imported, [validated], asset)
 
-    def import_preview(self):
-        dialog = QDialog()
-        dialog.setWindowTitle("Import Preview")
-        label = QLabel("The following assets will be imported:")
-        main_layout = QVBoxLayout()
-        btn_layout = QHBoxLayout()
-        ok_btn = QPushButton("OK")
-        cancel_btn = QPushButton("Cancel")
-        in_game_path = self.destination_path.replace("/Game", "/All/Content")
-
-        main_layout.addWidget(label)
-        for i in range(self.asset_list_widget.rowCount()):
-            item = self.asset_list_widget.item(i, 0)    
-            item_label = QLabel(f"{item.text()} ==> {in_game_path}/{item.text()}")
-            main_layout.addWidget(item_label)
-        btn_layout.addWidget(ok_btn)
-        btn_layout.addWidget(cancel_btn)
-        main_layout.addLayout(btn_layout)
-        dialog.setLayout(main_layout)
+        skeletons = dict()  # skeleton path -> loaded skeleton, each one is loaded once
+        self.anim_nodes = list()
+        for entry in anim_entries:
+            asset, skeleton = entry["source"], anim_skeletons[entry["source"]]
+            depends_on = [mesh_nodes[skeleton]] if skeleton in mesh_nodes else []
+            imported = scheduler.add_import(asset, partial(self.anim_import_task, entry, skeleton, skeletons), depends_on, self.deferred_compression)
+            post_processed = scheduler.add(f"{import_scheduler.POST_PROCESS}:{asset}", import_scheduler.POST_PROCESS, self.post_process_imported, [imported], asset)
+            self.anim_nodes.append((imported, post_processed))
+        return scheduler
 
-        ok_btn.clicked.connect(dialog.accept)
-        cancel_btn.clicked.connect(dialog.reject)
+    def validate_imported(self, node):
+        # passes the imported assets on to post-processing
+        produced = node.inputs[0]
+        content_index = ue_utils.get_content_index(self.GAME_ROOT)
+        new_skeletons = [path for path in produced if content_index.get(path) and content_index.get(path).asset_class == 'Skeleton']
+        if new_skeletons:
+            self.skeleton_validations.append(ue_utils.validate_skeleton(new_skeletons, self.GAME_ROOT))
+        return produced
+
+    def post_process_imported(self, node):
+        return self.do_post_process(node.inputs[0])
+
+    def skm_import_task(self, entry, node):
+        # built when the node runs, so the source is only waited for (source_stage) right before its import
+        asset, mode = entry["source"], self.task_mode(entry)
+        return ue_utils.skeletal_mesh_import_task(asset, mode=mode, destination_path=self.destination_path, preflight=self.preflight.get(asset), save_policy=self.save_policy,
+                                                  destination_name=ue_utils.replaced_asset_name(entry, mode))
+
+    def anim_import_task(self, entry, skeleton, skeletons, node):
+        asset, mode = entry["source"], self.task_mode(entry)
+        if node.depends_on:
+            # skeleton of a skeletal mesh from this batch, looked up after it was renamed
+            content_index = ue_utils.get_content_index(self.GAME_ROOT)
+            found = [path for path in node.inputs[0] if content_index.get(path) and content_index.get(path).asset_class == 'Skeleton']
+            if not found:
+                raise RuntimeError(f"{os.path.basename(skeleton)} produced no skeleton")
+            skeleton = found[0]
+        skeleton_path = skeleton.split('.')[0]
+        if skeleton_path not in skeletons:
+            skeletons[skeleton_path] = unreal.load_object(None, skeleton_path)
+            import_trace.count("objects_loaded")
+        print(f"{mode}ing {asset}")
+        if self.deferred_compression is not None and mode == "replace":
+            self.deferred_compression.defer_existing(entry["existing"])
+        # the cache key holds the skeleton actually used, it may differ from the previewed one
+        self.cache_keys[asset] = import_cache.options_key(fbx_preflight.ANIMATION, self.destination_path, skeleton=skeleton_path)
+        return ue_utils.anim_sequence_import_task(asset, skeletons[skeleton_path], mode=mode, destination_path=self.destination_path, preflight=self.preflight.get(asset), save_policy=self.save_policy,
+                                                  destination_name=ue_utils.replaced_asset_name(entry, mode))
+
+    def journal_batch(self, sources, to_import):
+        """
+        Journals the batch: every source is queued, the ones not imported are skipped.
+        Continues the journal of a resumed batch.
+        """
+        if self.journal is None:
+            journal_folder = ue_utils.get_journal_folder()
+            batch = {"destination": self.destination_path, "sources": sources, "mode": "replace", "save_policy": self.save_policy,
+                     "save_every": self.save_every, "post_process": True, "origin": "asset_importer"}
+            self.journal = import_journal.ImportJournal(import_journal.new_journal_path(journal_folder), batch)
+            import_journal.prune(journal_folder)
+        self.journal.queue(sources)
+        for source in sources:
+            if source not in to_import:
+                self.journal.skipped(source, "rejected, cache hit, skipped or no skeleton")
+
+    def start_staging(self, sources):
+        # sources in planned import order
+        if self.stage_sources == "never":
+            return
+        stager = source_stage.SourceStager(ue_utils.get_source_cache_folder(), self.stage_cache_gb * source_stage.GB, self.stage_ahead,
+                                           remote_only=self.stage_sources == "auto")
+        source_stage.activate(stager)
+        source_stage.prefetch(sources, {source: self.preflight[source]["hash"] for source in sources if source in self.preflight})
+
+    def close_journal(self):
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
 
-        return dialog.exec()
+    def import_finished(self, on_finished, scheduler):
+        self.close_journal()
+        self.finish_deferred_compression()
+        stager = source_stage.deactivate()
+        if stager is not None and stager.queue:
+            unreal.log(f"[stage] {stager.report()}")
+        tracer = import_trace.deactivate()
+        if tracer is not None:
+            path = import_trace.export_run(tracer, self.trace_folder)
+            unreal.log(f"Import trace: {path}\n{import_trace.format_summary(tracer.summary())}")
+        if self.import_cancelled:
+            unreal.log_warning("Import cancelled")
+        failed = scheduler.failed_nodes()
+        if failed:
+            unreal.log_warning(f"{len(failed)} import step(s) failed or skipped: {', '.join(node.key for node in failed)}")
+        if self.skeleton_validations:
+            self.do_validate_skm(self.skeleton_validations)
+        if self.cache_hits:
+            unreal.log(f"{len(self.cache_hits)} unchanged source(s) skipped (cache hits)")
+        if self.package_saver.flushes:
+            unreal.log(f"Saved {self.package_saver.saved} package(s) in {self.package_saver.flushes} bulk save(s), {self.package_saver.seconds:.2f}s")
+        if self.memory_budget is not None and self.memory_budget.releases:
+            unreal.log(f"[memory] {self.memory_budget.report()}")
+        if on_finished:
+            on_finished()
 
-    def do_post_process(self):
+    def finish_deferred_compression(self):
+        """
+        Queues the animations imported with the cheap codec, under their final names, and
+        compresses them on editor ticks unless they are left queued for a later pass.
+        """
+        if self.deferred_compression is None:
+            return
+        compression, self.deferred_compression = self.deferred_compression, None
+        compression.end()
+        object_paths = list()
+        for imported, post_processed in self.anim_nodes:
+            if post_processed.state == import_scheduler.DONE:
+                object_paths.extend(post_processed.result)
+            elif imported.state == import_scheduler.DONE:
+                object_paths.extend(imported.result)
+        queued = compression.queue_imported(object_paths, self.GAME_ROOT)
+        if not queued:
+            return
+        if self.anim_compression == anim_compression.QUEUED:
+            # queue_imported saved the queue
+            unreal.log(f"[anim compression] {queued} animation(s) queued, {len(compression.queue)} in {compression.queue.path}")
+            return
+        if self.compression_pass is not None and not self.compression_pass.finished:
+            # the running pass compresses what it had, the new ones are picked up by the next one
+            self.compression_pass.cancel()
+        self.compression_pass = anim_compression.CompressionPass(compression.queue, chunk_size=self.import_chunk_size)
+        self.compression_pass.progress_callbacks.append(self.compression_progress)
+        self.compression_pass.start()
+
+    def compression_progress(self, compression_pass):
+        # every 10%
+        step = max(1, compression_pass.total // 10)
+        if compression_pass.done // step != (compression_pass.done - compression_pass.chunk_size) // step or compression_pass.done == compression_pass.total:
+            unreal.log(f"[anim compression] {compression_pass.done}/{compression_pass.total} animation(s), {compression_pass.elapsed():.1f}s")
+
+    def import_preview(self):
+        """
+        Shows the plan with its destination and action per asset, the actions picked in the
+        dialog are the ones imported.
+        """
+        dialog = ImportPlanDialog(list(self.plan.values()))
+        result = dialog.exec()
+        if result == QDialog.Accepted:
+            for source, action in dialog.actions().items():
+                self.plan[source]["action"] = action
+        return result
+
+    def do_post_process(self, object_paths=None):
         """
         Post-processes can be added here like renaming, asset validation, etc.
+        Only the assets produced by the current import are touched.
+        Returns the object paths after renaming.
         """
-        asset_prefix_map = {'SkeletalMesh': 'SKM', 'Skeleton': 'SKL', 'PhysicsAsset': 'PA', 'Material': 'M', 'AnimSequence': 'ANIM'}
-        cb_assets = ue_utils.get_all_assets(self.GAME_ROOT)
-        for asset in cb_assets:
-            asset_obj = unreal.load_object(None, asset)
-            asset_class_name = asset_obj.get_class().get_name()
-            if asset_class_name in asset_prefix_map:
-                current_name = asset_obj.get_name()
-                if '_' in current_name:
-                    new_name = current_name.replace(current_name.split('_')[0], asset_prefix_map[asset_class_name])
-                else:
-                    new_name = f"{asset_prefix_map[asset_class_name]}_{current_name}"
-                parent_path = os.path.dirname(asset_obj.get_path_name())
-                
-                unreal.log(f"Renaming {current_name} to {new_name}")
-                EditorAssetLibrary.rename_asset(os.path.join(parent_path, current_name), os.path.join(parent_path, new_name))
+        if object_paths is None:
+            object_paths = self.imported_assets
+        renames = dict(ue_utils.post_process_assets(object_paths, self.GAME_ROOT, self.package_saver))
+        return [ue_utils.renamed_object_path(path, renames[path]) if path in renames else path for path in object_paths]
+
+    def do_sharded_import(self):
+        """
+        Imports the listed assets with shard_import: headless editor processes import the
+        shards and save the packages, this editor picks the new assets up from disk afterwards.
+        Assets already loaded here keep their in-memory version until reloaded.
+        """
+        if self.shard_runner is not None:
+            QMessageBox.information(self, "Import Asset", "A sharded import is still running.", QMessageBox.Ok)
+            return
+        editor = os.path.join(os.path.dirname(sys.executable), "UnrealEditor-Cmd.exe" if sys.platform == "win32" else "UnrealEditor-Cmd")
+        manifest = ue_utils.get_import_manifest()
+        # the workers start from the manifest on disk
+        manifest.save()
+        coordinator = shard_import.ShardCoordinator({self.destination_path: self.get_all_listed_assets()}, self.shard_workers,
+                                                    editor=editor, project=Paths.get_project_file_path(),
+                                                    import_manifest=manifest.path,
+                                                    batch_options={"save_policy": self.save_policy, "save_every": self.save_every})
+        self.shard_runner = ShardImportRunner(coordinator)
+        self.shard_runner.signals.finished.connect(self.sharded_import_finished)
+        self.import_button.setEnabled(False)
+        self.resume_button.setEnabled(False)
+        unreal.log(f"[shard import] importing {len(self.get_all_listed_assets())} asset(s) with {self.shard_workers} worker(s)")
+        QThreadPool.globalInstance().start(self.shard_runner)
+
+    def sharded_import_finished(self, report):
+        self.shard_runner = None
+        self.import_button.setEnabled(True)
+        self.resume_button.setEnabled(True)
+        if report is None:
+            QMessageBox.critical(self, "Import Asset Error", "Sharded import failed, see the output log.", QMessageBox.Ok)
+            return
+        ue_utils.get_asset_registry().scan_paths_synchronous([self.destination_path], True)
+        ue_utils.get_content_index(self.GAME_ROOT).refresh_path(self.destination_path)
+        # merged back from the workers
+        ue_utils.get_import_manifest().load()
+        ue_utils.get_skeleton_cache().load()
+        anim_compression.get_queue().load()
+        summary = ", ".join(f"{count} {status}" for status, count in sorted(report["summary"].items()))
+        failed_workers = [worker for worker in report["workers"] if worker["returncode"]]
+        message = f"{summary}\n{len(report['workers'])} worker(s) in {report['seconds']:.1f}s"
+        if failed_workers:
+            message += "\n\nFailed workers, see their logs:\n" + "\n".join(worker["dir"] for worker in failed_workers)
+        QMessageBox.information(self, "Sharded Import", message, QMessageBox.Ok)
+
+    def resume_last_batch(self):
+        """
+        Continues the last journaled batch: saved assets that miss post-processing are renamed
+        now, the sources that didn't finish go through the regular import again.
+        """
+        if self.scheduler is not None or self.shard_runner is not None:
+            # the running import owns the journal, saver and asset list
+            QMessageBox.information(self, "Resume Import", "An import is still running.", QMessageBox.Ok)
+            return
+        path = import_journal.latest_journal(ue_utils.get_journal_folder())
+        journal = import_journal.ImportJournal(path) if path else None
+        unfinished = journal.unfinished() if journal else dict()
+        if not unfinished:
+            if journal:
+                journal.close()
+            QMessageBox.information(self, "Resume Import", "The last batch finished, nothing to resume.", QMessageBox.Ok)
+            return
+        crashed = journal.crashed()
+        to_import = [source for source, needs in unfinished.items() if needs == import_journal.NEEDS_IMPORT]
+        post_process_only = [source for source, needs in unfinished.items() if needs == import_journal.NEEDS_POST_PROCESS]
+        text = f"{len(to_import)} source(s) to import and {len(post_process_only)} to post-process into {journal.batch['destination']}."
+        if crashed:
+            text += f"\n{len(crashed)} source(s) crashed the importer before and will be skipped:\n" + "\n".join(os.path.basename(source) for source in crashed)
+        if QMessageBox.question(self, "Resume Import", text, QMessageBox.Ok | QMessageBox.Cancel) != QMessageBox.Ok:
+            journal.close()
+            return
+        for source in crashed:
+            journal.failed(source, f"importer died while importing it {journal.attempts[source]} times")
+
+        self.journal = journal
+        self.destination_path = journal.batch["destination"]
+        self.destination_path_line_edit.setText(self.destination_path.replace("/Game", "/All/Content"))
+        if post_process_only:
+            self.package_saver = ue_utils.PackageSaver(self.save_policy, self.save_every, on_saved=journal.saved)
+            for source in post_process_only:
+                self.package_saver.add(journal.assets[source])
+                journal.post_processed(source, self.do_post_process(journal.assets[source]))
+            self.package_saver.flush()
+        if not to_import:
+            self.close_journal()
+            return
+        self.asset_list_widget.source_model.remove_rows(range(self.asset_list_widget.source_model.rowCount()))
+        self.asset_list_widget.add_paths(to_import)
+        self.do_imports()
 
     def do_imports(self):
-        if not self.get_all_listed_assets():
+        if self.scheduler is not None or self.shard_runner is not None:
+            # the running import owns the journal, saver, stager and tracer
+            message = QMessageBox.information(self, "Import Asset", "An import is still running.", QMessageBox.Ok)
+        elif self.asset_list_widget.scanners:
+            message = QMessageBox.information(self, "Import Asset", "Dropped folders are still being scanned.\nPlease wait until the asset list is complete.", QMessageBox.Ok)
+        elif not self.get_all_listed_assets():
             message = QMessageBox.critical(self, "Import Asset Error", "No assets detected.\nPlease add assets into the list before importing.", QMessageBox.Ok)
         else:
-            if self.destination_path_line_edit.text() != "":
+            if self.destination_path_line_edit.text() != "" and self.import_mode == "sharded":
+                self.do_sharded_import()
+            elif self.destination_path_line_edit.text() != "":
+                # traced until import_finished exports it
+                import_trace.activate(import_trace.Tracer("import", trace_heap=self.trace_heap))
+                if not self.run_preflight():
+                    import_trace.deactivate()
+                    self.close_journal()
+                    print("Import operation aborted.")
+                    return
+                self.build_plan()
                 result = self.import_preview()
                 if result == QDialog.Accepted:
                     self.close()
-                    self.do_import_skm()
-                    self.do_post_process()
+                    self.imported_assets = list()
+                    self.cache_hits = list()
+                    self.import_cancelled = False
+                    self.do_import()
                 else:
+                    import_trace.deactivate()
+                    self.close_journal()
                     print("Import operation aborted.")
             else:
                 message = QMessageBox.critical(self, "Import Path Error", "No import path detected.\nPlease enter import path.", QMessageBox.Ok)
 
-def launch_app():
-    reload(ue_utils)
+# the open window, kept across module reloads so a reload can replace it
+_importer_window = globals().get("_importer_window")
+
+def launch_app(rebuild=False):
+    """
+    Shows the importer window, created on first use and reused afterwards.
+    rebuild: replace the window, after the modules were reloaded
+    """
+    global _importer_window
     app = QApplication.instance() or QApplication(sys.argv)
-    widget = UEAssetImporter()
-    widget.show()
-    return widget
\ No newline at end of file
+    if _importer_window is not None and rebuild:
+        _importer_window.close()
+        _importer_window.deleteLater()
+        _importer_window = None
+    if _importer_window is None:
+        _importer_window = UEAssetImporter()
+    _importer_window.show()
+    _importer_window.raise_()
+    _importer_window.activateWindow()
+    return _importer_window
@@ -0,0 +1,406 @@
+"""
+Headless batch importer, the UEAssetImporter pipeline without Qt.
+
+    UnrealEditor-Cmd.exe Project.uproject -run=pythonscript -script="batch_import.py manifest.json --report report.json"
+
+Several manifests can be given, they are imported one after the other in the same editor
+process and each gets its own <manifest>.report.json.
+
+Every batch is journaled (import_journal) in Saved/AssetImporter/journals. After a crash or a
+hang, --resume [journal] imports what the last (or the given) batch didn't finish:
+
+    UnrealEditor-Cmd.exe Project.uproject -run=pythonscript -script="batch_import.py --resume"
+
+Manifest (JSON):
+    {
+        "destination": "/Game/Characters",
+        "sources": ["D:/drop/SKM_Hero.fbx", "D:/drop/anims"],
+        "mode": "replace",
+        "skeleton_rules": [{"pattern": "ANIM_Hero_*", "skeleton": "/Game/Characters/SKL_Hero"}],
+        "auto_skeleton": true,
+        "use_cache": true,
+        "post_process": true,
+        "save_policy": "deferred",
+        "save_every": 50,
+        "stage_sources": "auto",
+        "stage_cache_gb": 20,
+        "stage_ahead": 8,
+        "memory_ceiling_gb": 0,
+        "anim_compression": "immediate"
+    }
+
+sources: FBX files or folders (searched recursively for *.fbx)
+mode: what to do with sources whose asset already exists, "replace" (reimport), "import" or "skip"
+skeleton_rules: animation file name patterns (fnmatch) and the skeleton to use, checked in order
+auto_skeleton: match the remaining animations to a skeleton by their bones
+save_policy: "immediate" (every import saves), "deferred" (one bulk save at the end) or
+    "every_n" (bulk save every save_every assets)
+stage_sources: copy sources to a local cache ahead of the import (source_stage), "auto" for
+    sources on network shares only, "always" or "never"
+memory_ceiling_gb: process memory to stay under (0 for no limit). Imported assets are saved
+    and unloaded in chunks sized to fit, see ue_utils.MemoryBudget
+anim_compression: "immediate" (while importing), "deferred" (cheap codec while importing, final
+    compression in a pass after the batch) or "queued" (left for a later pass), see anim_compression
+
+--compress-pending compresses what deferred imports left queued, after the given batches or
+on its own:
+
+    UnrealEditor-Cmd.exe Project.uproject -run=pythonscript -script="batch_import.py --compress-pending"
+"""
+import os
+import sys
+import json
+import time
+import fnmatch
+import argparse
+import contextlib
+from collections import Counter
+
+import unreal
+
+import ue_utils
+import fbx_preflight
+import import_trace
+import import_journal
+import source_stage
+import anim_compression
+
+MANIFEST_DEFAULTS = {
+    "destination": "/Game",
+    "sources": [],
+    "mode": "replace",
+    "skeleton_rules": [],
+    "auto_skeleton": True,
+    "use_cache": True,
+    "post_process": True,
+    "save_policy": ue_utils.SAVE_DEFERRED,
+    "save_every": 50,
+    "stage_sources": "auto",
+    "stage_cache_gb": 20,
+    "stage_ahead": 8,
+    "memory_ceiling_gb": 0,
+    "anim_compression": anim_compression.IMMEDIATE,
+}
+MODES = ("import", "replace", "skip")
+STAGE_MODES = ("auto", "always", "never")
+
+
+def load_manifest(path):
+    with open(path, "r") as f:
+        manifest = dict(MANIFEST_DEFAULTS, **json.load(f))
+    if manifest["mode"] not in MODES:
+        raise ValueError(f"Invalid mode {manifest['mode']!r}, expected one of {MODES}")
+    if manifest["save_policy"] not in ue_utils.SAVE_POLICIES:
+        raise ValueError(f"Invalid save_policy {manifest['save_policy']!r}, expected one of {ue_utils.SAVE_POLICIES}")
+    if manifest["stage_sources"] not in STAGE_MODES:
+        raise ValueError(f"Invalid stage_sources {manifest['stage_sources']!r}, expected one of {STAGE_MODES}")
+    if manifest["anim_compression"] not in anim_compression.MODES:
+        raise ValueError(f"Invalid anim_compression {manifest['anim_compression']!r}, expected one of {anim_compression.MODES}")
+    if not manifest["sources"]:
+        raise ValueError("Manifest has no sources")
+    return manifest
+
+
+class BatchImport(object):
+    def __init__(self, manifest, root="/Game", journal=None):
+        """
+        journal: import_journal.ImportJournal of an earlier run to resume, see resume()
+        """
+        self.manifest = dict(MANIFEST_DEFAULTS, **manifest)
+        self.root = root
+        self.journal = journal
+        self.destination_path = self.manifest["destination"]
+        self.results = dict()  # source -> result, in import order
+        self.preflight = dict()
+        self.cache_keys = dict()
+        self.produced = list()
+        self.skeleton_validation = None
+        self.saver = ue_utils.PackageSaver(self.manifest["save_policy"], self.manifest["save_every"])
+        self.stager = None
+        self.memory = None
+        if self.manifest["memory_ceiling_gb"] > 0:
+            self.memory = ue_utils.MemoryBudget(self.manifest["memory_ceiling_gb"] * ue_utils.GB)
+        self.compression = None  # anim_compression.DeferredCompression of deferred animation imports
+        self.compression_report = None
+        self.start_time = None
+
+    @classmethod
+    def resume(cls, journal_path, root="/Game"):
+        """
+        Continues the batch journaled in journal_path. Unfinished sources are imported again,
+        replacing what an interrupted attempt left behind, saved ones are only post-processed.
+        """
+        journal = import_journal.ImportJournal(journal_path)
+        # assets of unfinished sources come from this batch, and the import manifest may have
+        # recorded imports that were never saved
+        manifest = dict(journal.batch, mode="replace", use_cache=False)
+        return cls(manifest, root, journal)
+
+    def result(self, source):
+        if source not in self.results:
+            self.results[source] = {"source": source, "kind": None, "status": "pending", "asset_paths": [],
+                                    "skeleton": None, "seconds": 0.0, "errors": []}
+        return self.results[source]
+
+    def run(self):
+        self.start_time = time.time()
+        post_process_only = list()
+        if self.journal is None:
+            sources = fbx_preflight.expand_sources(self.manifest["sources"])
+            journal_folder = ue_utils.get_journal_folder()
+            self.journal = import_journal.ImportJournal(import_journal.new_journal_path(journal_folder),
+                                                        dict(self.manifest, sources=sources, origin="batch_import"))
+            import_journal.prune(journal_folder)
+            self.journal.queue(sources)
+        else:
+            sources, post_process_only = self.resume_sources()
+        self.saver.on_saved = self.journal.saved
+        unreal.log(f"[batch import] {len(sources)} source(s) -> {self.destination_path}, journal: {self.journal.path}")
+        # the stager of an import already running in this editor stays its own
+        if self.manifest["stage_sources"] != "never" and source_stage.active() is None:
+            self.stager = source_stage.activate(source_stage.SourceStager(
+                ue_utils.get_source_cache_folder(), self.manifest["stage_cache_gb"] * source_stage.GB, self.manifest["stage_ahead"],
+                remote_only=self.manifest["stage_sources"] == "auto"))
+        try:
+            return self.import_all(sources, post_process_only)
+        finally:
+            if self.stager is not None and source_stage.active() is self.stager:
+                source_stage.deactivate()
+            self.journal.close()
+
+    def import_all(self, sources, post_process_only):
+        started = time.perf_counter()
+        with import_trace.span("preflight_files", "preflight", files=len(sources)):
+            self.preflight = fbx_preflight.preflight_files(sources)
+        preflight_seconds = time.perf_counter() - started
+        by_kind = dict()
+        for source in sources:
+            info = self.preflight[source]
+            result = self.result(source)
+            result["kind"] = info["kind"]
+            if info["kind"] in (fbx_preflight.SKELETAL_MESH, fbx_preflight.ANIMATION):
+                by_kind.setdefault(info["kind"], list()).append(source)
+            else:
+                result["status"] = "rejected"
+                result["errors"] = fbx_preflight.problems(info, fbx_preflight.name_hint(source) or info["kind"]) or [f"unsupported asset type ({info['kind']})"]
+                self.journal.skipped(source, "; ".join(result["errors"]))
+
+        skm_list = by_kind.get(fbx_preflight.SKELETAL_MESH, list())
+        self.import_sources(skm_list, fbx_preflight.SKELETAL_MESH)
+        content_index = ue_utils.get_content_index(self.root)
+        new_skeletons = [path for path in self.produced if content_index.get(path) and content_index.get(path).asset_class == 'Skeleton']
+        self.skeleton_validation = ue_utils.validate_skeleton(new_skeletons, self.root)
+
+        anim_list = by_kind.get(fbx_preflight.ANIMATION, list())
+        anim_skeletons = self.assign_skeletons(anim_list)
+        if self.manifest["anim_compression"] != anim_compression.IMMEDIATE and anim_skeletons:
+            self.compression = anim_compression.DeferredCompression()
+        with self.compression or contextlib.nullcontext():
+            self.import_sources([anim for anim in anim_list if anim in anim_skeletons], fbx_preflight.ANIMATION, anim_skeletons)
+
+        renames = list()
+        if self.manifest["post_process"] and self.produced:
+            renames = ue_utils.post_process_assets(self.produced, self.root, self.saver)
+            renamed = {old: ue_utils.renamed_object_path(old, new) for old, new in renames}
+            for result in self.results.values():
+                result["asset_paths"] = [renamed.get(path, path) for path in result["asset_paths"]]
+                if result["status"] in ("imported", "reimported") or result["source"] in post_process_only:
+                    self.journal.post_processed(result["source"], result["asset_paths"])
+        self.saver.flush()
+        if self.compression is not None:
+            queued = self.compression.queue_imported([path for result in self.results.values() if result["kind"] == fbx_preflight.ANIMATION
+                                                      and result["status"] in ("imported", "reimported") for path in result["asset_paths"]], self.root)
+            unreal.log(f"[batch import] {queued} animation(s) queued for compression")
+            if self.manifest["anim_compression"] == anim_compression.DEFERRED:
+                self.compression_report = anim_compression.CompressionPass(self.compression.queue).run_blocking()
+        return self.report(preflight_seconds, len(renames))
+
+    def resume_sources(self):
+        """
+        Splits the unfinished sources of the journal into the ones to import again and the
+        saved ones that only need post-processing, whose assets are queued for it.
+        """
+        unfinished = self.journal.unfinished()
+        for source in self.journal.crashed():
+            result = self.result(source)
+            result["status"] = "crashed"
+            result["errors"].append(f"importer died while importing it {self.journal.attempts[source]} times")
+            self.journal.failed(source, result["errors"][-1])
+        sources = [source for source, needs in unfinished.items() if needs == import_journal.NEEDS_IMPORT]
+        post_process_only = [source for source, needs in unfinished.items() if needs == import_journal.NEEDS_POST_PROCESS]
+        for source in post_process_only:
+            result = self.result(source)
+            result["status"] = "saved"
+            result["asset_paths"] = list(self.journal.assets[source])
+            self.produced.extend(result["asset_paths"])
+            self.saver.add(result["asset_paths"])
+        unreal.log(f"[batch import] resuming {self.journal.path}: {len(sources)} to import, {len(post_process_only)} to post-process")
+        return sources, post_process_only
+
+    def assign_skeletons(self, anim_list):
+        """
+        Skeleton per animation, from skeleton_rules first, then by bone matching.
+        """
+        anim_skeletons = dict()
+        remaining = dict()
+        for anim in anim_list:
+            for rule in self.manifest["skeleton_rules"]:
+                if fnmatch.fnmatch(os.path.basename(anim), rule["pattern"]):
+                    anim_skeletons[anim] = rule["skeleton"]
+                    break
+            else:
+                remaining[anim] = self.preflight.get(anim)
+        if remaining and self.manifest["auto_skeleton"]:
+            matched, unresolved = ue_utils.match_skeletons(remaining, self.root)
+            anim_skeletons.update(matched)
+        else:
+            unresolved = {anim: "no skeleton rule matched" for anim in remaining}
+        for anim, reason in unresolved.items():
+            result = self.result(anim)
+            result["status"] = "no_skeleton"
+            result["errors"].append(reason)
+            self.journal.skipped(anim, reason)
+        return anim_skeletons
+
+    def import_sources(self, sources, kind, anim_skeletons=None):
+        existing_action = {"replace": ue_utils.REIMPORT, "import": ue_utils.NEW, "skip": ue_utils.SKIP}[self.manifest["mode"]]
+        skeleton_paths = None
+        if anim_skeletons is not None:
+            skeleton_paths = {source: anim_skeletons[source].split('.')[0] for source in sources}
+        plan = ue_utils.plan_imports(sources, kind, self.destination_path, self.preflight, skeleton_paths, existing_action, self.root)
+        skeletons = dict()
+        if self.manifest["use_cache"]:
+            to_import = [source for source in sources if plan[source]["action"] not in (ue_utils.CACHE_HIT, ue_utils.SKIP)]
+        else:
+            to_import = [source for source in sources if plan[source]["action"] != ue_utils.SKIP]
+        source_stage.prefetch(to_import, {source: self.preflight[source]["hash"] for source in to_import})
+        for source in sources:
+            result = self.result(source)
+            info = self.preflight.get(source)
+            entry = plan[source]
+            action = entry["action"]
+            if skeleton_paths is not None:
+                skeleton_path = result["skeleton"] = skeleton_paths[source]
+            if action == ue_utils.CACHE_HIT and not self.manifest["use_cache"]:
+                action = existing_action if entry["existing"] else ue_utils.NEW
+            if action == ue_utils.CACHE_HIT:
+                result["status"] = "cache_hit"
+                result["asset_paths"] = [ue_utils.get_import_manifest().get(source)["asset_path"]]
+                self.journal.skipped(source, "cache hit")
+                continue
+            if action == ue_utils.SKIP:
+                result["status"] = "skipped_existing"
+                self.journal.skipped(source, "asset exists")
+                continue
+            task_mode = "replace" if action == ue_utils.REIMPORT else "import"
+            if self.compression is not None and task_mode == "replace":
+                self.compression.defer_existing(entry["existing"])
+            try:
+                if kind == fbx_preflight.SKELETAL_MESH:
+                    task = ue_utils.skeletal_mesh_import_task(source, mode=task_mode, destination_path=self.destination_path, preflight=info,
+                                                              save_policy=self.saver.policy, destination_name=ue_utils.replaced_asset_name(entry, task_mode))
+                else:
+                    if skeleton_path not in skeletons:
+                        skeletons[skeleton_path] = unreal.load_object(None, skeleton_path)
+                    task = ue_utils.anim_sequence_import_task(source, skeletons[skeleton_path], mode=task_mode, destination_path=self.destination_path,
+                                                              preflight=info, save_policy=self.saver.policy,
+                                                              destination_name=ue_utils.replaced_asset_name(entry, task_mode))
+            except fbx_preflight.PreflightError as e:
+                result["status"] = "rejected"
+                result["errors"].append(str(e))
+                self.journal.skipped(source, e)
+                continue
+            self.cache_keys[source] = entry["cache_key"]
+
+            # one task per import call, for per-asset timings
+            started = time.perf_counter()
+            self.journal.importing(source)
+            with import_trace.span(os.path.basename(source), "asset", source=source):
+                produced = ue_utils.run_import_tasks([task], self.root, self.saver)
+            result["seconds"] = round(time.perf_counter() - started, 4)
+            result["asset_paths"] = produced
+            if list(task.imported_object_paths):
+                result["status"] = "reimported" if task_mode == "replace" else "imported"
+                self.produced.extend(produced)
+                self.journal.imported(source, produced, saved=self.saver.policy == ue_utils.SAVE_IMMEDIATE)
+                ue_utils.record_imports([task], self.cache_keys, {source: info["hash"]})
+                if self.memory is not None and self.memory.add(produced):
+                    # renaming at the end loads what it needs again
+                    self.memory.release(self.saver)
+            else:
+                result["status"] = "failed"
+                result["errors"].append("import produced no assets")
+                self.journal.failed(source, "import produced no assets")
+            unreal.log(f"[batch import] {result['status']}: {os.path.basename(source)} ({result['seconds']:.2f}s)")
+
+    def report(self, preflight_seconds=0.0, rename_count=0):
+        validation = self.skeleton_validation
+        if isinstance(validation, tuple):
+            validation = {"warning": validation[0], "groups": validation[1]}
+        assets = list(self.results.values())
+        return {
+            "manifest": self.manifest,
+            "started": self.start_time,
+            "seconds": round(time.time() - self.start_time, 4),
+            "preflight_seconds": round(preflight_seconds, 4),
+            "import_seconds": round(sum(asset["seconds"] for asset in assets), 4),
+            "summary": dict(Counter(asset["status"] for asset in assets)),
+            "renamed": rename_count,
+            "save": self.saver.report(),
+            "skeleton_validation": validation,
+            "staging": self.stager.report() if self.stager else None,
+            "memory": self.memory.report() if self.memory else None,
+            "anim_compression": self.compression_report,
+            "journal": self.journal.path if self.journal else None,
+            "assets": assets,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="batch_import.py", description="Headless FBX batch import")
+    parser.add_argument("manifests", nargs="*", help="batch manifest(s) (JSON)")
+    parser.add_argument("--report", help="results report path, defaults to <manifest>.report.json (single manifest only)")
+    parser.add_argument("--trace", help="write a Chrome trace of the run (timings, memory, counters) to this path")
+    parser.add_argument("--resume", nargs="?", const="", metavar="JOURNAL",
+                        help="finish an interrupted batch instead, the last journaled one by default")
+    parser.add_argument("--compress-pending", action="store_true",
+                        help="compress the animations deferred imports left queued (after the batches, if any)")
+    args = parser.parse_args(argv if argv is not None else sys.argv[1:])
+    if args.resume is None and not args.manifests and not args.compress_pending:
+        parser.error("a manifest, --resume or --compress-pending is required")
+    if args.resume is not None and args.manifests:
+        parser.error("--resume doesn't take manifests")
+    if args.report and len(args.manifests) > 1:
+        parser.error("--report needs a single manifest")
+
+    batches = list()
+    if args.resume is not None:
+        journal_path = args.resume or import_journal.latest_journal(ue_utils.get_journal_folder())
+        if journal_path is None:
+            parser.error("no journaled batch to resume")
+        batches = [(os.path.splitext(journal_path)[0] + ".report.json", BatchImport.resume(journal_path))]
+    elif args.manifests:
+        batches = [(os.path.splitext(path)[0] + ".report.json", BatchImport(load_manifest(path))) for path in args.manifests]
+    if args.trace:
+        import_trace.activate(import_trace.Tracer("batch_import"))
+    reports = list()
+    for report_path, batch in batches:
+        report = batch.run()
+        report_path = args.report or report_path
+        with open(report_path, "w") as f:
+            json.dump(report, f, indent=2)
+        reports.append(report)
+
+        unreal.log(f"[batch import] {report['summary']} in {report['seconds']:.1f}s, report: {report_path}")
+        failed = sum(report["summary"].get(status, 0) for status in ("failed", "rejected", "no_skeleton", "crashed"))
+        if failed:
+            unreal.log_error(f"[batch import] {failed} source(s) not imported")
+    if args.compress_pending:
+        anim_compression.CompressionPass().run_blocking()
+    tracer = import_trace.deactivate()
+    if tracer is not None:
+        tracer.export(args.trace)
+    return reports
+
+if __name__ == "__main__":
+    main()
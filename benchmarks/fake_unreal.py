@@ -0,0 +1,565 @@
+"""
+Stand-in for the editor's unreal module, to run ue_utils and the importer pipeline outside
+of the editor.
+
+    import fake_unreal
+    project = fake_unreal.install(fake_unreal.make_project(100000))
+    import ue_utils
+
+Simulates the parts of the API the importer uses (EditorAssetLibrary.list_assets,
+load_object, the asset registry, Skeleton.bone_tree, AssetTools.import_asset_tasks, ...)
+on a synthetic in-memory project. Every call can be given a latency and is counted in
+project.stats.
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+from collections import Counter
+
+# seconds per call, see FakeProject.latency
+DEFAULT_LATENCY = {
+    "load_object": 0.0002,
+    "list_assets_per_asset": 0.0000005,
+    "registry_per_asset": 0.0000002,
+    "import_asset": 0.002,
+    "rename_asset": 0.0005,
+    "save_call": 0.003,  # per save request (source control status, file system round-trip), on top of save_package
+    "save_package": 0.0005,
+    "compress_anim": 0.004,  # default codec, searches over several codecs
+    "compress_anim_cheap": 0.0004,  # recorder codec
+}
+RECORDER_COMPRESSION = "/Engine/Animation/DefaultRecorderBoneCompression.DefaultRecorderBoneCompression"
+DEFAULT_COMPRESSION = "/Engine/Animation/DefaultAnimBoneCompressionSettings.DefaultAnimBoneCompressionSettings"
+
+ASSET_MIX = (("Texture2D", 0.35), ("Material", 0.15), ("StaticMesh", 0.2), ("AnimSequence", 0.2),
+             ("SkeletalMesh", 0.04), ("Skeleton", 0.02), ("PhysicsAsset", 0.02), ("SoundWave", 0.02))
+CLASS_PREFIX = {"Texture2D": "T", "Material": "M", "StaticMesh": "SM", "AnimSequence": "ANIM",
+                "SkeletalMesh": "SKM", "Skeleton": "SKL", "PhysicsAsset": "PA", "SoundWave": "S"}
+
+
+class FakeProject(object):
+    def __init__(self, root_dir=None, latency=None):
+        self.root_dir = root_dir or tempfile.mkdtemp(prefix="fake_unreal_")
+        self.latency = dict(DEFAULT_LATENCY, **(latency or {}))
+        self.assets = {}      # object path -> asset class
+        self.folders = {}     # package path -> set of object paths
+        self.bones = {}       # skeleton object path -> (bone names, parent indices)
+        self.dirty = set()    # package names modified since the last save
+        self.loaded = set()   # object paths currently loaded
+        self.source_files = {}  # object path -> source file of imported assets
+        self.compression = {}  # animation (or class default) path -> bone compression settings path
+        for settings in (RECORDER_COMPRESSION, DEFAULT_COMPRESSION):
+            self.assets[settings] = "AnimBoneCompressionSettings"
+        self.stats = Counter()
+        self.tick_callbacks = {}
+
+    def wait(self, key, count=1):
+        seconds = self.latency.get(key, 0.0) * count
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def add_asset(self, object_path, asset_class, bones=None, on_disk=False):
+        self.assets[object_path] = asset_class
+        self.folders.setdefault(object_path.split('.')[0].rsplit('/', 1)[0], set()).add(object_path)
+        if bones is not None:
+            self.bones[object_path] = bones
+        if on_disk:
+            self.save_package(object_path.split('.')[0])
+
+    def package_file(self, package_name):
+        return os.path.join(self.root_dir, "Content", package_name[len("/Game/"):] + ".uasset")
+
+    def save_package(self, package_name):
+        # writes a small placeholder file, so package stamps (size, mtime) behave like the real ones
+        filename = self.package_file(package_name)
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with open(filename, "w") as f:
+            f.write(f"{package_name} {self.stats['saved_packages']}")
+        self.stats["saved_packages"] += 1
+        self.dirty.discard(package_name)
+
+    def remove_asset(self, object_path):
+        asset_class = self.assets.pop(object_path)
+        self.folders[object_path.split('.')[0].rsplit('/', 1)[0]].discard(object_path)
+        self.loaded.discard(object_path)
+        return asset_class, self.bones.pop(object_path, None)
+
+    def tick(self, delta_seconds=0.016):
+        # runs the slate post-tick callbacks once, like one editor frame
+        for callback in list(self.tick_callbacks.values()):
+            callback(delta_seconds)
+
+
+def rig_template(bone_count, variant=0):
+    # deterministic bone hierarchy: spine chain with limbs, variant changes the parenting
+    names, parents = ["root"], [-1]
+    for i in range(1, bone_count):
+        names.append(f"bone_{i:03d}")
+        parents.append((i - 1) if i % 5 else max(0, i - 5 - variant))
+    return names, parents
+
+def make_project(asset_count=1000, skeleton_templates=(60, 80, 120), seed=7, latency=None, root_dir=None):
+    """
+    Synthetic project with asset_count assets spread over character and environment folders.
+    """
+    rng = random.Random(seed)
+    project = FakeProject(root_dir, latency)
+    classes = [c for c, _ in ASSET_MIX]
+    weights = [w for _, w in ASSET_MIX]
+    folder_count = max(1, asset_count // 200)
+    for i in range(asset_count):
+        asset_class = rng.choices(classes, weights)[0]
+        folder = f"/Game/Characters/Char{i % folder_count:04d}" if asset_class in ("SkeletalMesh", "Skeleton", "PhysicsAsset", "AnimSequence") \
+            else f"/Game/Environment/Set{i % folder_count:04d}"
+        name = f"{CLASS_PREFIX[asset_class]}_Asset{i:06d}"
+        bones = None
+        if asset_class == "Skeleton":
+            bones = rig_template(rng.choice(skeleton_templates), variant=rng.randint(0, 1))
+        # only skeleton packages are written, they are the only ones stamped by the importer
+        project.add_asset(f"{folder}/{name}.{name}", asset_class, bones, on_disk=bones is not None)
+    return project
+
+
+_project = None
+
+def project():
+    return _project
+
+
+# engine types
+
+class Name(str):
+    pass
+
+class _Enum(object):
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return self.name
+
+class FBXImportType(object):
+    FBXIT_STATIC_MESH = _Enum("FBXIT_STATIC_MESH")
+    FBXIT_SKELETAL_MESH = _Enum("FBXIT_SKELETAL_MESH")
+    FBXIT_ANIMATION = _Enum("FBXIT_ANIMATION")
+
+class _Struct(object):
+    def __init__(self, **kwargs):
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+    def get_editor_property(self, name):
+        return getattr(self, name)
+
+    def set_editor_property(self, name, value, notify_mode=None):
+        setattr(self, name, value)
+
+class Class(object):
+    def __init__(self, name):
+        self._name = name
+
+    def get_name(self):
+        return self._name
+
+class Object(_Struct):
+    def __init__(self, path_name=None, **kwargs):
+        super(Object, self).__init__(**kwargs)
+        self._path_name = path_name
+        if path_name in _project.source_files:
+            self.asset_import_data = AssetImportData(path_name)
+
+    def get_name(self):
+        return self._path_name.rsplit('.', 1)[-1]
+
+    def get_path_name(self):
+        return self._path_name
+
+    def get_class(self):
+        return Class(type(self).__name__)
+
+class AssetImportData(_Struct):
+    def __init__(self, object_path):
+        super(AssetImportData, self).__init__()
+        self._object_path = object_path
+
+    def get_first_filename(self):
+        return _project.source_files.get(self._object_path, "")
+
+    def scripted_add_filename(self, in_filename_path, index, source_file_label):
+        _project.source_files[self._object_path] = in_filename_path
+
+class SkeletalMesh(Object): pass
+class PhysicsAsset(Object): pass
+
+class AnimSequence(Object):
+    # bone compression settings live in the project, so they survive reloading
+    def get_editor_property(self, name):
+        if name == "bone_compression_settings":
+            settings = _project.compression.get(self._path_name)
+            return Object(settings) if settings else None
+        return super(AnimSequence, self).get_editor_property(name)
+
+    def set_editor_property(self, name, value, notify_mode=None):
+        if name != "bone_compression_settings":
+            return super(AnimSequence, self).set_editor_property(name, value, notify_mode)
+        _project.compression[self._path_name] = value.get_path_name() if value is not None else None
+        if notify_mode is not PropertyAccessChangeNotifyMode.NEVER and self._path_name in _project.assets:
+            _compress(self._path_name)
+
+def _compress(object_path):
+    cheap = _project.compression.get(object_path) == RECORDER_COMPRESSION
+    _project.wait("compress_anim_cheap" if cheap else "compress_anim")
+    _project.stats["anims_compressed_cheap" if cheap else "anims_compressed"] += 1
+    _project.dirty.add(object_path.split('.')[0])
+
+class PropertyAccessChangeNotifyMode(object):
+    DEFAULT = _Enum("DEFAULT")
+    NEVER = _Enum("NEVER")
+    ALWAYS = _Enum("ALWAYS")
+
+_class_defaults = {}
+
+def get_default_object(cls):
+    if cls not in _class_defaults:
+        _class_defaults[cls] = cls(f"/Script/Engine.Default__{cls.__name__}")
+    return _class_defaults[cls]
+
+class AnimationLibrary(object):
+    @staticmethod
+    def set_bone_compression_settings(animation_sequence, compression_settings):
+        animation_sequence.set_editor_property("bone_compression_settings", compression_settings)
+class Material(Object): pass
+class StaticMesh(Object): pass
+class Texture2D(Object): pass
+class SoundWave(Object): pass
+
+class BoneNode(_Struct):
+    pass
+
+class Skeleton(Object):
+    @property
+    def bone_tree(self):
+        return [BoneNode(translation_retargeting_mode=0) for _ in _project.bones[self._path_name][0]]
+
+_CLASSES = {cls.__name__: cls for cls in (SkeletalMesh, PhysicsAsset, AnimSequence, Material, StaticMesh,
+                                           Texture2D, SoundWave, Skeleton)}
+
+class AnimPose(_Struct):
+    pass
+
+class AnimPoseExtensions(object):
+    @staticmethod
+    def get_reference_pose(skeleton):
+        names, parents = _project.bones[skeleton.get_path_name()]
+        return AnimPose(bone_names=[Name(n) for n in names], parent_bone_indices=list(parents))
+
+    @staticmethod
+    def get_bone_names(pose):
+        return list(pose.bone_names)
+
+class TopLevelAssetPath(_Struct):
+    pass
+
+class AssetData(_Struct):
+    @classmethod
+    def from_path(cls, object_path, asset_class):
+        package_name = object_path.split('.')[0]
+        return cls(package_name=Name(package_name), package_path=Name(package_name.rsplit('/', 1)[0]),
+                   asset_name=Name(object_path.rsplit('.', 1)[-1]),
+                   asset_class_path=TopLevelAssetPath(package_name=Name("/Script/Engine"), asset_name=Name(asset_class)))
+
+class SoftObjectPath(str):
+    pass
+
+class AssetRenameData(_Struct):
+    pass
+
+class AssetImportTask(Object):
+    def __init__(self):
+        super(AssetImportTask, self).__init__(None, automated=False, destination_path="", filename="", options=None,
+                                              destination_name="", replace_existing=False, save=False, imported_object_paths=[])
+
+class FbxImportUI(_Struct):
+    def __init__(self):
+        super(FbxImportUI, self).__init__(automated_import_should_detect_type=False, import_as_skeletal=False,
+                                          import_animations=False, import_mesh=True, mesh_type_to_import=None,
+                                          skeletal_mesh_import_data=None, anim_sequence_import_data=None, skeleton=None)
+
+class FbxSkeletalMeshImportData(_Struct):
+    pass
+
+class FbxAnimSequenceImportData(_Struct):
+    pass
+
+class _Delegate(object):
+    def __init__(self):
+        self.callables = []
+
+    def add_callable(self, callable):
+        self.callables.append(callable)
+
+    def broadcast(self, *args):
+        for callable in self.callables:
+            callable(*args)
+
+class ImportSubsystem(object):
+    def __init__(self):
+        self.on_asset_post_import = _Delegate()
+
+_subsystems = {}
+
+def get_editor_subsystem(cls):
+    if cls not in _subsystems:
+        _subsystems[cls] = cls()
+    return _subsystems[cls]
+
+
+# logging
+
+def log(message):
+    _project.stats["log"] += 1
+
+def log_warning(message):
+    _project.stats["log_warning"] += 1
+
+def log_error(message):
+    _project.stats["log_error"] += 1
+    print(f"[fake unreal] error: {message}", file=sys.stderr)
+
+
+# paths
+
+class Paths(object):
+    @staticmethod
+    def project_dir():
+        return _project.root_dir + "/"
+
+    @staticmethod
+    def project_content_dir():
+        return os.path.join(_project.root_dir, "Content") + "/"
+
+    @staticmethod
+    def project_saved_dir():
+        return os.path.join(_project.root_dir, "Saved") + "/"
+
+
+# objects and assets
+
+def load_object(outer, name):
+    object_path = str(name)
+    if '.' not in object_path:
+        object_path = f"{object_path}.{object_path.rsplit('/', 1)[-1]}"
+    _project.stats["load_object"] += 1
+    asset_class = _project.assets.get(object_path)
+    if asset_class is None:
+        return None
+    if object_path not in _project.loaded:
+        _project.wait("load_object")
+        _project.loaded.add(object_path)
+    return _CLASSES.get(asset_class, Object)(object_path)
+
+def load_asset(name):
+    return load_object(None, name)
+
+def _in_path(object_path, path):
+    return object_path.startswith(path.rstrip('/') + '/')
+
+class EditorAssetLibrary(object):
+    @staticmethod
+    def list_assets(directory_path, recursive=True, include_folder=False):
+        _project.stats["list_assets"] += 1
+        paths = [p for p in _project.assets if _in_path(p, directory_path)]
+        _project.stats["assets_listed"] += len(paths)
+        _project.wait("list_assets_per_asset", len(_project.assets))
+        return paths
+
+    @staticmethod
+    def save_loaded_assets(assets_to_save, only_if_is_dirty=True):
+        _project.wait("save_call")
+        _project.stats["save_calls"] += 1
+        for asset in assets_to_save:
+            package_name = asset.get_path_name().split('.')[0]
+            if package_name in _project.dirty or not only_if_is_dirty:
+                _project.wait("save_package")
+                _project.save_package(package_name)
+        return True
+
+    @staticmethod
+    def rename_asset(source_asset_path, destination_asset_path):
+        return AssetTools._rename(f"{source_asset_path}.{source_asset_path.rsplit('/', 1)[-1]}",
+                                  f"{destination_asset_path}.{destination_asset_path.rsplit('/', 1)[-1]}")
+
+class Package(_Struct):
+    def get_name(self):
+        return self.name
+
+def find_package(name):
+    # a package is in memory while one of its assets is loaded
+    name = str(name)
+    if any(object_path.split('.')[0] == name for object_path in _project.loaded):
+        return Package(name=name)
+    return None
+
+class EditorLoadingAndSavingUtils(object):
+    @staticmethod
+    def save_packages(packages_to_save, only_dirty):
+        _project.wait("save_call")
+        _project.stats["save_calls"] += 1
+        for package in packages_to_save:
+            if package.name in _project.dirty or not only_dirty:
+                _project.wait("save_package")
+                _project.save_package(package.name)
+        return True
+
+    @staticmethod
+    def unload_packages(packages_to_unload):
+        names = {package.name for package in packages_to_unload}
+        unloaded = {object_path for object_path in _project.loaded if object_path.split('.')[0] in names}
+        _project.loaded -= unloaded
+        _project.stats["unloaded_packages"] += len(names)
+        return True
+
+class SystemLibrary(object):
+    @staticmethod
+    def collect_garbage():
+        _project.stats["collect_garbage"] += 1
+
+class AssetRegistry(object):
+    def get_assets_by_path(self, package_path, recursive=False, include_only_on_disk_assets=False):
+        _project.stats["registry_queries"] += 1
+        if recursive:
+            paths = [p for p in _project.assets if _in_path(p, package_path)]
+            _project.wait("registry_per_asset", len(_project.assets))
+        else:
+            paths = list(_project.folders.get(str(package_path).rstrip('/'), ()))
+        _project.stats["registry_assets"] += len(paths)
+        return [AssetData.from_path(p, _project.assets[p]) for p in paths]
+
+    def get_assets_by_package_name(self, package_name, include_only_on_disk_assets=False):
+        _project.stats["registry_queries"] += 1
+        package_name = str(package_name)
+        folder = _project.folders.get(package_name.rsplit('/', 1)[0], ())
+        return [AssetData.from_path(p, _project.assets[p]) for p in folder if p.split('.')[0] == package_name]
+
+class AssetRegistryHelpers(object):
+    _registry = AssetRegistry()
+
+    @staticmethod
+    def get_asset_registry():
+        return AssetRegistryHelpers._registry
+
+class AssetTools(object):
+    def import_asset_tasks(self, tasks):
+        for task in tasks:
+            _project.wait("import_asset")
+            _project.stats["imports"] += 1
+            task.imported_object_paths = _import_task(task)
+            if task.save:
+                _project.wait("save_call")
+                _project.stats["save_calls"] += 1
+                for package_name in sorted(_project.dirty):
+                    _project.wait("save_package")
+                    _project.save_package(package_name)
+
+    def rename_assets(self, rename_data):
+        _project.stats["rename_calls"] += 1
+        # like the engine, a failed rename doesn't stop the others
+        return all([AssetTools._rename(str(data.old_object_path), str(data.new_object_path)) for data in rename_data])
+
+    @staticmethod
+    def _rename(old_object_path, new_object_path):
+        if old_object_path not in _project.assets or new_object_path in _project.assets:
+            return False
+        _project.wait("rename_asset")
+        _project.stats["renamed_assets"] += 1
+        asset_class, bones = _project.remove_asset(old_object_path)
+        _project.add_asset(new_object_path, asset_class, bones)
+        if old_object_path in _project.source_files:
+            _project.source_files[new_object_path] = _project.source_files.pop(old_object_path)
+        if old_object_path in _project.compression:
+            _project.compression[new_object_path] = _project.compression.pop(old_object_path)
+        _project.dirty.add(new_object_path.split('.')[0])
+        return True
+
+class AssetToolsHelpers(object):
+    _asset_tools = AssetTools()
+
+    @staticmethod
+    def get_asset_tools():
+        return AssetToolsHelpers._asset_tools
+
+def _import_task(task):
+    name = task.destination_name or os.path.splitext(os.path.basename(task.filename))[0]
+    folder = str(task.destination_path).rstrip('/')
+    options = task.options
+    created = []
+
+    def create(asset_name, asset_class, bones=None):
+        object_path = f"{folder}/{asset_name}.{asset_name}"
+        # a new animation gets the class default settings, a reimported one keeps its own
+        compression = _project.compression.get("/Script/Engine.Default__AnimSequence")
+        if object_path in _project.assets:
+            if not task.replace_existing:
+                return None
+            compression = _project.compression.get(object_path, compression)
+            _project.remove_asset(object_path)
+        _project.add_asset(object_path, asset_class, bones)
+        _project.source_files[object_path] = task.filename
+        _project.loaded.add(object_path)
+        _project.dirty.add(object_path.split('.')[0])
+        if asset_class == "AnimSequence":
+            _project.compression[object_path] = compression
+            _compress(object_path)
+        created.append(object_path)
+        get_editor_subsystem(ImportSubsystem).on_asset_post_import.broadcast(None, _CLASSES.get(asset_class, Object)(object_path))
+        return object_path
+
+    mesh_type = getattr(options, "mesh_type_to_import", None)
+    if mesh_type is FBXImportType.FBXIT_SKELETAL_MESH:
+        replaced = f"{folder}/{name}.{name}" in _project.assets
+        create(name, "SkeletalMesh")
+        if not replaced:
+            # a reimported mesh keeps its skeleton and physics asset
+            create(f"{name}_Skeleton", "Skeleton", _source_bones(task.filename))
+            create(f"{name}_PhysicsAsset", "PhysicsAsset")
+    elif mesh_type is FBXImportType.FBXIT_ANIMATION:
+        create(name, "AnimSequence")
+    else:
+        create(name, "StaticMesh")
+    # like the engine, imported_object_paths only lists the primary asset
+    return created[:1]
+
+
+def _source_bones(filename):
+    # bones of the source file when it is a readable FBX, a default rig otherwise
+    if os.path.isfile(filename):
+        import fbx_preflight
+        info = fbx_preflight.inspect_fbx(filename)
+        if info["bone_names"]:
+            return info["bone_names"], info["bone_parents"]
+    return rig_template(60)
+
+
+# editor tick
+
+def register_slate_post_tick_callback(callback):
+    handle = object()
+    _project.tick_callbacks[handle] = callback
+    return handle
+
+def unregister_slate_post_tick_callback(handle):
+    _project.tick_callbacks.pop(handle, None)
+
+
+def install(fake_project=None):
+    """
+    Makes `import unreal` return this module, backed by fake_project.
+    """
+    global _project
+    _project = fake_project or make_project()
+    _subsystems.clear()
+    _class_defaults.clear()
+    sys.modules["unreal"] = sys.modules[__name__]
+    return _project
@@ -0,0 +1,27 @@
+"""
+Stand-in for a headless editor worker of shard_import.py: batch_import.py on fake_unreal.
+
+    python benchmarks/local_worker.py batch_00.json [batch_01.json ...]
+
+FAKE_UNREAL_ASSETS sets the size of the fake project (default 1000).
+"""
+import os
+import sys
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+import fake_unreal
+
+
+def main(argv=None):
+    fake_unreal.install(fake_unreal.make_project(int(os.environ.get("FAKE_UNREAL_ASSETS", 1000))))
+    import batch_import
+    reports = batch_import.main(argv)
+    failed = sum(report["summary"].get("failed", 0) for report in reports)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
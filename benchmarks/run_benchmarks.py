@@ -0,0 +1,185 @@
+"""
+Times each importer stage against fake_unreal projects of different sizes.
+
+    python benchmarks/run_benchmarks.py --sizes 1000,10000,100000,500000
+
+Every run is appended to benchmarks/results/history.jsonl and compared with the median of
+the previous runs of the same stage, project size, latency profile and save policy. Stages that got slower
+than --threshold are reported as regressions (exit code 1 with --fail-on-regression).
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+from collections import Counter
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+import fake_unreal
+import synthetic_fbx
+
+fake_unreal.install()
+
+import ue_utils
+import fbx_preflight
+
+LATENCY_PROFILES = {
+    "default": fake_unreal.DEFAULT_LATENCY,
+    "zero": {key: 0.0 for key in fake_unreal.DEFAULT_LATENCY},
+}
+DEFAULT_HISTORY = os.path.join(BENCHMARK_DIR, "results", "history.jsonl")
+
+
+def make_sources(folder, characters, anims_per_character):
+    """
+    One skeletal mesh and anims_per_character animations per character, each character on its own rig.
+    """
+    sources = {fbx_preflight.SKELETAL_MESH: [], fbx_preflight.ANIMATION: []}
+    for c in range(characters):
+        bone_names, bone_parents = fake_unreal.rig_template(50 + 5 * c)
+        skm = os.path.join(folder, f"SKM_Char{c:03d}.fbx")
+        sources[fbx_preflight.SKELETAL_MESH].append(synthetic_fbx.write_fbx(skm, bone_names, bone_parents))
+        for a in range(anims_per_character):
+            anim = os.path.join(folder, f"ANIM_Char{c:03d}_Move{a:03d}.fbx")
+            sources[fbx_preflight.ANIMATION].append(synthetic_fbx.write_fbx(anim, bone_names, bone_parents, mesh=False, frames=60))
+    return sources
+
+def reset_caches():
+    ue_utils._content_indices.clear()
+    ue_utils._import_manifests.clear()
+    ue_utils._skeleton_caches.clear()
+
+
+class StageTimer(object):
+    def __init__(self, project):
+        self.project = project
+        self.results = {}
+
+    def __call__(self, stage, function, *args, **kwargs):
+        before = Counter(self.project.stats)
+        start = time.perf_counter()
+        value = function(*args, **kwargs)
+        seconds = time.perf_counter() - start
+        counters = {key: count for key, count in (self.project.stats - before).items() if not key.startswith("log")}
+        self.results[stage] = {"seconds": round(seconds, 6), "counters": counters}
+        return value
+
+
+def run_pipeline(asset_count, sources, latency, save_policy=ue_utils.SAVE_IMMEDIATE):
+    """
+    Runs the importer stages in order on a fresh project of asset_count assets.
+    """
+    project = fake_unreal.install(fake_unreal.make_project(asset_count, latency=latency))
+    reset_caches()
+    timer = StageTimer(project)
+    saver = ue_utils.PackageSaver(save_policy)
+    destination = "/Game/Characters/Imported"
+    skm_sources = sources[fbx_preflight.SKELETAL_MESH]
+    anim_sources = sources[fbx_preflight.ANIMATION]
+
+    timer("content_index_build", ue_utils.get_content_index)
+    preflight = timer("preflight", fbx_preflight.preflight_files, skm_sources + anim_sources)
+    timer("existing_asset_detection", ue_utils.find_existing_assets, skm_sources, 'SkeletalMesh', destination)
+
+    tasks = [ue_utils.skeletal_mesh_import_task(s, destination_path=destination, preflight=preflight[s], save_policy=save_policy) for s in skm_sources]
+    produced = timer("import_skeletal_meshes", ue_utils.run_import_tasks, tasks, saver=saver)
+    content_index = ue_utils.get_content_index()
+    new_skeletons = [p for p in produced if content_index.get(p) and content_index.get(p).asset_class == 'Skeleton']
+    timer("skeleton_validation_cold", ue_utils.validate_skeleton, new_skeletons)
+    timer("skeleton_validation_warm", ue_utils.validate_skeleton, new_skeletons)
+
+    matched, unresolved = timer("skeleton_matching", ue_utils.match_skeletons, {s: preflight[s] for s in anim_sources})
+    if unresolved:
+        print(f"  warning: {len(unresolved)} animation(s) without skeleton")
+    skeletons = {path: fake_unreal.load_object(None, path) for path in set(matched.values())}
+    tasks = [ue_utils.anim_sequence_import_task(s, skeletons[matched[s]], destination_path=destination, preflight=preflight[s], save_policy=save_policy)
+             for s in matched]
+    produced += timer("import_animations", ue_utils.run_import_tasks, tasks, saver=saver)
+    timer("post_process", ue_utils.post_process_assets, produced, saver=saver)
+    timer("save", saver.flush)
+    return timer.results
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BENCHMARK_DIR,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def find_regressions(run, history, threshold, min_delta=0.005, window=5):
+    """
+    Stages slower than the median of the last `window` comparable runs by more than threshold.
+    """
+    regressions = []
+    for size, stages in run["results"].items():
+        for stage, result in stages.items():
+            previous = [r["results"][size][stage]["seconds"] for r in history
+                        if r["latency_profile"] == run["latency_profile"] and r.get("save_policy", "immediate") == run["save_policy"]
+                        and stage in r["results"].get(size, {})][-window:]
+            if not previous:
+                continue
+            baseline = statistics.median(previous)
+            seconds = result["seconds"]
+            if seconds > baseline * (1 + threshold) and seconds - baseline > min_delta:
+                regressions.append((size, stage, baseline, seconds))
+    return regressions
+
+def print_results(run):
+    for size, stages in run["results"].items():
+        print(f"\n{int(size):,} assets")
+        for stage, result in stages.items():
+            counters = ", ".join(f"{k}={v}" for k, v in sorted(result["counters"].items()))
+            print(f"  {stage:<28}{result['seconds'] * 1000:>10.1f} ms   {counters}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importer pipeline benchmarks on a fake unreal project")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="comma separated project sizes (assets)")
+    parser.add_argument("--characters", type=int, default=4)
+    parser.add_argument("--anims", type=int, default=8, help="animations per character")
+    parser.add_argument("--latency", choices=sorted(LATENCY_PROFILES), default="default")
+    parser.add_argument("--save-policy", choices=ue_utils.SAVE_POLICIES, default=ue_utils.SAVE_IMMEDIATE)
+    parser.add_argument("--history", default=DEFAULT_HISTORY)
+    parser.add_argument("--no-history", action="store_true", help="don't record this run")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown before a stage counts as regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    run = {"timestamp": time.time(), "revision": git_revision(), "latency_profile": args.latency, "save_policy": args.save_policy,
+           "characters": args.characters, "anims": args.anims, "results": {}}
+    with tempfile.TemporaryDirectory(prefix="importer_bench_") as folder:
+        sources = make_sources(folder, args.characters, args.anims)
+        for size in sizes:
+            print(f"running {size:,} assets...")
+            run["results"][str(size)] = run_pipeline(size, sources, LATENCY_PROFILES[args.latency], args.save_policy)
+    print_results(run)
+
+    history = load_history(args.history)
+    regressions = find_regressions(run, history, args.threshold)
+    for size, stage, baseline, seconds in regressions:
+        print(f"REGRESSION {stage} @ {int(size):,} assets: {baseline * 1000:.1f} ms -> {seconds * 1000:.1f} ms")
+    if not args.no_history:
+        os.makedirs(os.path.dirname(args.history), exist_ok=True)
+        with open(args.history, "a") as f:
+            f.write(json.dumps(run) + "\n")
+    if regressions and args.fail_on_regression:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
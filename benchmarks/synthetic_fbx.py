@@ -0,0 +1,70 @@
+"""
+Writes small binary FBX files (7.5 format) for benchmarks: skinned meshes and animations on a
+given bone hierarchy. Only the nodes fbx_preflight reads are written, plus a vertex array so
+files have a realistic geometry payload to skip.
+"""
+import struct
+import zlib
+
+KTIME_PER_SECOND = 46186158000
+HEADER = struct.Struct("<QQQB")
+
+
+def _property(value):
+    if isinstance(value, str):
+        raw = value.encode("utf-8")
+        return b"S" + struct.pack("<I", len(raw)) + raw
+    if isinstance(value, float):
+        return b"D" + struct.pack("<d", value)
+    if isinstance(value, (list, tuple)):
+        raw = zlib.compress(struct.pack(f"<{len(value)}d", *value))
+        return b"d" + struct.pack("<III", len(value), 1, len(raw)) + raw
+    return b"L" + struct.pack("<q", value)
+
+def _node(name, properties=(), children=()):
+    # returns a writer, node records need their absolute end offset
+    def write(offset):
+        props = b"".join(_property(p) for p in properties)
+        body_offset = offset + HEADER.size + len(name) + len(props)
+        body = b""
+        for child in children:
+            body += child(body_offset + len(body))
+        if children:
+            body += b"\0" * HEADER.size
+        end_offset = body_offset + len(body)
+        return HEADER.pack(end_offset, len(properties), len(props), len(name)) + name.encode("ascii") + props + body
+    return write
+
+def _p(name, type_name, value):
+    return _node("P", [name, type_name, "", "", value])
+
+def write_fbx(path, bone_names, bone_parents, mesh=True, frames=0, frame_rate_mode=11, vertex_count=3000):
+    """
+    frames: animation length in frames at 24 fps (frame_rate_mode 11), 0 for no animation
+    """
+    objects, connections = [], []
+    for i, name in enumerate(bone_names):
+        objects.append(_node("Model", [1000 + i, f"{name}\x00\x01Model", "LimbNode"]))
+        parent = bone_parents[i]
+        connections.append(_node("C", ["OO", 1000 + i, 1000 + parent if parent >= 0 else 0]))
+    if mesh:
+        objects.append(_node("Geometry", [10, "Body\x00\x01Geometry", "Mesh"], [_node("Vertices", [[0.0] * vertex_count])]))
+        objects.append(_node("Model", [11, "Body\x00\x01Model", "Mesh"]))
+        objects.append(_node("Deformer", [20, "Skin\x00\x01Deformer", "Skin"]))
+    if frames:
+        stop = int(frames * KTIME_PER_SECOND / 24)
+        objects.append(_node("AnimationStack", [30, "Take\x00\x01AnimStack", ""],
+                             [_node("Properties70", [], [_p("LocalStart", "KTime", 0), _p("LocalStop", "KTime", stop)])]))
+        for i in range(min(len(bone_names), 20)):
+            objects.append(_node("AnimationCurve", [40 + i, "\x00\x01AnimCurve", ""], [_node("KeyValueFloat", [[0.0] * frames])]))
+
+    top_level = [_node("GlobalSettings", [], [_node("Properties70", [], [_p("TimeMode", "enum", frame_rate_mode)])]),
+                 _node("Objects", [], objects),
+                 _node("Connections", [], connections)]
+    data = b"Kaydara FBX Binary  \x00\x1a\x00" + struct.pack("<I", 7500)
+    for node in top_level:
+        data += node(len(data))
+    data += b"\0" * HEADER.size
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
@@ -0,0 +1,403 @@
+"""
+FBX pre-flight checks, run before anything is handed to the editor.
+
+Parses FBX headers and node trees (binary and ASCII) without the FBX SDK and extracts
+what the importer needs to know up front: mesh / skeleton / animation presence, bone names
+and hierarchy, animation frame range and the file hash. Files are parsed in a process pool
+so a large batch is classified in parallel, outside of the editor process.
+
+This module must not import unreal, it is imported by the worker processes.
+"""
+import os
+import re
+import sys
+import struct
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+FBX_BINARY_MAGIC = b"Kaydara FBX Binary  \x00"
+KTIME_PER_SECOND = 46186158000
+
+# GlobalSettings TimeMode enum -> frames per second
+TIME_MODE_FPS = {0: 30.0, 1: 120.0, 2: 100.0, 3: 60.0, 4: 50.0, 5: 48.0, 6: 30.0, 7: 30.0,
+                 8: 29.97, 9: 29.97, 10: 25.0, 11: 24.0, 12: 1000.0, 13: 23.976,
+                 15: 96.0, 16: 72.0, 17: 59.94, 18: 119.88}
+CUSTOM_TIME_MODE = 14
+
+BONE_MODEL_TYPES = ("LimbNode", "Root")
+
+SKELETAL_MESH = "skeletal_mesh"
+ANIMATION = "animation"
+STATIC_MESH = "static_mesh"
+UNKNOWN = "unknown"
+
+# filename conventions used by the team, only used as a hint next to the file content
+NAME_HINTS = (("SKM_", SKELETAL_MESH), ("ANIM_", ANIMATION))
+
+
+class PreflightError(ValueError):
+    pass
+
+
+def file_hash(path, block_size=1 << 20):
+    sha1 = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            sha1.update(block)
+    return sha1.hexdigest()
+
+
+class _Scene(object):
+    """
+    Subset of an FBX scene, filled by either the binary or the ASCII reader.
+    """
+    def __init__(self):
+        self.version = None
+        self.models = {}       # id -> (name, type)
+        self.geometries = []   # geometry types ("Mesh", "Shape", ...)
+        self.deformers = []    # deformer types ("Skin", "Cluster", ...)
+        self.curve_count = 0
+        self.stacks = []       # [local start, local stop] in KTime per animation stack
+        self.connections = []  # (child id, parent id) object-object connections
+        self.time_mode = None
+        self.custom_frame_rate = None
+        self.time_span = [None, None]
+
+
+# binary reader
+
+def _read_binary(data):
+    scene = _Scene()
+    scene.version = struct.unpack_from("<I", data, 23)[0]
+    wide = scene.version >= 7500
+    header = struct.Struct("<QQQB" if wide else "<IIIB")
+
+    def read_properties(offset, count):
+        values = []
+        for _ in range(count):
+            code = data[offset:offset + 1]
+            offset += 1
+            if code == b"Y":
+                values.append(struct.unpack_from("<h", data, offset)[0]); offset += 2
+            elif code == b"C":
+                values.append(bool(data[offset])); offset += 1
+            elif code == b"I":
+                values.append(struct.unpack_from("<i", data, offset)[0]); offset += 4
+            elif code == b"F":
+                values.append(struct.unpack_from("<f", data, offset)[0]); offset += 4
+            elif code == b"D":
+                values.append(struct.unpack_from("<d", data, offset)[0]); offset += 8
+            elif code == b"L":
+                values.append(struct.unpack_from("<q", data, offset)[0]); offset += 8
+            elif code in (b"S", b"R"):
+                length = struct.unpack_from("<I", data, offset)[0]
+                raw = bytes(data[offset + 4:offset + 4 + length])
+                values.append(raw.decode("utf-8", "replace") if code == b"S" else raw)
+                offset += 4 + length
+            elif code in (b"f", b"d", b"l", b"i", b"b"):
+                # arrays are never needed here, skip them without decompressing
+                _, _, compressed_length = struct.unpack_from("<III", data, offset)
+                values.append(None)
+                offset += 12 + compressed_length
+            else:
+                raise PreflightError(f"Unknown FBX property type {code!r} at offset {offset - 1}")
+        return values
+
+    def read_node(offset):
+        end_offset, property_count, property_length, name_length = header.unpack_from(data, offset)
+        if end_offset == 0:
+            return None, offset + header.size
+        offset += header.size
+        name = bytes(data[offset:offset + name_length]).decode("ascii", "replace")
+        offset += name_length
+        properties = read_properties(offset, property_count)
+        offset += property_length
+        children = []
+        # geometry and curve payloads are large and not needed, jump over them
+        if name not in ("Geometry", "AnimationCurve"):
+            while offset < end_offset:
+                child, offset = read_node(offset)
+                if child is None:
+                    break
+                children.append(child)
+        return (name, properties, children), end_offset
+
+    offset = 27
+    top_level = []
+    while offset + header.size <= len(data):
+        node, offset = read_node(offset)
+        if node is None:
+            break
+        top_level.append(node)
+
+    for name, properties, children in top_level:
+        if name == "GlobalSettings":
+            _read_binary_global_settings(scene, children)
+        elif name == "Objects":
+            _read_binary_objects(scene, children)
+        elif name == "Connections":
+            for child_name, values, _ in children:
+                if child_name == "C" and len(values) >= 3 and values[0] == "OO":
+                    scene.connections.append((values[1], values[2]))
+    return scene
+
+def _binary_properties70(children):
+    props = {}
+    for name, properties, grandchildren in children:
+        if name == "Properties70":
+            for p_name, values, _ in grandchildren:
+                if p_name == "P" and len(values) >= 5:
+                    props[values[0]] = values[4]
+    return props
+
+def _read_binary_global_settings(scene, children):
+    props = _binary_properties70(children)
+    scene.time_mode = props.get("TimeMode")
+    scene.custom_frame_rate = props.get("CustomFrameRate")
+    scene.time_span = [props.get("TimeSpanStart"), props.get("TimeSpanStop")]
+
+def _read_binary_objects(scene, children):
+    for name, values, grandchildren in children:
+        object_type = values[2] if len(values) >= 3 else ""
+        if name == "Model":
+            # binary names are stored as "Name\x00\x01Model"
+            scene.models[values[0]] = (values[1].split("\x00\x01")[0], object_type)
+        elif name == "Geometry":
+            scene.geometries.append(object_type)
+        elif name == "Deformer":
+            scene.deformers.append(object_type)
+        elif name == "AnimationCurve":
+            scene.curve_count += 1
+        elif name == "AnimationStack":
+            props = _binary_properties70(grandchildren)
+            scene.stacks.append([props.get("LocalStart"), props.get("LocalStop")])
+
+
+# ASCII reader
+
+_ASCII_PATTERNS = {
+    "model": re.compile(r'^\s*Model:\s*(-?\d+),\s*"Model::([^"]*)",\s*"(\w*)"', re.M),
+    "geometry": re.compile(r'^\s*Geometry:\s*-?\d+,\s*"Geometry::[^"]*",\s*"(\w*)"', re.M),
+    "deformer": re.compile(r'^\s*Deformer:\s*-?\d+,\s*"(?:Sub)?Deformer::[^"]*",\s*"(\w*)"', re.M),
+    "curve": re.compile(r'^\s*AnimationCurve:\s*-?\d+', re.M),
+    "stack": re.compile(r'^\s*AnimationStack:\s*-?\d+', re.M),
+    "connection": re.compile(r'^\s*C:\s*"OO",\s*(-?\d+),\s*(-?\d+)', re.M),
+    "version": re.compile(r'FBXVersion:\s*(\d+)'),
+}
+
+def _ascii_property(text, name):
+    match = re.search(r'P:\s*"%s",\s*"[^"]*",\s*"[^"]*",\s*"[^"]*",\s*([-\d.eE+]+)' % name, text)
+    if match is None:
+        return None
+    value = match.group(1)
+    return float(value) if any(c in value for c in ".eE") else int(value)
+
+def _read_ascii(text):
+    scene = _Scene()
+    match = _ASCII_PATTERNS["version"].search(text)
+    scene.version = int(match.group(1)) if match else None
+    for object_id, name, object_type in _ASCII_PATTERNS["model"].findall(text):
+        scene.models[int(object_id)] = (name, object_type)
+    scene.geometries = _ASCII_PATTERNS["geometry"].findall(text)
+    scene.deformers = _ASCII_PATTERNS["deformer"].findall(text)
+    scene.curve_count = len(_ASCII_PATTERNS["curve"].findall(text))
+    scene.connections = [(int(c), int(p)) for c, p in _ASCII_PATTERNS["connection"].findall(text)]
+
+    global_settings = text.find("GlobalSettings:")
+    if global_settings >= 0:
+        settings = text[global_settings:text.find("\n}", global_settings)]
+        scene.time_mode = _ascii_property(settings, "TimeMode")
+        scene.custom_frame_rate = _ascii_property(settings, "CustomFrameRate")
+        scene.time_span = [_ascii_property(settings, "TimeSpanStart"), _ascii_property(settings, "TimeSpanStop")]
+
+    stacks = [m.start() for m in _ASCII_PATTERNS["stack"].finditer(text)]
+    for start in stacks:
+        block = text[start:text.find("\n\t}", start)]
+        scene.stacks.append([_ascii_property(block, "LocalStart"), _ascii_property(block, "LocalStop")])
+    return scene
+
+
+# summary
+
+def _bone_hierarchy(scene):
+    """
+    Returns bone names and parent indices, parents always come before their children.
+    """
+    bones = {object_id: name for object_id, (name, object_type) in scene.models.items() if object_type in BONE_MODEL_TYPES}
+    parent_of = {}
+    for child, parent in scene.connections:
+        if child in bones and parent in bones:
+            parent_of[child] = parent
+    children_of = {}
+    for object_id in bones:
+        children_of.setdefault(parent_of.get(object_id), []).append(object_id)
+
+    names, parents = [], []
+    index_of = {}
+    stack = [(root, -1) for root in reversed(children_of.get(None, []))]
+    while stack:
+        object_id, parent_index = stack.pop()
+        index_of[object_id] = len(names)
+        names.append(bones[object_id])
+        parents.append(parent_index)
+        for child in reversed(children_of.get(object_id, [])):
+            stack.append((child, index_of[object_id]))
+    return names, parents
+
+def _frame_rate(scene):
+    if scene.time_mode == CUSTOM_TIME_MODE and scene.custom_frame_rate:
+        return float(scene.custom_frame_rate)
+    return TIME_MODE_FPS.get(scene.time_mode, 30.0)
+
+def _frame_range(scene, frame_rate):
+    start, stop = None, None
+    for local_start, local_stop in scene.stacks:
+        if local_start is not None and local_stop is not None:
+            start, stop = local_start, local_stop
+            break
+    if start is None:
+        start, stop = scene.time_span
+    if start is None or stop is None:
+        return None
+    return (int(round(start * frame_rate / KTIME_PER_SECOND)), int(round(stop * frame_rate / KTIME_PER_SECOND)))
+
+def name_hint(path):
+    file_name = os.path.basename(path)
+    for prefix, kind in NAME_HINTS:
+        if prefix in file_name:
+            return kind
+    return None
+
+def classify(info):
+    """
+    Decides what a file should be imported as. The SKM_/ANIM_ naming convention wins when the
+    file content supports it, otherwise the content decides.
+    """
+    skinned = info["has_mesh"] and info["has_skeleton"]
+    animated = info["has_skeleton"] and info["has_animation"]
+    hint = name_hint(info["path"])
+    if hint == SKELETAL_MESH and skinned:
+        return SKELETAL_MESH
+    if hint == ANIMATION and animated:
+        return ANIMATION
+    if hint is None:
+        if skinned:
+            return SKELETAL_MESH
+        if animated:
+            return ANIMATION
+        if info["has_mesh"]:
+            return STATIC_MESH
+    return UNKNOWN
+
+def problems(info, kind):
+    """
+    Returns the reasons why a file can't be imported as the given kind, empty if it can.
+    """
+    if info["errors"]:
+        return list(info["errors"])
+    found = []
+    if kind == SKELETAL_MESH:
+        if not info["has_mesh"]:
+            found.append("no mesh geometry")
+        if not info["has_skeleton"]:
+            found.append("no skeleton (no LimbNode bones)")
+    elif kind == ANIMATION:
+        if not info["has_skeleton"]:
+            found.append("no skeleton (no LimbNode bones)")
+        if not info["has_animation"]:
+            found.append("no animation curves")
+        frame_range = info["frame_range"]
+        if frame_range is not None and frame_range[1] <= frame_range[0]:
+            found.append(f"empty frame range {frame_range}")
+    return found
+
+def check(info, kind):
+    # raises PreflightError if the file can't be imported as kind
+    found = problems(info, kind)
+    if found:
+        raise PreflightError(f"{info['path']}: {', '.join(found)}")
+    return info
+
+def inspect_fbx(path):
+    """
+    Parses one FBX file. Never raises, parse failures end up in info["errors"].
+    """
+    info = {"path": path, "hash": None, "size": None, "version": None, "format": None,
+            "has_mesh": False, "has_skeleton": False, "has_animation": False,
+            "bone_names": [], "bone_parents": [], "bone_count": 0,
+            "frame_range": None, "frame_rate": None, "kind": UNKNOWN, "errors": []}
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        info["size"] = len(data)
+        info["hash"] = hashlib.sha1(data).hexdigest()
+        if data.startswith(FBX_BINARY_MAGIC):
+            info["format"] = "binary"
+            scene = _read_binary(memoryview(data))
+        elif data[:1024].lstrip()[:5] in (b"; FBX", b"FBXHe"):
+            info["format"] = "ascii"
+            scene = _read_ascii(data.decode("utf-8", "replace"))
+        else:
+            raise PreflightError("not an FBX file")
+    except Exception as e:
+        info["errors"].append(f"{type(e).__name__}: {e}")
+        return info
+
+    info["version"] = scene.version
+    info["has_mesh"] = "Mesh" in scene.geometries
+    names, parents = _bone_hierarchy(scene)
+    info["bone_names"], info["bone_parents"], info["bone_count"] = names, parents, len(names)
+    info["has_skeleton"] = bool(names)
+    info["has_animation"] = scene.curve_count > 0
+    if info["has_animation"]:
+        info["frame_rate"] = _frame_rate(scene)
+        info["frame_range"] = _frame_range(scene, info["frame_rate"])
+    info["kind"] = classify(info)
+    return info
+
+
+# process pool
+
+def _python_executable():
+    # inside the editor sys.executable is UnrealEditor, spawn the bundled interpreter instead
+    if os.path.basename(sys.executable).lower().startswith("python"):
+        return sys.executable
+    for prefix in (sys.prefix, sys.base_prefix, sys.exec_prefix):
+        for candidate in (os.path.join(prefix, "python.exe"), os.path.join(prefix, "bin", "python3")):
+            if os.path.isfile(candidate):
+                return candidate
+    return None
+
+def expand_sources(sources):
+    """
+    FBX files of a list of files and folders (searched recursively), in order, without duplicates.
+    """
+    files = list()
+    for source in sources:
+        if os.path.isdir(source):
+            for folder, _, file_names in sorted(os.walk(source)):
+                files.extend(os.path.join(folder, name) for name in sorted(file_names) if name.lower().endswith(".fbx"))
+        else:
+            files.append(source)
+    return list(dict.fromkeys(os.path.normpath(f) for f in files))
+
+def preflight_files(paths, max_workers=None):
+    """
+    Inspects FBX files in parallel. Returns {path: info}.
+    Falls back to the current process when no worker processes can be started.
+    """
+    paths = list(dict.fromkeys(paths))
+    executable = _python_executable()
+    if len(paths) > 1 and executable:
+        context = multiprocessing.get_context("spawn")
+        context.set_executable(executable)
+        workers = min(max_workers or os.cpu_count() or 1, len(paths))
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                chunk_size = max(1, len(paths) // (workers * 4))
+                return {info["path"]: info for info in pool.map(inspect_fbx, paths, chunksize=chunk_size)}
+        except (BrokenProcessPool, OSError) as e:
+            print(f"[preflight] process pool unavailable ({e}), inspecting in process")
+    return {path: inspect_fbx(path) for path in paths}
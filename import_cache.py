@@ -0,0 +1,149 @@
+"""
+Import manifest used to skip re-importing source files that haven't changed.
+
+For every imported source the manifest records size, mtime, content hash, the import options
+used and the resulting asset. A source is unchanged when size and mtime still match, or when
+only the mtime moved but the content hash is the same.
+"""
+import os
+import json
+import time
+import hashlib
+
+import fbx_preflight
+
+MANIFEST_VERSION = 1
+
+
+def options_key(kind, destination_path, **options):
+    # stable digest of the import settings that affect the resulting asset
+    settings = dict(options, kind=kind, destination_path=destination_path)
+    return hashlib.sha1(json.dumps(settings, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+def source_key(path):
+    return os.path.normcase(os.path.abspath(path))
+
+
+class ImportManifest(object):
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}  # source key -> entry dict
+        self.by_asset = {}  # asset path -> source keys, renames don't scan every entry
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[import cache] ignoring unreadable manifest {self.path}: {e}")
+            return
+        if data.get("version") == MANIFEST_VERSION:
+            self.entries = data.get("entries", {})
+            self.by_asset = {}
+            for key, entry in self.entries.items():
+                self.by_asset.setdefault(entry["asset_path"], set()).add(key)
+
+    def save(self):
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"version": MANIFEST_VERSION, "entries": self.entries}, f, indent=1, sort_keys=True)
+        os.replace(temp_path, self.path)
+        self.dirty = False
+
+    def get(self, source):
+        return self.entries.get(source_key(source))
+
+    def is_unchanged(self, source, key, file_hash=None, asset_exists=None):
+        """
+        True if source was imported before with the same options and hasn't changed since.
+        file_hash: known hash of source, avoids hashing it again (e.g. from preflight)
+        asset_exists: callable(asset path) -> bool, a deleted asset is never a cache hit
+        """
+        entry = self.get(source)
+        if entry is None or entry["options"] != key:
+            return False
+        if asset_exists is not None and not asset_exists(entry["asset_path"]):
+            return False
+        try:
+            stat = os.stat(source)
+        except OSError:
+            return False
+        if stat.st_size != entry["size"]:
+            return False
+        if stat.st_mtime == entry["mtime"]:
+            return True
+        # touched but maybe not modified, compare content
+        if (file_hash or fbx_preflight.file_hash(source)) != entry["hash"]:
+            return False
+        entry["mtime"] = stat.st_mtime
+        self.dirty = True
+        return True
+
+    def is_stamp_unchanged(self, source):
+        """
+        True if source was imported before and its size and mtime still match, whatever the
+        options. Cheap pre-filter, is_unchanged decides once the options are known.
+        """
+        entry = self.get(source)
+        if entry is None:
+            return False
+        try:
+            stat = os.stat(source)
+        except OSError:
+            return False
+        return stat.st_size == entry["size"] and stat.st_mtime == entry["mtime"]
+
+    def _set_entry(self, key, entry):
+        current = self.entries.get(key)
+        if current is not None:
+            self._unindex(key, current["asset_path"])
+        self.entries[key] = entry
+        self.by_asset.setdefault(entry["asset_path"], set()).add(key)
+
+    def _unindex(self, key, asset_path):
+        keys = self.by_asset.get(asset_path)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.by_asset[asset_path]
+
+    def record(self, source, key, asset_path, file_hash=None):
+        stat = os.stat(source)
+        self._set_entry(source_key(source), {
+            "source": source,
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "hash": file_hash or fbx_preflight.file_hash(source),
+            "options": key,
+            "asset_path": asset_path,
+            "imported_at": time.time(),
+        })
+        self.dirty = True
+
+    def rename_asset(self, old_asset_path, new_asset_path):
+        for key in self.by_asset.pop(old_asset_path, ()):
+            self.entries[key]["asset_path"] = new_asset_path
+            self.by_asset.setdefault(new_asset_path, set()).add(key)
+            self.dirty = True
+
+    def merge(self, other):
+        """
+        Takes over the entries of another manifest that are newer than ours.
+        Returns how many entries changed.
+        """
+        changed = 0
+        for key, entry in other.entries.items():
+            current = self.entries.get(key)
+            if current is None or entry["imported_at"] > current["imported_at"]:
+                self._set_entry(key, entry)
+                changed += 1
+        if changed:
+            self.dirty = True
+        return changed
@@ -0,0 +1,226 @@
+"""
+Append-only journal of an import batch, to resume it after a crash or a hang.
+
+The first record holds the batch settings (destination, mode, save policy, ...), every
+following record one state change of a source:
+
+    queued          part of the batch
+    importing       import task started, an attempt
+    imported        import task done, assets in memory only (deferred saving)
+    saved           assets written to disk
+    post_processed  assets renamed
+    failed          import produced nothing, not retried
+    skipped         nothing to do (cache hit, planned as skip, rejected by preflight, ...)
+
+A source is finished when it failed, was skipped, or is saved and post-processed (saved only
+if the batch doesn't post-process). Resuming imports the unfinished sources again, except the
+saved ones that only miss post-processing. A source that was importing when the process died
+`max_attempts` times is the likely cause and isn't retried.
+
+Records are single JSON lines, flushed as they are written: appending costs a few
+microseconds and survives an editor crash (not a power cut, nothing is fsynced). A torn last
+line is ignored when loading.
+"""
+import os
+import json
+import time
+from collections import Counter
+
+QUEUED = "queued"
+IMPORTING = "importing"
+IMPORTED = "imported"
+SAVED = "saved"
+POST_PROCESSED = "post_processed"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+# what a resumed source still needs
+NEEDS_IMPORT = "import"
+NEEDS_POST_PROCESS = "post_process"
+
+
+class ImportJournal(object):
+    def __init__(self, path, batch=None, max_attempts=2):
+        """
+        batch: settings of a new batch, written as the first record. Without it the journal
+        at path is loaded and appended to.
+        """
+        self.path = path
+        self.max_attempts = max_attempts
+        self.batch = dict()
+        self.states = dict()  # source -> states reached by its last attempt
+        self.assets = dict()  # source -> object paths of its last attempt
+        self.attempts = Counter()  # source -> importing records
+        self.errors = dict()
+        self._asset_sources = dict()  # object path -> source, maps saved packages back
+        self._saved_early = set()  # saved before the running import was recorded (bulk save inside the import call)
+        if batch is None:
+            self.load()
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self.batch = dict(batch, started=time.time())
+        self._file = open(path, "a" if batch is None else "w", encoding="utf-8")
+        if batch is not None:
+            self._write(dict(self.batch, state="batch"))
+        elif self._torn:
+            # start after the torn line instead of continuing it
+            self._write_line("")
+
+    def load(self):
+        self._torn = False
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                self._torn = not line.endswith("\n")
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # torn write of a crashed process
+                    continue
+                self._apply(record)
+
+    def _apply(self, record):
+        state = record.pop("state")
+        if state == "batch":
+            self.batch = record
+        elif state == QUEUED:
+            for source in record["sources"]:
+                self.states.setdefault(source, {QUEUED})
+        elif state == SAVED:
+            for object_path in record["assets"]:
+                source = self._asset_sources.get(object_path)
+                if source is not None:
+                    self.states[source].add(SAVED)
+                else:
+                    self._saved_early.add(object_path)
+        else:
+            source = record["source"]
+            if state == IMPORTING:
+                # a new attempt starts over. Imports run one at a time, earlier unmapped saves
+                # don't belong to it
+                self.states[source] = {QUEUED, IMPORTING}
+                self.attempts[source] += 1
+                self._set_assets(source, [])
+                self._saved_early.clear()
+            else:
+                self.states.setdefault(source, {QUEUED}).add(state)
+            if "assets" in record:
+                self._set_assets(source, record["assets"])
+            if record.get("saved") or (state == IMPORTED and self._saved_early.intersection(record["assets"])):
+                self.states[source].add(SAVED)
+            if "error" in record:
+                self.errors[source] = record["error"]
+
+    def _set_assets(self, source, object_paths):
+        for object_path in self.assets.get(source, ()):
+            self._asset_sources.pop(object_path, None)
+        self.assets[source] = list(object_paths)
+        for object_path in object_paths:
+            self._asset_sources[object_path] = source
+
+    def _write(self, record):
+        self._write_line(json.dumps(record, separators=(",", ":")))
+
+    def _write_line(self, line):
+        self._file.write(line + "\n")
+        self._file.flush()
+
+    def _record(self, state, **data):
+        record = dict(data, state=state)
+        self._write(record)
+        self._apply(record)
+
+    def queue(self, sources):
+        sources = [source for source in sources if source not in self.states]
+        if sources:
+            self._record(QUEUED, sources=sources)
+
+    def importing(self, source):
+        self._record(IMPORTING, source=source)
+
+    def imported(self, source, object_paths, saved=False):
+        # saved: the import task saved the assets itself
+        if saved:
+            self._record(IMPORTED, source=source, assets=list(object_paths), saved=True)
+        else:
+            self._record(IMPORTED, source=source, assets=list(object_paths))
+
+    def saved(self, object_paths):
+        # object paths of any sources, e.g. one bulk save
+        if object_paths:
+            self._record(SAVED, assets=list(object_paths))
+
+    def post_processed(self, source, object_paths):
+        # object_paths: after renaming
+        self._record(POST_PROCESSED, source=source, assets=list(object_paths))
+
+    def failed(self, source, error):
+        self._record(FAILED, source=source, error=str(error))
+
+    def skipped(self, source, reason):
+        self._record(SKIPPED, source=source, error=str(reason))
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def is_finished(self, source):
+        states = self.states.get(source, set())
+        if states & {FAILED, SKIPPED}:
+            return True
+        return SAVED in states and (POST_PROCESSED in states or not self.batch.get("post_process", True))
+
+    def crashed(self):
+        """
+        Sources that were being imported when the process died max_attempts times.
+        """
+        return [source for source, states in self.states.items()
+                if self.attempts[source] >= self.max_attempts and IMPORTING in states and not states - {QUEUED, IMPORTING}]
+
+    def unfinished(self):
+        """
+        Returns {source: NEEDS_IMPORT or NEEDS_POST_PROCESS}, in queue order, without the
+        crashed() sources.
+        """
+        crashed = set(self.crashed())
+        remaining = dict()
+        for source, states in self.states.items():
+            if source in crashed or self.is_finished(source):
+                continue
+            remaining[source] = NEEDS_POST_PROCESS if SAVED in states else NEEDS_IMPORT
+        return remaining
+
+    def summary(self):
+        return dict(Counter("finished" if self.is_finished(source) else "unfinished" for source in self.states),
+                    crashed=len(self.crashed()))
+
+
+def new_journal_path(folder, name="batch"):
+    return os.path.join(folder, f"{name}_{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}.jsonl")
+
+def _journals(folder):
+    # oldest first
+    if not os.path.isdir(folder):
+        return []
+    paths = [os.path.join(folder, name) for name in os.listdir(folder) if name.endswith(".jsonl")]
+    return sorted(paths, key=_mtime)
+
+def _mtime(path):
+    # another worker may prune the journal meanwhile
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+def prune(folder, keep=20):
+    # concurrent shard workers prune the same folder, a journal may already be gone
+    for old_path in _journals(folder)[:-keep]:
+        try:
+            os.remove(old_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"[journal] could not remove {old_path}: {e}")
+
+def latest_journal(folder):
+    journals = _journals(folder)
+    return journals[-1] if journals else None
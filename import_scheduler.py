@@ -0,0 +1,336 @@
+import time
+import heapq
+import contextlib
+import unreal
+
+import ue_utils
+import import_trace
+
+
+class ImportScheduler(object):
+    """
+    Splits a list of import tasks into chunks and imports one chunk per editor tick.
+    Asset imports have to run on the game thread, so instead of a worker thread the chunks
+    are driven by a slate post-tick callback. Between two chunks the editor (and Qt) keep
+    processing events, which is also where a cancel request is picked up.
+    saver: ue_utils.PackageSaver for tasks built with a deferred save policy, flushed when
+    the scheduler finishes (cancelled or not)
+    memory: ue_utils.MemoryBudget, chunks are sized by it and their packages saved and
+    unloaded once it is full
+    """
+    def __init__(self, tasks, chunk_size=4, root="/Game", saver=None, memory=None):
+        self.tasks = list(tasks)
+        self.chunk_size = max(1, int(chunk_size))
+        self.root = root
+        self.saver = saver
+        self.memory = memory
+        self.cursor = 0
+        self.produced = list()  # object paths produced by the imported chunks
+        self.cancelled = False
+        self.finished = False
+        self.start_time = None
+        self.end_time = None
+        self.progress_callbacks = list()  # callback(scheduler, current asset files)
+        self.finished_callbacks = list()  # callback(scheduler)
+        self._tick_handle = None
+
+    @property
+    def total(self):
+        return len(self.tasks)
+
+    @property
+    def done(self):
+        return self.cursor
+
+    def elapsed(self):
+        if self.start_time is None:
+            return 0.0
+        return (self.end_time or time.perf_counter()) - self.start_time
+
+    def throughput(self):
+        # assets per second
+        elapsed = self.elapsed()
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def eta(self):
+        # seconds left, estimated from the throughput so far
+        throughput = self.throughput()
+        if not throughput:
+            return 0.0
+        return (self.total - self.done) / throughput
+
+    def run_blocking(self):
+        # previous behaviour, every task in a single import_asset_tasks call
+        self.start_time = time.perf_counter()
+        if self.memory is not None:
+            # chunked all the same, without giving the editor a tick in between
+            while self.step():
+                pass
+            self._finish()
+            return self.produced
+        self._notify_progress([task.filename for task in self.tasks])
+        if self.tasks:
+            self.produced.extend(ue_utils.run_import_tasks(self.tasks, self.root, self.saver))
+        self.cursor = self.total
+        self._finish()
+        return self.produced
+
+    def start(self):
+        self.start_time = time.perf_counter()
+        if not self.total:
+            self._finish()
+            return
+        self._tick_handle = unreal.register_slate_post_tick_callback(self._on_tick)
+
+    def completed_tasks(self):
+        return self.tasks[:self.cursor]
+
+    def cancel(self):
+        # takes effect before the next chunk, the chunk in flight always completes
+        self.cancelled = True
+
+    def step(self):
+        """
+        Imports the next chunk. Returns False once there is nothing left to do.
+        """
+        if self.cancelled or self.cursor >= self.total:
+            return False
+        chunk_size = self.memory.chunk_size if self.memory is not None else self.chunk_size
+        chunk = self.tasks[self.cursor:self.cursor + chunk_size]
+        with import_trace.span(f"chunk at {self.cursor}", "asset", files=[task.filename for task in chunk]):
+            produced = ue_utils.run_import_tasks(chunk, self.root, self.saver)
+        self.produced.extend(produced)
+        self.cursor += len(chunk)
+        if self.memory is not None and self.memory.add(produced, len(chunk)):
+            self.memory.release(self.saver)
+        self._notify_progress([task.filename for task in chunk])
+        return self.cursor < self.total and not self.cancelled
+
+    def _on_tick(self, delta_seconds):
+        if self.finished:
+            return
+        try:
+            more = self.step()
+        except Exception as e:
+            unreal.log_error(f"Import chunk failed: {e}")
+            self.cancelled = True
+            more = False
+        if not more:
+            self._finish()
+
+    def _notify_progress(self, current_files):
+        for callback in self.progress_callbacks:
+            callback(self, current_files)
+
+    def _finish(self):
+        if self._tick_handle is not None:
+            unreal.unregister_slate_post_tick_callback(self._tick_handle)
+            self._tick_handle = None
+        if self.saver is not None:
+            self.saver.flush()
+        if self.memory is not None:
+            self.memory.release()
+        self.end_time = time.perf_counter()
+        self.finished = True
+        state = "cancelled" if self.cancelled else "finished"
+        unreal.log(f"Import {state}: {self.done}/{self.total} assets in {self.elapsed():.1f}s")
+        for callback in self.finished_callbacks:
+            callback(self)
+
+
+IMPORT = "import"
+VALIDATE = "validate"
+POST_PROCESS = "post_process"
+# follow-up stages go first, so finished characters are completed while the next ones import
+STAGE_ORDER = {POST_PROCESS: 0, VALIDATE: 1, IMPORT: 2}
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+class ImportNode(object):
+    """
+    One step of an import graph. run(node) returns the node's result, the results of the
+    nodes it depends on are in node.inputs.
+    """
+    def __init__(self, key, stage, run, depends_on=(), source=None):
+        self.key = key
+        self.stage = stage
+        self.run = run
+        self.depends_on = list(depends_on)
+        self.dependents = list()
+        self.source = source
+        self.state = PENDING
+        self.result = None
+        self.error = None
+        self.task = None  # import task, for import nodes
+        self.order = 0
+        self.seconds = 0.0
+        self.waiting = len(self.depends_on)
+
+    @property
+    def inputs(self):
+        return [node.result for node in self.depends_on]
+
+
+class ImportGraphScheduler(ImportScheduler):
+    """
+    Runs a dependency graph of import steps (skeletal mesh -> validation -> renaming, skeleton
+    -> animations, ...) on the editor tick. A node is ready as soon as everything it depends
+    on is done, every tick runs a batch of up to chunk_size ready nodes. Independent branches
+    interleave: one character is validated and renamed between the imports of the next.
+    Everything still runs on the game thread, the overlap is per tick, not concurrent.
+    journal: import_journal.ImportJournal the import and post-process steps are recorded in
+    imported_callbacks: callback(node) for every import node that produced assets, before
+    anything depending on it runs (post-process renames)
+    With a memory budget a batch stops early once memory is above its ceiling, and once the
+    budget is full the packages no pending step needs are saved and unloaded.
+    """
+    def __init__(self, chunk_size=4, root="/Game", saver=None, journal=None, memory=None):
+        super().__init__([], chunk_size, root, saver, memory)
+        self.journal = journal
+        self.nodes = list()
+        self.ready = list()  # heap of (stage order, insertion order, node)
+        self.finished_nodes = 0
+        # progress is counted in assets, validate and post-process nodes only add to the graph
+        self.import_nodes = 0
+        self.finished_imports = 0
+        self.imported_callbacks = list()  # callback(import node)
+
+    @property
+    def total(self):
+        return self.import_nodes
+
+    @property
+    def done(self):
+        return self.finished_imports
+
+    def add(self, key, stage, run, depends_on=(), source=None):
+        node = ImportNode(key, stage, run, depends_on, source)
+        node.order = len(self.nodes)
+        self.nodes.append(node)
+        if stage == IMPORT:
+            self.import_nodes += 1
+        for dependency in node.depends_on:
+            dependency.dependents.append(node)
+        if not node.waiting:
+            self._push(node)
+        return node
+
+    def add_import(self, source, task, depends_on=(), context=None):
+        """
+        task: import task, or callable(node) building it once the dependencies are done
+        context: context manager entered around building and running the task
+        """
+        def run(node):
+            with context if context is not None else contextlib.nullcontext():
+                node.task = task(node) if callable(task) else task
+                return ue_utils.run_import_tasks([node.task], self.root, self.saver)
+        return self.add(f"{IMPORT}:{source}", IMPORT, run, depends_on, source)
+
+    def completed_tasks(self):
+        return [node.task for node in self.nodes if node.stage == IMPORT and node.state == DONE]
+
+    def failed_nodes(self):
+        return [node for node in self.nodes if node.state in (FAILED, SKIPPED)]
+
+    def run_blocking(self):
+        self.start_time = time.perf_counter()
+        while self.step():
+            pass
+        self._finish()
+        return self.produced
+
+    def start(self):
+        self.start_time = time.perf_counter()
+        if not self.ready:
+            self._finish()
+            return
+        self._tick_handle = unreal.register_slate_post_tick_callback(self._on_tick)
+
+    def step(self):
+        if self.cancelled or not self.ready:
+            return False
+        batch = list()
+        chunk_size = self.memory.chunk_size if self.memory is not None else self.chunk_size
+        while self.ready and len(batch) < chunk_size:
+            node = heapq.heappop(self.ready)[2]
+            batch.append(node)
+            self._run_node(node)
+            if self.memory is not None and self.memory.over_ceiling():
+                break
+        self._notify_progress([node.source for node in batch if node.source])
+        if self.memory is not None and self.memory.add(self._released_paths(batch), sum(1 for node in batch if node.stage == IMPORT)):
+            self.memory.release(self.saver)
+        return bool(self.ready) and not self.cancelled
+
+    def _released_paths(self, batch):
+        # final assets (post-processed, or from the last step) no pending step needs anymore,
+        # a skeleton stays loaded until its last animation is imported
+        paths = list()
+        for node in batch:
+            for done in [node] + node.depends_on:
+                if done.stage != POST_PROCESS and done.dependents:
+                    continue
+                if done.state == DONE and isinstance(done.result, list) and all(dependent.state != PENDING for dependent in done.dependents):
+                    paths.extend(done.result)
+        return paths
+
+    def _run_node(self, node):
+        started = time.perf_counter()
+        if self.journal is not None and node.stage == IMPORT:
+            self.journal.importing(node.source)
+        try:
+            with import_trace.span(node.key, "asset", stage=node.stage, source=node.source):
+                node.result = node.run(node)
+            node.state = DONE
+        except Exception as e:
+            node.state = FAILED
+            node.error = str(e)
+            unreal.log_error(f"[{node.stage}] {node.key} failed: {e}")
+        node.seconds = time.perf_counter() - started
+        self._node_finished(node)
+        if node.state == DONE and node.stage == IMPORT:
+            self.produced.extend(node.result)
+            if node.result:
+                for callback in self.imported_callbacks:
+                    callback(node)
+        if self.journal is not None:
+            self._journal_node(node)
+        for dependent in node.dependents:
+            if node.state != DONE:
+                self._skip(dependent)
+                continue
+            dependent.waiting -= 1
+            if not dependent.waiting and dependent.state == PENDING:
+                self._push(dependent)
+
+    def _journal_node(self, node):
+        # skipped nodes stay unfinished in the journal, a resume retries them
+        if node.stage == IMPORT:
+            if node.state == DONE and node.result:
+                saved = self.saver is not None and self.saver.policy == ue_utils.SAVE_IMMEDIATE
+                self.journal.imported(node.source, node.result, saved)
+            else:
+                self.journal.failed(node.source, node.error or "import produced no assets")
+        elif node.stage == POST_PROCESS and node.state == DONE:
+            self.journal.post_processed(node.source, node.result)
+
+    def _push(self, node):
+        heapq.heappush(self.ready, (STAGE_ORDER.get(node.stage, len(STAGE_ORDER)), node.order, node))
+
+    def _node_finished(self, node):
+        self.finished_nodes += 1
+        if node.stage == IMPORT:
+            self.finished_imports += 1
+
+    def _skip(self, node):
+        if node.state != PENDING:
+            return
+        node.state = SKIPPED
+        self._node_finished(node)
+        unreal.log_warning(f"[{node.stage}] {node.key} skipped, a dependency failed")
+        for dependent in node.dependents:
+            self._skip(dependent)
@@ -0,0 +1,234 @@
+"""
+Timing and memory instrumentation for the import pipeline.
+
+A Tracer records spans (wall time, Python heap delta from tracemalloc, process memory delta)
+and counters. The process running the scripts is the editor, so process memory is editor
+memory. Code reports into the active tracer through span() and count(), which do nothing
+while no tracer is active. Traces are exported in the Chrome trace event format, open them
+in chrome://tracing or https://ui.perfetto.dev. The summary is stored alongside the events.
+"""
+import os
+import sys
+import json
+import time
+import threading
+import functools
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from collections import Counter
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+MB = 1024 * 1024
+
+
+def process_memory():
+    """
+    Resident memory of this process in bytes, None if it can't be read.
+    """
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+        return None
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class Tracer(object):
+    """
+    trace_heap: track the Python heap with tracemalloc, which slows down allocations
+    """
+    def __init__(self, name="import", trace_heap=True):
+        self.name = name
+        self.trace_heap = trace_heap
+        self.events = list()  # chrome trace events
+        self.counters = Counter()
+        self.spans = list()  # (name, category, seconds, heap delta, memory delta)
+        self.start_time = None
+        self.end_time = None
+        self._started_tracemalloc = False
+        self._pid = os.getpid()
+
+    def start(self):
+        self.start_time = time.perf_counter()
+        if self.trace_heap and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        return self
+
+    def stop(self):
+        self.end_time = time.perf_counter()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        return self
+
+    def _timestamp(self, t):
+        # microseconds since start
+        return (t - self.start_time) * 1e6
+
+    def _heap(self):
+        return tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+
+    @contextmanager
+    def span(self, name, category="stage", **args):
+        heap_before, memory_before = self._heap(), process_memory()
+        started = time.perf_counter()
+        try:
+            yield args
+        finally:
+            ended = time.perf_counter()
+            heap_after, memory_after = self._heap(), process_memory()
+            heap_delta = heap_after - heap_before if heap_before is not None and heap_after is not None else None
+            memory_delta = memory_after - memory_before if memory_before is not None and memory_after is not None else None
+            self.spans.append((name, category, ended - started, heap_delta, memory_delta))
+            event_args = {key: value for key, value in args.items() if value is not None}
+            if heap_delta is not None:
+                event_args["heap_delta_kb"] = round(heap_delta / 1024, 1)
+            if memory_delta is not None:
+                event_args["memory_delta_kb"] = round(memory_delta / 1024, 1)
+            self.events.append({"name": name, "cat": category, "ph": "X", "pid": self._pid, "tid": threading.get_ident(),
+                                "ts": round(self._timestamp(started), 1), "dur": round((ended - started) * 1e6, 1), "args": event_args})
+
+    def count(self, name, value=1):
+        self.counters[name] += value
+        self.events.append({"name": name, "ph": "C", "pid": self._pid, "ts": round(self._timestamp(time.perf_counter()), 1),
+                            "args": {name: self.counters[name]}})
+
+    def summary(self):
+        """
+        Spans aggregated per category, slowest first.
+        """
+        stages = dict()
+        for name, category, seconds, heap_delta, memory_delta in self.spans:
+            stage = stages.setdefault(category, {"stage": category, "calls": 0, "seconds": 0.0, "max_seconds": 0.0,
+                                                 "slowest": None, "heap_delta": 0, "memory_delta": 0})
+            stage["calls"] += 1
+            stage["seconds"] += seconds
+            if seconds >= stage["max_seconds"]:
+                stage["max_seconds"], stage["slowest"] = seconds, name
+            stage["heap_delta"] += heap_delta or 0
+            stage["memory_delta"] += memory_delta or 0
+        return {"name": self.name,
+                "seconds": ((self.end_time or time.perf_counter()) - self.start_time) if self.start_time else 0.0,
+                "stages": sorted(stages.values(), key=lambda stage: stage["seconds"], reverse=True),
+                "counters": dict(self.counters)}
+
+    def export(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms", "summary": self.summary()}, f)
+        return path
+
+
+def format_summary(summary):
+    lines = [f"{summary['name']}: {summary['seconds']:.2f}s"]
+    lines.append(f"{'stage':<16}{'calls':>7}{'total s':>10}{'max s':>9}{'heap MB':>10}{'mem MB':>9}")
+    for stage in summary["stages"]:
+        lines.append(f"{stage['stage']:<16}{stage['calls']:>7}{stage['seconds']:>10.2f}{stage['max_seconds']:>9.2f}"
+                     f"{stage['heap_delta'] / MB:>10.1f}{stage['memory_delta'] / MB:>9.1f}")
+    if summary["counters"]:
+        lines.append("")
+        lines.extend(f"{name}: {value:,}" for name, value in sorted(summary["counters"].items()))
+    return "\n".join(lines)
+
+def export_run(tracer, folder, keep=20):
+    """
+    Writes the trace as <folder>/<name>_<timestamp>.json and removes all but the last `keep` traces.
+    """
+    path = tracer.export(os.path.join(folder, f"{tracer.name}_{time.strftime('%Y%m%d_%H%M%S')}.json"))
+    for old_path in _traces(folder)[:-keep]:
+        # another process exporting into the same folder may have removed it already
+        try:
+            os.remove(old_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"[trace] could not remove {old_path}: {e}")
+    return path
+
+def _traces(folder):
+    # oldest first
+    paths = [os.path.join(folder, name) for name in os.listdir(folder) if name.endswith(".json")]
+    return sorted(paths, key=_mtime)
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+def load_summary(path):
+    with open(path, "r") as f:
+        return json.load(f).get("summary")
+
+def latest_trace(folder):
+    if not os.path.isdir(folder):
+        return None
+    traces = _traces(folder)
+    return traces[-1] if traces else None
+
+
+# active tracer, span() and count() report into it
+_active = None
+
+def activate(tracer):
+    global _active
+    _active = tracer.start()
+    return tracer
+
+def deactivate():
+    global _active
+    tracer, _active = _active, None
+    if tracer is not None:
+        tracer.stop()
+    return tracer
+
+def active():
+    return _active
+
+def span(name, category="stage", **args):
+    if _active is None:
+        return nullcontext(args)
+    return _active.span(name, category, **args)
+
+def count(name, value=1):
+    if _active is not None:
+        _active.count(name, value)
+
+def traced(category, name=None):
+    """
+    Decorator running the function in a span of the active tracer.
+    """
+    def decorate(function):
+        span_name = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return function(*args, **kwargs)
+            with _active.span(span_name, category):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
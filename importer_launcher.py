@@ -0,0 +1,57 @@
+"""
+Entry point of the UE Asset Importer menu command.
+
+Nothing Qt related is imported at editor start. The first launch() imports PySide6 and the
+importer modules and opens the window, later launches show the same window again. With the
+ASSET_IMPORTER_DEV environment variable set the importer modules are reloaded and the window
+is rebuilt on every launch, for working on the scripts.
+
+Import and open times are logged and kept in startup_timings.
+"""
+import os
+import sys
+import time
+import importlib
+import unreal
+
+DEV_MODE_VARIABLE = "ASSET_IMPORTER_DEV"
+# reloaded in dependency order in developer mode
+MODULES = ("fbx_preflight", "skeleton_cache", "import_cache", "import_trace", "import_journal", "source_stage", "ue_utils",
+           "anim_compression", "import_scheduler", "batch_import", "watch_folder", "shard_import", "asset_importer")
+
+startup_timings = dict()  # step -> seconds, of the last launch
+
+
+def dev_mode():
+    return os.environ.get(DEV_MODE_VARIABLE, "").lower() in ("1", "true", "yes", "on")
+
+def _timed(step, function, *args, **kwargs):
+    started = time.perf_counter()
+    value = function(*args, **kwargs)
+    startup_timings[step] = time.perf_counter() - started
+    return value
+
+def reload_modules():
+    for name in MODULES:
+        if name in sys.modules:
+            importlib.reload(sys.modules[name])
+
+def launch():
+    startup_timings.clear()
+    started = time.perf_counter()
+    first_launch = "asset_importer" not in sys.modules
+    if first_launch:
+        # split the first import into PySide6 and the importer's own modules
+        _timed("import_pyside6", importlib.import_module, "PySide6.QtWidgets")
+        asset_importer = _timed("import_asset_importer", importlib.import_module, "asset_importer")
+    elif dev_mode():
+        _timed("reload_modules", reload_modules)
+        asset_importer = sys.modules["asset_importer"]
+    else:
+        asset_importer = sys.modules["asset_importer"]
+    window = _timed("open_window", asset_importer.launch_app, rebuild=dev_mode())
+    startup_timings["total"] = time.perf_counter() - started
+
+    steps = ", ".join(f"{step} {seconds * 1000:.0f} ms" for step, seconds in startup_timings.items())
+    unreal.log(f"[asset importer] {'first ' if first_launch else ''}launch: {steps}")
+    return window
@@ -1,7 +1,10 @@
 import sys
 import os
+import time
 import unreal
 
+startup_started = time.perf_counter()
+
 # pyside6
 # site_packages_path = os.path.join(os.environ.get('LOCALAPPDATA', ''), "Programs\\Python\\Python311\\Lib\\site-packages")
 # site_packages_path = os.path.abspath(os.path.join(__file__, "..\\..\\..\\site-packages"))
@@ -37,12 +40,14 @@ def add_menu_entry():
         insert_position=unreal.ToolMenuInsert("", unreal.ToolMenuInsertType.DEFAULT)
     )
     entry.set_label("UE Asset Importer")
+    # PySide6 and the importer are only imported on first use, see importer_launcher
     entry.set_string_command(
         unreal.ToolMenuStringCommandType.PYTHON,
         "",
-        "import asset_importer; from importlib import reload; reload(asset_importer); asset_importer.launch_app()"
+        "import importer_launcher; importer_launcher.launch()"
     )
 
     script_menu.add_menu_entry("Scripts", entry)
 
-add_menu_entry()
\ No newline at end of file
+add_menu_entry()
+unreal.log(f"[asset importer] menu registered in {(time.perf_counter() - startup_started) * 1000:.0f} ms")
\ No newline at end of file
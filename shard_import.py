@@ -0,0 +1,347 @@
+"""
+Sharded import: spreads a large drop over several headless editor processes.
+
+    python shard_import.py D:/drop/characters --destination /Game/Characters --workers 4 \
+        --editor "C:/UE_5.4/Engine/Binaries/Win64/UnrealEditor-Cmd.exe" --project D:/Game/Game.uproject
+
+Sources are grouped by destination folder and dependency: a skeletal mesh and the animations
+on its skeleton stay in the same worker, since the skeleton only exists once the mesh is
+imported. Groups are spread over the workers by file size. Every worker runs batch_import.py
+on its manifests (one per destination) with private copies of the import manifest and the
+skeleton fingerprint cache and a compression queue of its own, which are merged back when the
+workers are done. The worker reports are merged into one report.
+
+--local runs benchmarks/local_worker.py instead of the editor: batch_import on fake_unreal,
+to try the coordinator without the engine.
+
+Runs inside or outside the editor, nothing here imports unreal.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+from collections import Counter
+
+import fbx_preflight
+import import_cache
+import skeleton_cache
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BATCH_SCRIPT = os.path.join(SCRIPT_DIR, "batch_import.py")
+LOCAL_WORKER = os.path.join(SCRIPT_DIR, "benchmarks", "local_worker.py")
+# ue_utils.IMPORT_MANIFEST_VARIABLE, ue_utils.SOURCE_CACHE_VARIABLE, ue_utils.SKELETON_CACHE_VARIABLE,
+# anim_compression.COMPRESSION_QUEUE_VARIABLE
+IMPORT_MANIFEST_VARIABLE = "ASSET_IMPORTER_MANIFEST"
+SOURCE_CACHE_VARIABLE = "ASSET_IMPORTER_SOURCE_CACHE"
+SKELETON_CACHE_VARIABLE = "ASSET_IMPORTER_SKELETON_CACHE"
+COMPRESSION_QUEUE_VARIABLE = "ASSET_IMPORTER_COMPRESSION_QUEUE"
+SKELETON_CACHE_FILE = "skeleton_fingerprints.json"
+COMPRESSION_QUEUE_FILE = "anim_compression_queue.json"
+
+
+def dependency_groups(sources, preflight):
+    """
+    Splits sources into groups that have to be imported by the same worker: skeletal meshes
+    sharing a hierarchy, with the animations on that hierarchy. Animations without a mesh in
+    the drop are grouped by bone set, so each skeleton is loaded by as few workers as possible.
+    """
+    meshes = dict()  # mesh source -> group key
+    fingerprints = dict()
+    for source in sources:
+        info = preflight.get(source)
+        if info and info["kind"] == fbx_preflight.SKELETAL_MESH and info["bone_names"]:
+            fp = skeleton_cache.fingerprint(info["bone_names"], info["bone_parents"])
+            fingerprints[source] = fp
+            meshes[source] = fp["topology_hash"] or skeleton_cache.bone_set_key(info["bone_names"])
+    skeleton_index = skeleton_cache.SkeletonIndex(fingerprints)
+
+    groups = {key: list() for key in meshes.values()}
+    for source in sources:
+        info = preflight.get(source)
+        if source in meshes:
+            key = meshes[source]
+        elif info and info["kind"] == fbx_preflight.ANIMATION and info["bone_names"]:
+            mesh, _ = skeleton_index.match(info["bone_names"], info["bone_parents"], hint=source)
+            topology = skeleton_cache.fingerprint(info["bone_names"], info["bone_parents"])["topology_hash"]
+            if mesh is not None:
+                key = meshes[mesh]
+            elif topology in groups:
+                key = topology
+            else:
+                key = skeleton_cache.bone_set_key(info["bone_names"])
+        else:
+            # rejected by batch_import anyway, anywhere
+            key = source
+        groups.setdefault(key, list()).append(source)
+    return [group for group in groups.values() if group]
+
+def shard(jobs, preflight, workers):
+    """
+    jobs: {destination: [sources]}
+    Returns one {destination: [sources]} per worker (empty shards dropped), largest groups
+    first onto the least loaded worker.
+    """
+    items = list()
+    for destination, sources in jobs.items():
+        for group in dependency_groups(sources, preflight):
+            weight = sum((preflight.get(source) or {}).get("size") or 1 for source in group)
+            items.append((weight, destination, group))
+    items.sort(key=lambda item: item[0], reverse=True)
+
+    shards = [dict() for _ in range(max(1, workers))]
+    loads = [0] * len(shards)
+    for weight, destination, group in items:
+        worker = loads.index(min(loads))
+        shards[worker].setdefault(destination, list()).extend(group)
+        loads[worker] += weight
+    return [s for s in shards if s]
+
+
+class ShardCoordinator(object):
+    def __init__(self, jobs, workers=4, work_dir=None, editor=None, project=None, local=False,
+                 import_manifest=None, batch_options=None):
+        """
+        jobs: {destination: [source files or folders]}
+        import_manifest: the project's import manifest, copied to every worker and merged back.
+            The skeleton cache and compression queue next to it are merged back too.
+        batch_options: extra batch_import manifest settings (mode, save_policy, ...)
+        """
+        if not local and not (editor and project):
+            raise ValueError("editor and project are required unless running local workers")
+        # workers run in their own folder, every path they get is absolute
+        self.jobs = {destination: fbx_preflight.expand_sources([os.path.abspath(source) for source in sources])
+                     for destination, sources in jobs.items()}
+        self.workers = max(1, int(workers))
+        self.work_dir = os.path.abspath(work_dir or tempfile.mkdtemp(prefix="shard_import_"))
+        self.editor = editor and os.path.abspath(editor)
+        self.project = project and os.path.abspath(project)
+        self.local = local
+        self.import_manifest = import_manifest and os.path.abspath(import_manifest)
+        # Saved/AssetImporter of the project
+        self.saved_folder = None
+        if self.project:
+            self.saved_folder = os.path.join(os.path.dirname(self.project), "Saved", "AssetImporter")
+        elif self.import_manifest:
+            self.saved_folder = os.path.dirname(self.import_manifest)
+        self.batch_options = dict(batch_options or {})
+        self.preflight = dict()
+        self.shards = list()
+
+    def worker_command(self, manifests):
+        if self.local:
+            return [sys.executable, LOCAL_WORKER] + manifests
+        # quoted, project and temp folders may contain spaces
+        script = " ".join(f'"{path}"' for path in [BATCH_SCRIPT] + manifests).replace("\\", "/")
+        return [self.editor, self.project, "-run=pythonscript", f"-script={script}",
+                "-unattended", "-nosplash", "-nullrhi", "-nosound", "-stdout", "-FullStdOutLogOutput"]
+
+    def source_cache_folder(self, index, worker_dir):
+        """
+        Private source_stage cache per worker: a cache removes the temporary files it finds
+        and evicts without knowing what other processes are about to import. Kept in the
+        project across runs, in the worker folder for local workers.
+        """
+        if self.project:
+            return os.path.join(os.path.dirname(self.project), "Saved", "AssetImporter", f"source_cache_worker_{index:02d}")
+        return os.path.join(worker_dir, "source_cache")
+
+    def prepare(self):
+        """
+        Preflights the sources and writes a folder per worker: batch manifests and copies of
+        the import manifest and skeleton cache. Returns the worker folders.
+        """
+        sources = [source for group in self.jobs.values() for source in group]
+        self.preflight = fbx_preflight.preflight_files(sources)
+        self.shards = shard(self.jobs, self.preflight, self.workers)
+        worker_dirs = list()
+        for index, worker_shard in enumerate(self.shards):
+            worker_dir = os.path.join(self.work_dir, f"worker_{index:02d}")
+            os.makedirs(worker_dir, exist_ok=True)
+            for number, (destination, shard_sources) in enumerate(worker_shard.items()):
+                manifest = dict(self.batch_options, destination=destination, sources=shard_sources)
+                with open(os.path.join(worker_dir, f"batch_{number:02d}.json"), "w") as f:
+                    json.dump(manifest, f, indent=2)
+            if self.import_manifest and os.path.exists(self.import_manifest):
+                shutil.copyfile(self.import_manifest, os.path.join(worker_dir, "import_manifest.json"))
+            skeleton_cache_path = self.saved_folder and os.path.join(self.saved_folder, SKELETON_CACHE_FILE)
+            if skeleton_cache_path and os.path.exists(skeleton_cache_path):
+                shutil.copyfile(skeleton_cache_path, os.path.join(worker_dir, SKELETON_CACHE_FILE))
+            worker_dirs.append(worker_dir)
+        return worker_dirs
+
+    def run(self, poll_interval=0.5):
+        started = time.time()
+        worker_dirs = self.prepare()
+        preflight_seconds = time.time() - started
+        print(f"[shard import] {len(self.preflight)} source(s) in {len(worker_dirs)} worker(s)")
+
+        processes = list()
+        for index, worker_dir in enumerate(worker_dirs):
+            manifests = sorted(os.path.join(worker_dir, name) for name in os.listdir(worker_dir) if name.startswith("batch_") and name.endswith(".json"))
+            # the project files are replaced as a whole on save, concurrent workers would lose each other's entries
+            env = dict(os.environ, **{IMPORT_MANIFEST_VARIABLE: os.path.join(worker_dir, "import_manifest.json"),
+                                      SOURCE_CACHE_VARIABLE: self.source_cache_folder(index, worker_dir),
+                                      SKELETON_CACHE_VARIABLE: os.path.join(worker_dir, SKELETON_CACHE_FILE),
+                                      COMPRESSION_QUEUE_VARIABLE: os.path.join(worker_dir, COMPRESSION_QUEUE_FILE)})
+            log = open(os.path.join(worker_dir, "worker.log"), "w")
+            process = subprocess.Popen(self.worker_command(manifests), stdout=log, stderr=subprocess.STDOUT, env=env, cwd=worker_dir)
+            processes.append({"dir": worker_dir, "manifests": manifests, "process": process, "log": log, "started": time.time()})
+
+        running = list(processes)
+        while running:
+            time.sleep(poll_interval)
+            for worker in list(running):
+                if worker["process"].poll() is not None:
+                    worker["seconds"] = time.time() - worker["started"]
+                    worker["log"].close()
+                    running.remove(worker)
+                    print(f"[shard import] {os.path.basename(worker['dir'])} exited with {worker['process'].returncode} "
+                          f"after {worker['seconds']:.1f}s")
+
+        merged = self.merge_import_manifests(worker_dirs)
+        fingerprints_merged = self.merge_skeleton_caches(worker_dirs)
+        queued = self.merge_compression_queues(worker_dirs)
+        report = self.merge_reports(processes)
+        report["seconds"] = round(time.time() - started, 4)
+        report["preflight_seconds"] = round(preflight_seconds, 4)
+        report["manifest_entries_merged"] = merged
+        report["skeleton_fingerprints_merged"] = fingerprints_merged
+        report["animations_queued"] = queued
+        return report
+
+    def merge_import_manifests(self, worker_dirs):
+        if not self.import_manifest:
+            return 0
+        manifest = import_cache.ImportManifest(self.import_manifest)
+        changed = 0
+        for worker_dir in worker_dirs:
+            worker_manifest = os.path.join(worker_dir, "import_manifest.json")
+            if os.path.exists(worker_manifest):
+                changed += manifest.merge(import_cache.ImportManifest(worker_manifest))
+        manifest.save()
+        return changed
+
+    def merge_skeleton_caches(self, worker_dirs):
+        if not self.saved_folder:
+            return 0
+        cache = skeleton_cache.SkeletonFingerprintCache(os.path.join(self.saved_folder, SKELETON_CACHE_FILE))
+        changed = 0
+        for worker_dir in worker_dirs:
+            worker_cache = os.path.join(worker_dir, SKELETON_CACHE_FILE)
+            if os.path.exists(worker_cache):
+                changed += cache.merge(skeleton_cache.SkeletonFingerprintCache(worker_cache))
+        cache.save()
+        return changed
+
+    def merge_compression_queues(self, worker_dirs):
+        """
+        Adds what the workers left queued for compression to the project queue, see
+        anim_compression.CompressionQueue (which needs unreal) for the file format.
+        Returns how many animations were added.
+        """
+        if not self.saved_folder:
+            return 0
+        path = os.path.join(self.saved_folder, COMPRESSION_QUEUE_FILE)
+        entries = _read_json(path, dict())
+        added = 0
+        for worker_dir in worker_dirs:
+            for object_path, settings in _read_json(os.path.join(worker_dir, COMPRESSION_QUEUE_FILE), dict()).items():
+                # an animation still queued in the project was deferred before, the project
+                # queue has its real settings, the worker only saw the cheap codec
+                if object_path not in entries:
+                    entries[object_path] = settings
+                    added += 1
+        if added:
+            os.makedirs(self.saved_folder, exist_ok=True)
+            temp_path = path + ".tmp"
+            with open(temp_path, "w") as f:
+                json.dump(entries, f, indent=1)
+            os.replace(temp_path, path)
+        return added
+
+    def merge_reports(self, processes):
+        summary = Counter()
+        assets, workers, validations = list(), list(), list()
+        save = Counter()
+        import_seconds, renamed = 0.0, 0
+        for index, worker in enumerate(processes):
+            worker_assets = 0
+            for manifest_path in worker["manifests"]:
+                report_path = os.path.splitext(manifest_path)[0] + ".report.json"
+                try:
+                    with open(report_path, "r") as f:
+                        report = json.load(f)
+                except (OSError, ValueError):
+                    # worker died before finishing this batch
+                    with open(manifest_path, "r") as f:
+                        batch = json.load(f)
+                    report = {"summary": {"worker_failed": len(batch["sources"])}, "import_seconds": 0.0, "renamed": 0,
+                              "assets": [{"source": source, "status": "worker_failed", "asset_paths": [], "errors": [f"see {worker['dir']}/worker.log"]}
+                                         for source in batch["sources"]]}
+                summary.update(report["summary"])
+                import_seconds += report["import_seconds"]
+                renamed += report["renamed"]
+                save.update({key: value for key, value in report.get("save", {}).items() if key != "policy"})
+                if isinstance(report.get("skeleton_validation"), dict):
+                    validations.append(report["skeleton_validation"])
+                for asset in report["assets"]:
+                    asset["worker"] = index
+                assets.extend(report["assets"])
+                worker_assets += len(report["assets"])
+            workers.append({"worker": index, "dir": worker["dir"], "returncode": worker["process"].returncode,
+                            "seconds": round(worker["seconds"], 4), "sources": worker_assets})
+        return {
+            "jobs": {destination: len(sources) for destination, sources in self.jobs.items()},
+            "workers": workers,
+            "summary": dict(summary),
+            "import_seconds": round(import_seconds, 4),
+            "renamed": renamed,
+            "save": dict(save),
+            "skeleton_validation": validations or "All skeletons are A-OK!",
+            "assets": assets,
+        }
+
+
+def _read_json(path, default):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="shard_import.py", description="FBX import sharded over headless editor processes")
+    parser.add_argument("sources", nargs="+", help="FBX files or folders")
+    parser.add_argument("--destination", default="/Game")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--editor", help="UnrealEditor-Cmd executable")
+    parser.add_argument("--project", help=".uproject file")
+    parser.add_argument("--local", action="store_true", help="fake_unreal workers instead of the editor")
+    parser.add_argument("--import-manifest", help="import manifest to share with the workers, "
+                                                  "defaults to <project>/Saved/AssetImporter/import_manifest.json")
+    parser.add_argument("--mode", choices=("import", "replace", "skip"), default="replace")
+    parser.add_argument("--memory-ceiling-gb", type=float, default=0, help="memory ceiling per worker, 0 for no limit")
+    parser.add_argument("--work-dir", help="worker manifests, reports and logs, a temporary folder by default")
+    parser.add_argument("--report", default="shard_import.report.json")
+    args = parser.parse_args(argv)
+
+    import_manifest = args.import_manifest
+    if import_manifest is None and args.project:
+        import_manifest = os.path.join(os.path.dirname(os.path.abspath(args.project)), "Saved", "AssetImporter", "import_manifest.json")
+    coordinator = ShardCoordinator({args.destination: args.sources}, args.workers, args.work_dir, args.editor, args.project,
+                                   args.local, import_manifest,
+                                   {"mode": args.mode, "memory_ceiling_gb": args.memory_ceiling_gb})
+    report = coordinator.run()
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"[shard import] {report['summary']} in {report['seconds']:.1f}s, report: {args.report}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
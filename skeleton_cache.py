@@ -0,0 +1,201 @@
+"""
+Skeleton fingerprints and their on-disk cache.
+
+A fingerprint reduces a bone hierarchy to hashes of the ordered bone names and of the names
+plus parent indices. Fingerprints are cached per package and stamped with the package file's
+size and mtime, so saving a skeleton invalidates its entry.
+
+SkeletonIndex looks skeletons up by hierarchy and bone set, to pick the skeleton an
+animation file belongs to.
+"""
+import os
+import re
+import json
+import hashlib
+
+CACHE_VERSION = 2
+
+
+def fingerprint(bone_names, bone_parents=None):
+    """
+    bone_parents: parent index per bone (-1 for roots), None if the hierarchy is unknown
+    """
+    bone_names = [str(name) for name in bone_names]
+    names_hash = hashlib.sha1("\n".join(bone_names).encode("utf-8")).hexdigest()
+    hierarchy_hash = None
+    topology_hash = None
+    if bone_parents is not None:
+        bone_parents = [int(parent) for parent in bone_parents]
+        hierarchy = "\n".join(f"{name}:{parent}" for name, parent in zip(bone_names, bone_parents))
+        hierarchy_hash = hashlib.sha1(hierarchy.encode("utf-8")).hexdigest()
+        topology_hash = _topology_hash(bone_names, bone_parents)
+    return {"bone_count": len(bone_names), "names_hash": names_hash, "hierarchy_hash": hierarchy_hash,
+            "topology_hash": topology_hash, "bone_names": bone_names, "bone_parents": bone_parents}
+
+def _parent_names(bone_names, bone_parents):
+    return {name: (bone_names[parent] if parent >= 0 else None) for name, parent in zip(bone_names, bone_parents)}
+
+def _topology_hash(bone_names, bone_parents):
+    # same bones with the same parents, independent of bone order (FBX files and reference
+    # skeletons don't always list bones in the same order)
+    pairs = sorted(f"{name}:{parent}" for name, parent in _parent_names(bone_names, bone_parents).items())
+    return hashlib.sha1("\n".join(pairs).encode("utf-8")).hexdigest()
+
+def bone_set_key(bone_names):
+    return hashlib.sha1("\n".join(sorted(set(bone_names))).encode("utf-8")).hexdigest()
+
+def hierarchy_key(fp):
+    # hierarchy hash when known, ordered names otherwise
+    return fp["hierarchy_hash"] or fp["names_hash"]
+
+def same_hierarchy(fp_a, fp_b):
+    if fp_a["names_hash"] != fp_b["names_hash"]:
+        return False
+    if fp_a["hierarchy_hash"] and fp_b["hierarchy_hash"]:
+        return fp_a["hierarchy_hash"] == fp_b["hierarchy_hash"]
+    return True
+
+def related(fp_a, fp_b):
+    # skeletons that look like the same rig: same bone count or same set of bones
+    return fp_a["bone_count"] == fp_b["bone_count"] or set(fp_a["bone_names"]) == set(fp_b["bone_names"])
+
+
+class SkeletonFingerprintCache(object):
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}  # package name -> {"stamp": [size, mtime], "fingerprint": {...}}
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[skeleton cache] ignoring unreadable cache {self.path}: {e}")
+            return
+        if data.get("version") == CACHE_VERSION:
+            self.entries = data.get("entries", {})
+
+    def save(self):
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"version": CACHE_VERSION, "entries": self.entries}, f)
+        os.replace(temp_path, self.path)
+        self.dirty = False
+
+    def get(self, package_name, stamp):
+        entry = self.entries.get(package_name)
+        if entry is None or stamp is None or entry["stamp"] != list(stamp):
+            return None
+        return entry["fingerprint"]
+
+    def put(self, package_name, stamp, fp):
+        # unsaved packages have no stamp, there is nothing to validate them against later
+        if stamp is None:
+            return
+        self.entries[package_name] = {"stamp": list(stamp), "fingerprint": fp}
+        self.dirty = True
+
+    def merge(self, other):
+        """
+        Takes over the fingerprints of another cache taken from newer packages than ours.
+        Returns how many entries changed.
+        """
+        changed = 0
+        for package_name, entry in other.entries.items():
+            current = self.entries.get(package_name)
+            if current is None or entry["stamp"][1] > current["stamp"][1]:
+                self.entries[package_name] = entry
+                changed += 1
+        if changed:
+            self.dirty = True
+        return changed
+
+    def prune(self, package_names):
+        # drop skeletons that no longer exist
+        for package_name in set(self.entries) - set(package_names):
+            del self.entries[package_name]
+            self.dirty = True
+
+
+def _name_tokens(name):
+    # ANIM_Hero_Run.fbx -> {"hero", "run"}, /Game/Chars/SKL_Hero.SKL_Hero -> {"hero"}
+    name = os.path.splitext(os.path.basename(name.split('.')[0]))[0]
+    return {token.lower() for token in re.split(r"[_\W]+", name)[1:] if token}
+
+
+class SkeletonIndex(object):
+    """
+    Existing skeletons keyed by topology hash, by bone set and by bone name.
+    """
+    def __init__(self, fingerprints):
+        self.fingerprints = dict(fingerprints)  # skeleton -> fingerprint
+        self.by_topology = {}
+        self.by_bone_set = {}
+        self.by_bone = {}
+        for skeleton, fp in self.fingerprints.items():
+            if fp.get("topology_hash"):
+                self.by_topology.setdefault(fp["topology_hash"], []).append(skeleton)
+            self.by_bone_set.setdefault(bone_set_key(fp["bone_names"]), []).append(skeleton)
+            for bone in fp["bone_names"]:
+                self.by_bone.setdefault(bone, set()).add(skeleton)
+
+    def _supersets(self, bone_names, bone_parents):
+        # skeletons containing every bone of the animation, with the same parents
+        bone_sets = sorted((self.by_bone.get(bone, set()) for bone in set(bone_names)), key=len)
+        if not bone_sets:
+            return []
+        candidates = set(bone_sets[0]).intersection(*bone_sets[1:])
+        if bone_parents is None:
+            return list(candidates)
+        parents = _parent_names(bone_names, bone_parents)
+        matching = []
+        for skeleton in candidates:
+            fp = self.fingerprints[skeleton]
+            if fp.get("bone_parents") is None:
+                matching.append(skeleton)
+                continue
+            skeleton_parents = _parent_names(fp["bone_names"], fp["bone_parents"])
+            # roots of a partial animation skeleton may sit anywhere in the full skeleton
+            if all(parent is None or skeleton_parents[name] == parent for name, parent in parents.items()):
+                matching.append(skeleton)
+        return matching
+
+    def match(self, bone_names, bone_parents=None, hint=None):
+        """
+        Finds the skeleton an animation with these bones belongs to.
+        hint: file name used to break ties between equally good skeletons (ANIM_Hero_Run -> SKL_Hero)
+        Returns (skeleton, reason) or (None, reason)
+        """
+        if not bone_names:
+            return None, "no bones"
+        candidates, reason = [], None
+        if bone_parents is not None:
+            candidates = self.by_topology.get(_topology_hash(bone_names, bone_parents), [])
+            reason = "same hierarchy"
+        if not candidates:
+            candidates = self.by_bone_set.get(bone_set_key(bone_names), [])
+            reason = "same bones"
+        if not candidates:
+            supersets = self._supersets(bone_names, bone_parents)
+            # the smallest skeleton containing all animated bones is the closest one
+            if supersets:
+                smallest = min(self.fingerprints[s]["bone_count"] for s in supersets)
+                candidates = [s for s in supersets if self.fingerprints[s]["bone_count"] == smallest]
+                reason = f"contains all {len(set(bone_names))} bones"
+        if not candidates:
+            return None, "no skeleton contains the animated bones"
+        if len(candidates) == 1:
+            return candidates[0], reason
+
+        hint_tokens = _name_tokens(hint) if hint else set()
+        scored = sorted(((len(hint_tokens & _name_tokens(c)), c) for c in candidates), reverse=True)
+        if scored[0][0] > scored[1][0]:
+            return scored[0][1], f"{reason}, name match"
+        return None, f"ambiguous: {len(candidates)} skeletons match ({reason})"
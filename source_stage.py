@@ -0,0 +1,308 @@
+"""
+Staging of import sources from network shares to a local cache.
+
+Importing straight from a NAS serialises network reads with the import: the editor reads each
+FBX over the network while nothing else happens. A SourceStager copies the upcoming sources
+of the import queue on a thread pool, `ahead` files past the one being imported, into a
+content-addressed cache on the local disk. Import tasks point at the staged copies
+(ue_utils.asset_import_task), everything else (import manifest, journal, the assets' source
+file) keeps the original path, see original().
+
+The copy is hashed while it is written and checked against the preflight hash, a source
+that changed since preflight is imported from its original path. The cache is bounded in
+size, least recently used files are evicted first, files of the import window never are.
+Cache hits (same content imported before) are not copied again.
+
+Sources on local drives are passed through unless remote_only is False.
+
+A cache folder belongs to one process at a time: scanning removes the temporary files it finds
+and eviction only knows the import window of its own process. Shard workers get a folder each
+(ue_utils.get_source_cache_folder).
+"""
+import os
+import sys
+import time
+import uuid
+import shutil
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import import_trace
+
+GB = 1024 * 1024 * 1024
+NETWORK_FILE_SYSTEMS = ("nfs", "nfs4", "cifs", "smbfs", "smb3", "fuse.sshfs", "9p")
+
+
+class StageError(IOError):
+    pass
+
+
+_network_mounts = None
+
+def network_mounts():
+    # mount points of network file systems (Linux), read once
+    global _network_mounts
+    if _network_mounts is None:
+        try:
+            with open("/proc/self/mounts", "r") as f:
+                mounts = [line.split()[:3] for line in f]
+        except OSError:
+            mounts = []
+        _network_mounts = [mount[1] for mount in mounts if len(mount) == 3 and mount[2] in NETWORK_FILE_SYSTEMS]
+    return _network_mounts
+
+def is_remote(path):
+    if path.startswith(("\\\\", "//")):
+        return True
+    path = os.path.abspath(path)
+    if sys.platform == "win32":
+        import ctypes
+        drive = os.path.splitdrive(path)[0]
+        # DRIVE_REMOTE, a mapped network drive
+        return bool(drive) and ctypes.windll.kernel32.GetDriveTypeW(drive + "\\") == 4
+    return any(path == mount or path.startswith(mount.rstrip("/") + "/") for mount in network_mounts())
+
+
+class StageCache(object):
+    """
+    Files stored as <folder>/<hash[:2]>/<hash>/<source file name>, the importer names assets
+    after the file so the name is kept. Recency is the file's mtime, touched on every use.
+    Not thread safe, SourceStager locks around it.
+    """
+    def __init__(self, folder, max_bytes):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # cached file -> size, least recently used first
+        self.size = 0
+        os.makedirs(folder, exist_ok=True)
+        self.scan()
+
+    def scan(self):
+        found = list()
+        for prefix in os.scandir(self.folder):
+            if prefix.name.endswith(".tmp"):
+                # copy of a crashed session
+                os.remove(prefix.path)
+                continue
+            if not prefix.is_dir() or len(prefix.name) != 2:
+                continue
+            for entry in os.scandir(prefix.path):
+                try:
+                    found.extend((f.stat().st_mtime, f.path, f.stat().st_size) for f in os.scandir(entry.path) if f.is_file())
+                except OSError:
+                    continue
+        for _, path, size in sorted(found):
+            self.entries[path] = size
+            self.size += size
+
+    def entry_folder(self, file_hash):
+        return os.path.join(self.folder, file_hash[:2], file_hash)
+
+    def lookup(self, file_hash, name, pinned=()):
+        """
+        Cached copy of the content with this hash under this name. Same content cached under
+        another name is linked, not copied again.
+        """
+        entry_folder = self.entry_folder(file_hash)
+        path = os.path.join(entry_folder, name)
+        if path not in self.entries:
+            same_content = [p for p in self.entries if os.path.dirname(p) == entry_folder] if os.path.isdir(entry_folder) else []
+            if not same_content:
+                return None
+            try:
+                os.link(same_content[0], path)
+            except OSError:
+                shutil.copyfile(same_content[0], path)
+            self.entries[path] = self.entries[same_content[0]]
+            self.size += self.entries[path]
+            self.touch(path)
+            self.evict(set(pinned) | {path})
+        else:
+            self.touch(path)
+        return path
+
+    def touch(self, path):
+        self.entries.move_to_end(path)
+        os.utime(path)
+
+    def temp_path(self):
+        return os.path.join(self.folder, f"{uuid.uuid4().hex}.tmp")
+
+    def add(self, file_hash, name, temp_path, pinned=()):
+        """
+        Moves a finished copy into the cache and evicts down to max_bytes.
+        Returns the cached path.
+        """
+        entry_folder = self.entry_folder(file_hash)
+        os.makedirs(entry_folder, exist_ok=True)
+        path = os.path.join(entry_folder, name)
+        size = os.path.getsize(temp_path)
+        os.replace(temp_path, path)
+        self.size += size - self.entries.pop(path, 0)
+        self.entries[path] = size
+        # over budget rather than evicting the copy about to be imported
+        self.evict(set(pinned) | {path})
+        return path
+
+    def evict(self, pinned=()):
+        for path in list(self.entries):
+            if self.size <= self.max_bytes:
+                break
+            if path in pinned:
+                continue
+            self.size -= self.entries.pop(path)
+            os.remove(path)
+            if not os.listdir(os.path.dirname(path)):
+                os.rmdir(os.path.dirname(path))
+
+
+class SourceStager(object):
+    def __init__(self, cache_folder, max_bytes=20 * GB, ahead=8, workers=4, remote_only=True, block_size=1 << 20):
+        self.cache = StageCache(cache_folder, max_bytes)
+        self.ahead = max(1, int(ahead))
+        self.remote_only = remote_only
+        self.block_size = block_size
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="SourceStager")
+        self.queue = list()  # sources in import order
+        self.positions = dict()  # source -> index in queue
+        self.hashes = dict()  # source -> expected content hash
+        self.futures = dict()  # source -> future of its staged path
+        self.originals = dict()  # staged path -> source
+        self.pinned = set()  # staged paths of the import window
+        self.cursor = 0
+        self.stats = Counter()
+        self._lock = threading.Lock()
+
+    def stage(self, sources, hashes=None):
+        """
+        Adds sources to the end of the import queue, and prefetches the first ones.
+        hashes: {source: preflight content hash}, copies are checked against it
+        """
+        for source in sources:
+            if source in self.positions or (self.remote_only and not is_remote(source)):
+                continue
+            self.positions[source] = len(self.queue)
+            self.queue.append(source)
+            if hashes and hashes.get(source):
+                self.hashes[source] = hashes[source]
+        self._prefetch()
+
+    def _prefetch(self):
+        for source in self.queue[self.cursor:self.cursor + self.ahead]:
+            if source not in self.futures:
+                self.futures[source] = self.pool.submit(self._copy, source)
+
+    def _copy(self, source):
+        name = os.path.basename(source)
+        expected = self.hashes.get(source)
+        if expected:
+            with self._lock:
+                path = self.cache.lookup(expected, name, self.pinned)
+                if path is not None:
+                    self.pinned.add(path)
+                    self.stats["hits"] += 1
+            if path is not None:
+                return path
+
+        temp_path = self.cache.temp_path()
+        sha1 = hashlib.sha1()
+        try:
+            with open(source, "rb") as src, open(temp_path, "wb") as dst:
+                for block in iter(lambda: src.read(self.block_size), b""):
+                    sha1.update(block)
+                    dst.write(block)
+            if expected and sha1.hexdigest() != expected:
+                raise StageError(f"{source} changed since preflight")
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        with self._lock:
+            path = self.cache.add(sha1.hexdigest(), name, temp_path, self.pinned)
+            self.pinned.add(path)
+            self.stats["copies"] += 1
+            self.stats["copied_bytes"] += self.cache.entries[path]
+        return path
+
+    def get(self, source):
+        """
+        Staged path of source, waits for its copy. Moves the import window past source.
+        Falls back to source itself when it isn't staged or the copy failed.
+        """
+        if source not in self.positions:
+            self.stage([source])
+            if source not in self.positions:
+                return source
+        # everything before source is imported, its copies can be evicted again
+        position = self.positions[source]
+        with self._lock:
+            for done in self.queue[self.cursor:position]:
+                future = self.futures.get(done)
+                if future is not None and future.done() and not future.exception():
+                    self.pinned.discard(future.result())
+        self.cursor = max(self.cursor, position)
+        if source not in self.futures:
+            self.futures[source] = self.pool.submit(self._copy, source)
+        self._prefetch()
+
+        future = self.futures[source]
+        if not future.done():
+            started = time.perf_counter()
+            with import_trace.span(f"wait {os.path.basename(source)}", "stage"):
+                future.exception()
+            self.stats["wait_seconds"] += time.perf_counter() - started
+        error = future.exception()
+        if error is not None:
+            print(f"[stage] importing {source} from its original path: {error}")
+            self.stats["mismatches" if isinstance(error, StageError) else "errors"] += 1
+            return source
+        path = future.result()
+        self.originals[path] = source
+        return path
+
+    def original(self, path):
+        return self.originals.get(path, path)
+
+    def shutdown(self):
+        # copies not started yet are dropped, running ones finish
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        with self._lock:
+            self.pinned.clear()
+            self.cache.evict()
+
+    def report(self):
+        report = dict(self.stats, staged=len(self.queue), cache_bytes=self.cache.size)
+        report["wait_seconds"] = round(report.get("wait_seconds", 0.0), 4)
+        return report
+
+
+# active stager, used by ue_utils.asset_import_task
+_active = None
+
+def activate(stager):
+    global _active
+    _active = stager
+    return stager
+
+def deactivate():
+    global _active
+    stager, _active = _active, None
+    if stager is not None:
+        stager.shutdown()
+    return stager
+
+def active():
+    return _active
+
+def prefetch(sources, hashes=None):
+    # planned import order, does nothing without an active stager
+    if _active is not None:
+        _active.stage(sources, hashes)
+
+def staged(source):
+    return _active.get(source) if _active is not None else source
+
+def original(path):
+    return _active.original(path) if _active is not None else path
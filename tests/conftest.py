@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+# the tools are flat modules loaded from the project folder, synthetic_fbx writes test files
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "benchmarks")]
+
+
+@pytest.fixture
+def fake_project(tmp_path):
+    """
+    Empty benchmarks/fake_unreal project imported as `unreal`, with fresh per-project singletons.
+    """
+    import fake_unreal
+    project = fake_unreal.install(fake_unreal.FakeProject(str(tmp_path / "project")))
+    import ue_utils
+    import anim_compression
+    for singletons in (ue_utils._skeleton_caches, ue_utils._content_indices, ue_utils._import_manifests, anim_compression._queues):
+        singletons.clear()
+    return project
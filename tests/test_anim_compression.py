@@ -0,0 +1,79 @@
+import json
+
+import fake_unreal
+
+
+def _queue(tmp_path):
+    import anim_compression
+    return anim_compression.CompressionQueue(str(tmp_path / "queue" / "anim_compression_queue.json"))
+
+def _anim(project, name, settings=fake_unreal.RECORDER_COMPRESSION):
+    object_path = f"/Game/Anims/{name}.{name}"
+    project.add_asset(object_path, "AnimSequence")
+    project.compression[object_path] = settings
+    return object_path
+
+
+def test_queue_round_trip(fake_project, tmp_path):
+    queue = _queue(tmp_path)
+    queue.add(["/Game/A.A", "/Game/B.B"])
+    queue.add(["/Game/C.C"], "/Game/Custom.Custom")
+    queue.remove(["/Game/B.B", "/Game/Missing.Missing"])
+    queue.save()
+    assert not queue.dirty
+    loaded = _queue(tmp_path)
+    assert len(loaded) == 2
+    assert loaded.entries["/Game/C.C"] == "/Game/Custom.Custom"
+
+def test_unreadable_queue_is_ignored(fake_project, tmp_path):
+    path = tmp_path / "queue" / "anim_compression_queue.json"
+    path.parent.mkdir()
+    path.write_text('{"/Game/A.A": ')
+    assert len(_queue(tmp_path)) == 0
+
+def test_pass_compresses_with_final_settings(fake_project, tmp_path):
+    import anim_compression
+    run = _anim(fake_project, "ANIM_Run")
+    walk = _anim(fake_project, "ANIM_Walk")
+    queue = _queue(tmp_path)
+    queue.add([run])
+    queue.add([walk, "/Game/Anims/Gone.Gone"], fake_unreal.DEFAULT_COMPRESSION)
+    queue.save()
+    report = anim_compression.CompressionPass(queue, chunk_size=2).run_blocking()
+    assert report["compressed"] == 2
+    assert report["failed"] == ["/Game/Anims/Gone.Gone"]
+    assert fake_project.compression[run] == fake_unreal.DEFAULT_COMPRESSION
+    assert fake_project.stats["anims_compressed"] == 2
+    # saved animations leave the queue, on disk too
+    assert report["queued"] == 0
+    with open(queue.path) as f:
+        assert json.load(f) == {}
+
+def test_cancelled_pass_keeps_the_rest_queued(fake_project, tmp_path):
+    import anim_compression
+    queue = _queue(tmp_path)
+    queue.add([_anim(fake_project, f"ANIM_{i}") for i in range(5)])
+    compression_pass = anim_compression.CompressionPass(queue, chunk_size=2)
+    compression_pass.start_time = 0.0
+    compression_pass.step()
+    compression_pass.cancel()
+    assert not compression_pass.step()
+    compression_pass._finish()
+    assert compression_pass.compressed == 2
+    assert len(queue) == 3
+
+def test_deferred_compression_restores_class_defaults(fake_project, tmp_path):
+    import anim_compression
+    defaults = fake_unreal.get_default_object(fake_unreal.AnimSequence)
+    before = defaults.get_editor_property("bone_compression_settings")
+    existing = _anim(fake_project, "ANIM_Old", "/Game/Custom.Custom")
+    fake_project.assets["/Game/Custom.Custom"] = "AnimBoneCompressionSettings"
+    compression = anim_compression.DeferredCompression(_queue(tmp_path))
+    with compression:
+        assert defaults.get_editor_property("bone_compression_settings").get_path_name() == anim_compression.DEFERRED_BONE_COMPRESSION
+        # entering again keeps the settings to restore
+        compression.begin()
+        compression.defer_existing(existing)
+    assert defaults.get_editor_property("bone_compression_settings") == before
+    assert fake_project.compression[existing] == fake_unreal.RECORDER_COMPRESSION
+    assert compression.final == {existing: "/Game/Custom.Custom"}
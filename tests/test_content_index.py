@@ -0,0 +1,64 @@
+import fake_unreal
+
+ASSETS = {
+    "/Game/Chars/Hero/SKM_Hero.SKM_Hero": "SkeletalMesh",
+    "/Game/Chars/Hero/SKL_Hero.SKL_Hero": "Skeleton",
+    "/Game/Chars/Hero/ANIM_Hero_Run.ANIM_Hero_Run": "AnimSequence",
+    "/Game/Chars/Wolf/SKM_Wolf.SKM_Wolf": "SkeletalMesh",
+    "/Game/Env/SM_Rock.SM_Rock": "StaticMesh",
+}
+
+
+def _index(project, root="/Game/Chars"):
+    import ue_utils
+    for object_path, asset_class in ASSETS.items():
+        project.add_asset(object_path, asset_class)
+    return ue_utils.ContentIndex(root).build()
+
+
+def test_build_is_scoped_to_root(fake_project):
+    index = _index(fake_project)
+    assert len(index) == 4
+    assert index.get("/Game/Env/SM_Rock.SM_Rock") is None
+    assert sorted(index.object_paths("SkeletalMesh")) == ["/Game/Chars/Hero/SKM_Hero.SKM_Hero", "/Game/Chars/Wolf/SKM_Wolf.SKM_Wolf"]
+    assert [entry.asset_name for entry in index.entries("Skeleton")] == ["SKL_Hero"]
+    entry = index.get("/Game/Chars/Hero/ANIM_Hero_Run.ANIM_Hero_Run")
+    assert (entry.package_name, entry.package_path, entry.asset_class) == \
+        ("/Game/Chars/Hero/ANIM_Hero_Run", "/Game/Chars/Hero", "AnimSequence")
+
+def test_incremental_updates(fake_project):
+    index = _index(fake_project)
+    index.remove_asset("/Game/Chars/Wolf/SKM_Wolf.SKM_Wolf")
+    assert index.object_paths("SkeletalMesh") == ["/Game/Chars/Hero/SKM_Hero.SKM_Hero"]
+    assert "/Game/Chars/Wolf" not in index.by_folder
+    new_data = fake_unreal.AssetData.from_path("/Game/Chars/Hero/SKM_Hero_LOD.SKM_Hero_LOD", "SkeletalMesh")
+    index.rename_asset("/Game/Chars/Hero/SKM_Hero.SKM_Hero", new_data)
+    assert index.object_paths("SkeletalMesh") == ["/Game/Chars/Hero/SKM_Hero_LOD.SKM_Hero_LOD"]
+    # outside the root
+    index.add_asset_data(fake_unreal.AssetData.from_path("/Game/Env/SK_Tree.SK_Tree", "Skeleton"))
+    assert len(index.object_paths("Skeleton")) == 1
+
+def test_refresh(fake_project):
+    index = _index(fake_project)
+    fake_project.add_asset("/Game/Chars/Hero/PHYS_Hero.PHYS_Hero", "PhysicsAsset")
+    fake_project.remove_asset("/Game/Chars/Hero/SKL_Hero.SKL_Hero")
+    index.refresh_path("/Game/Chars/Hero")
+    assert index.object_paths("PhysicsAsset") == ["/Game/Chars/Hero/PHYS_Hero.PHYS_Hero"]
+    assert index.object_paths("Skeleton") == []
+    fake_project.remove_asset("/Game/Chars/Wolf/SKM_Wolf.SKM_Wolf")
+    index.refresh_assets(["/Game/Chars/Wolf/SKM_Wolf.SKM_Wolf"])
+    assert index.get("/Game/Chars/Wolf/SKM_Wolf.SKM_Wolf") is None
+
+def test_imports_are_tracked(fake_project):
+    index = _index(fake_project)
+    fake_project.add_asset("/Game/Chars/Bird/SKM_Bird.SKM_Bird", "SkeletalMesh")
+    post_import = fake_unreal.get_editor_subsystem(fake_unreal.ImportSubsystem).on_asset_post_import
+    post_import.broadcast(None, fake_unreal.SkeletalMesh("/Game/Chars/Bird/SKM_Bird.SKM_Bird"))
+    assert index.get("/Game/Chars/Bird/SKM_Bird.SKM_Bird").asset_class == "SkeletalMesh"
+
+def test_asset_exists(fake_project):
+    import ue_utils
+    _index(fake_project)
+    assert ue_utils.asset_exists("/Game/Chars/Hero/SKM_Hero.SKM_Hero")
+    assert not ue_utils.asset_exists("/Game/Chars/Hero/SKM_Hero.Other")
+    assert not ue_utils.asset_exists("/Game/Chars/Hero/Missing.Missing")
@@ -0,0 +1,96 @@
+import pytest
+
+import fbx_preflight
+import synthetic_fbx
+
+BONES = ["root", "pelvis", "spine", "head"]
+PARENTS = [-1, 0, 1, 2]
+
+
+def test_skeletal_mesh(tmp_path):
+    path = synthetic_fbx.write_fbx(str(tmp_path / "SKM_Hero.fbx"), BONES, PARENTS, mesh=True)
+    info = fbx_preflight.inspect_fbx(path)
+    assert info["errors"] == []
+    assert info["format"] == "binary"
+    assert info["version"] == 7500
+    assert info["has_mesh"] and info["has_skeleton"] and not info["has_animation"]
+    assert info["bone_names"] == BONES
+    assert info["bone_parents"] == PARENTS
+    assert info["bone_count"] == 4
+    assert info["kind"] == fbx_preflight.SKELETAL_MESH
+    assert info["hash"] == fbx_preflight.file_hash(path)
+
+def test_animation_frame_range(tmp_path):
+    path = synthetic_fbx.write_fbx(str(tmp_path / "ANIM_Hero_Run.fbx"), BONES, PARENTS, mesh=False, frames=48)
+    info = fbx_preflight.inspect_fbx(path)
+    assert info["has_animation"] and not info["has_mesh"]
+    assert info["frame_rate"] == 24.0
+    assert info["frame_range"] == (0, 48)
+    assert info["kind"] == fbx_preflight.ANIMATION
+
+def test_ascii(tmp_path):
+    path = tmp_path / "hero.fbx"
+    path.write_text('; FBX 7.4.0 project file\n'
+                    'FBXHeaderExtension:  {\n\tFBXVersion: 7400\n}\n'
+                    'Objects:  {\n'
+                    '\tGeometry: 10, "Geometry::Body", "Mesh" {\n\t}\n'
+                    '\tModel: 1000, "Model::root", "LimbNode" {\n\t}\n'
+                    '\tModel: 1001, "Model::spine", "LimbNode" {\n\t}\n'
+                    '}\n'
+                    'Connections:  {\n\tC: "OO",1000,0\n\tC: "OO",1001,1000\n}\n')
+    info = fbx_preflight.inspect_fbx(str(path))
+    assert info["format"] == "ascii"
+    assert info["bone_names"] == ["root", "spine"]
+    assert info["bone_parents"] == [-1, 0]
+    assert info["kind"] == fbx_preflight.SKELETAL_MESH
+
+def test_not_an_fbx(tmp_path):
+    path = tmp_path / "broken.fbx"
+    path.write_bytes(b"not an fbx at all")
+    info = fbx_preflight.inspect_fbx(str(path))
+    assert info["kind"] == fbx_preflight.UNKNOWN
+    assert info["errors"] and "not an FBX file" in info["errors"][0]
+    with pytest.raises(fbx_preflight.PreflightError):
+        fbx_preflight.check(info, fbx_preflight.SKELETAL_MESH)
+
+def test_truncated_file(tmp_path):
+    path = synthetic_fbx.write_fbx(str(tmp_path / "SKM_Hero.fbx"), BONES, PARENTS)
+    with open(path, "r+b") as f:
+        f.truncate(200)
+    info = fbx_preflight.inspect_fbx(path)
+    assert info["errors"]
+    assert fbx_preflight.problems(info, fbx_preflight.SKELETAL_MESH) == info["errors"]
+
+
+def _info(path, mesh=False, skeleton=False, animation=False):
+    return {"path": path, "has_mesh": mesh, "has_skeleton": skeleton, "has_animation": animation}
+
+@pytest.mark.parametrize("path, content, kind", [
+    # the name hint wins when the content supports it
+    ("SKM_Hero.fbx", dict(mesh=True, skeleton=True, animation=True), fbx_preflight.SKELETAL_MESH),
+    ("ANIM_Hero.fbx", dict(mesh=True, skeleton=True, animation=True), fbx_preflight.ANIMATION),
+    # and rejects the file when it doesn't
+    ("SKM_Hero.fbx", dict(skeleton=True, animation=True), fbx_preflight.UNKNOWN),
+    ("ANIM_Hero.fbx", dict(mesh=True, skeleton=True), fbx_preflight.UNKNOWN),
+    # without a hint the content decides
+    ("hero.fbx", dict(mesh=True, skeleton=True), fbx_preflight.SKELETAL_MESH),
+    ("hero_run.fbx", dict(skeleton=True, animation=True), fbx_preflight.ANIMATION),
+    ("rock.fbx", dict(mesh=True), fbx_preflight.STATIC_MESH),
+    ("empty.fbx", dict(), fbx_preflight.UNKNOWN),
+])
+def test_classify(path, content, kind):
+    assert fbx_preflight.classify(_info(path, **content)) == kind
+
+def test_problems():
+    info = dict(_info("ANIM_Hero.fbx", skeleton=True, animation=True), errors=[], frame_range=(10, 10))
+    assert fbx_preflight.problems(info, fbx_preflight.ANIMATION) == ["empty frame range (10, 10)"]
+    info = dict(_info("SKM_Hero.fbx", mesh=True), errors=[], frame_range=None)
+    assert fbx_preflight.problems(info, fbx_preflight.SKELETAL_MESH) == ["no skeleton (no LimbNode bones)"]
+
+def test_expand_sources(tmp_path):
+    (tmp_path / "a" / "b").mkdir(parents=True)
+    for name in ("a/2.fbx", "a/1.FBX", "a/b/3.fbx", "a/notes.txt"):
+        (tmp_path / name).write_bytes(b"")
+    single = str(tmp_path / "a" / "b" / "3.fbx")
+    found = fbx_preflight.expand_sources([str(tmp_path / "a"), single])
+    assert [p[len(str(tmp_path)) + 1:].replace("\\", "/") for p in found] == ["a/1.FBX", "a/2.fbx", "a/b/3.fbx"]
@@ -0,0 +1,100 @@
+import os
+
+import import_cache
+from import_cache import ImportManifest
+
+
+def _source(tmp_path, name, content=b"fbx"):
+    path = tmp_path / name
+    path.write_bytes(content)
+    return str(path)
+
+def _manifest(tmp_path):
+    return ImportManifest(str(tmp_path / "Saved" / "import_manifest.json"))
+
+
+def test_rename_asset(tmp_path):
+    manifest = _manifest(tmp_path)
+    hero, wolf = _source(tmp_path, "SK_Hero.fbx"), _source(tmp_path, "SK_Wolf.fbx")
+    manifest.record(hero, "k", "/Game/A/Hero.Hero")
+    manifest.record(wolf, "k", "/Game/A/Wolf.Wolf")
+    manifest.rename_asset("/Game/A/Hero.Hero", "/Game/A/SKM_Hero.SKM_Hero")
+    manifest.rename_asset("/Game/A/Missing.Missing", "/Game/A/Other.Other")
+    assert manifest.get(hero)["asset_path"] == "/Game/A/SKM_Hero.SKM_Hero"
+    assert manifest.get(wolf)["asset_path"] == "/Game/A/Wolf.Wolf"
+    # renamed again after a reload
+    manifest.save()
+    reloaded = _manifest(tmp_path)
+    reloaded.rename_asset("/Game/A/SKM_Hero.SKM_Hero", "/Game/B/SKM_Hero.SKM_Hero")
+    assert reloaded.get(hero)["asset_path"] == "/Game/B/SKM_Hero.SKM_Hero"
+
+def test_rename_after_reimport(tmp_path):
+    manifest = _manifest(tmp_path)
+    hero = _source(tmp_path, "SK_Hero.fbx")
+    manifest.record(hero, "k", "/Game/A/Hero.Hero")
+    manifest.record(hero, "k", "/Game/A/Hero_2.Hero_2")
+    # the entry no longer points at the first asset
+    manifest.rename_asset("/Game/A/Hero.Hero", "/Game/A/SKM_Hero.SKM_Hero")
+    assert manifest.get(hero)["asset_path"] == "/Game/A/Hero_2.Hero_2"
+    assert manifest.by_asset == {"/Game/A/Hero_2.Hero_2": {import_cache.source_key(hero)}}
+
+
+def test_unchanged_source(tmp_path):
+    manifest = _manifest(tmp_path)
+    hero = _source(tmp_path, "SK_Hero.fbx")
+    assert not manifest.is_unchanged(hero, "k")
+    manifest.record(hero, "k", "/Game/A/Hero.Hero")
+    assert manifest.is_unchanged(hero, "k")
+    assert manifest.is_stamp_unchanged(hero)
+    # other import options, or the asset is gone
+    assert not manifest.is_unchanged(hero, "other")
+    assert not manifest.is_unchanged(hero, "k", asset_exists=lambda asset_path: False)
+
+def test_touched_source_compares_content(tmp_path):
+    manifest = _manifest(tmp_path)
+    hero = _source(tmp_path, "SK_Hero.fbx")
+    manifest.record(hero, "k", "/Game/A/Hero.Hero")
+    mtime = os.path.getmtime(hero) + 10
+    os.utime(hero, (mtime, mtime))
+    assert not manifest.is_stamp_unchanged(hero)
+    manifest.dirty = False
+    assert manifest.is_unchanged(hero, "k")
+    # the new mtime is remembered, no hashing next time
+    assert manifest.dirty and manifest.get(hero)["mtime"] == mtime
+    assert manifest.is_stamp_unchanged(hero)
+
+def test_modified_source(tmp_path):
+    manifest = _manifest(tmp_path)
+    hero = _source(tmp_path, "SK_Hero.fbx")
+    manifest.record(hero, "k", "/Game/A/Hero.Hero")
+    _source(tmp_path, "SK_Hero.fbx", b"fbz")
+    mtime = os.path.getmtime(hero) + 10
+    os.utime(hero, (mtime, mtime))
+    assert not manifest.is_unchanged(hero, "k")
+    os.remove(hero)
+    assert not manifest.is_unchanged(hero, "k")
+
+def test_merge_takes_newer_entries(tmp_path):
+    ours, theirs = _manifest(tmp_path), ImportManifest(str(tmp_path / "worker" / "import_manifest.json"))
+    hero, wolf = _source(tmp_path, "SK_Hero.fbx"), _source(tmp_path, "SK_Wolf.fbx")
+    theirs.record(hero, "k", "/Game/A/Hero_Old.Hero_Old")
+    ours.record(hero, "k", "/Game/A/Hero.Hero")
+    theirs.record(wolf, "k", "/Game/A/Wolf.Wolf")
+    ours.dirty = False
+    assert ours.merge(theirs) == 1
+    assert ours.dirty
+    assert ours.get(hero)["asset_path"] == "/Game/A/Hero.Hero"
+    assert ours.get(wolf)["asset_path"] == "/Game/A/Wolf.Wolf"
+    ours.rename_asset("/Game/A/Wolf.Wolf", "/Game/A/SKM_Wolf.SKM_Wolf")
+    assert ours.get(wolf)["asset_path"] == "/Game/A/SKM_Wolf.SKM_Wolf"
+
+
+def test_cache_hit_needs_the_asset(fake_project, tmp_path):
+    import ue_utils
+    hero = _source(tmp_path, "SK_Hero.fbx")
+    fake_project.add_asset("/Game/A/SKM_Hero.SKM_Hero", "SkeletalMesh")
+    ue_utils.get_import_manifest().record(hero, "k", "/Game/A/SKM_Hero.SKM_Hero")
+    assert ue_utils.is_cache_hit(hero, "k")
+    # deleted outside the importer
+    fake_project.remove_asset("/Game/A/SKM_Hero.SKM_Hero")
+    assert not ue_utils.is_cache_hit(hero, "k")
@@ -0,0 +1,97 @@
+import os
+
+import import_journal
+from import_journal import ImportJournal, NEEDS_IMPORT, NEEDS_POST_PROCESS
+
+SOURCES = ["/drop/a.fbx", "/drop/b.fbx", "/drop/c.fbx", "/drop/d.fbx"]
+
+
+def _new(tmp_path, **batch):
+    journal = ImportJournal(str(tmp_path / "batch.jsonl"), dict({"destination": "/Game/Test", "post_process": True}, **batch))
+    journal.queue(SOURCES)
+    return journal
+
+def _replay(journal, **kwargs):
+    journal.close()
+    return ImportJournal(journal.path, **kwargs)
+
+
+def test_replay_states(tmp_path):
+    journal = _new(tmp_path)
+    # a: done
+    journal.importing(SOURCES[0])
+    journal.imported(SOURCES[0], ["/Game/Test/A.A"])
+    journal.saved(["/Game/Test/A.A"])
+    journal.post_processed(SOURCES[0], ["/Game/Test/SKM_A.SKM_A"])
+    # b: saved, the rename is missing
+    journal.importing(SOURCES[1])
+    journal.imported(SOURCES[1], ["/Game/Test/B.B"], saved=True)
+    # c: imported in memory only
+    journal.importing(SOURCES[2])
+    journal.imported(SOURCES[2], ["/Game/Test/C.C"])
+    # d: skipped
+    journal.skipped(SOURCES[3], "cache hit")
+
+    replayed = _replay(journal)
+    assert replayed.batch["destination"] == "/Game/Test"
+    assert replayed.unfinished() == {SOURCES[1]: NEEDS_POST_PROCESS, SOURCES[2]: NEEDS_IMPORT}
+    assert replayed.assets[SOURCES[0]] == ["/Game/Test/SKM_A.SKM_A"]
+    assert replayed.assets[SOURCES[1]] == ["/Game/Test/B.B"]
+    assert replayed.errors[SOURCES[3]] == "cache hit"
+    assert replayed.summary() == {"finished": 2, "unfinished": 2, "crashed": 0}
+
+def test_saved_before_imported(tmp_path):
+    # a bulk save inside the import call is journaled before the import finishes
+    journal = _new(tmp_path)
+    journal.importing(SOURCES[0])
+    journal.saved(["/Game/Test/A.A"])
+    journal.imported(SOURCES[0], ["/Game/Test/A.A"])
+    assert NEEDS_POST_PROCESS == _replay(journal).unfinished()[SOURCES[0]]
+
+def test_without_post_process(tmp_path):
+    journal = _new(tmp_path, post_process=False)
+    journal.importing(SOURCES[0])
+    journal.imported(SOURCES[0], ["/Game/Test/A.A"], saved=True)
+    assert SOURCES[0] not in _replay(journal).unfinished()
+
+def test_new_attempt_starts_over(tmp_path):
+    journal = _new(tmp_path)
+    journal.importing(SOURCES[0])
+    journal.imported(SOURCES[0], ["/Game/Test/A.A"], saved=True)
+    journal.importing(SOURCES[0])
+    replayed = _replay(journal, max_attempts=3)
+    assert replayed.unfinished()[SOURCES[0]] == NEEDS_IMPORT
+    assert replayed.assets[SOURCES[0]] == []
+    assert replayed.attempts[SOURCES[0]] == 2
+
+def test_crashed(tmp_path):
+    journal = _new(tmp_path)
+    journal.importing(SOURCES[0])
+    replayed = _replay(journal, max_attempts=2)
+    assert replayed.crashed() == []
+    replayed.importing(SOURCES[0])
+    replayed = _replay(replayed, max_attempts=2)
+    assert replayed.crashed() == [SOURCES[0]]
+    assert SOURCES[0] not in replayed.unfinished()
+
+def test_torn_last_line(tmp_path):
+    journal = _new(tmp_path)
+    journal.importing(SOURCES[0])
+    journal.close()
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"state":"imported","source":"/drop/a.f')
+    replayed = ImportJournal(journal.path)
+    assert replayed.unfinished()[SOURCES[0]] == NEEDS_IMPORT
+    # records appended after the torn line are read back
+    replayed.failed(SOURCES[0], "import produced no assets")
+    assert SOURCES[0] not in _replay(replayed).unfinished()
+
+def test_prune(tmp_path):
+    for i in range(5):
+        path = tmp_path / f"batch_{i}.jsonl"
+        path.write_text("")
+        stamp = 1000000 + i
+        os.utime(path, (stamp, stamp))
+    import_journal.prune(str(tmp_path), keep=2)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["batch_3.jsonl", "batch_4.jsonl"]
+    assert import_journal.latest_journal(str(tmp_path)).endswith("batch_4.jsonl")
@@ -0,0 +1,61 @@
+def _graph(order, fail=()):
+    import import_scheduler as s
+    scheduler = s.ImportGraphScheduler(chunk_size=2, root="/Game/Test")
+
+    def step(node):
+        order.append(node.key)
+        if node.key in fail:
+            raise RuntimeError("broken file")
+        return [f"/Game/Test/{node.key}"] if node.stage == s.IMPORT else None
+    for name in ("hero", "wolf"):
+        mesh = scheduler.add(f"mesh:{name}", s.IMPORT, step, source=f"SK_{name}.fbx")
+        scheduler.add(f"post:{name}", s.POST_PROCESS, step, [mesh], f"SK_{name}.fbx")
+        anim = scheduler.add(f"anim:{name}", s.IMPORT, step, [mesh], f"ANIM_{name}.fbx")
+        scheduler.add(f"validate:{name}", s.VALIDATE, step, [mesh, anim])
+    return scheduler
+
+
+def test_follow_up_stages_first(fake_project):
+    order = list()
+    scheduler = _graph(order)
+    scheduler.run_blocking()
+    # follow-up steps go first and imports keep the insertion order, so a character is
+    # finished before the next one starts
+    assert order == ["mesh:hero", "post:hero", "anim:hero", "validate:hero",
+                     "mesh:wolf", "post:wolf", "anim:wolf", "validate:wolf"]
+    assert (scheduler.done, scheduler.total) == (4, 4)
+    assert scheduler.finished_nodes == len(scheduler.nodes) == 8
+
+def test_inputs_are_dependency_results(fake_project):
+    import import_scheduler as s
+    scheduler = s.ImportGraphScheduler()
+    mesh = scheduler.add("mesh", s.IMPORT, lambda node: ["/Game/Test/Hero"])
+    post = scheduler.add("post", s.POST_PROCESS, lambda node: list(node.inputs[0]), [mesh])
+    scheduler.run_blocking()
+    assert post.result == ["/Game/Test/Hero"]
+    assert scheduler.produced == ["/Game/Test/Hero"]
+
+def test_failure_skips_dependents(fake_project):
+    import import_scheduler as s
+    order = list()
+    scheduler = _graph(order, fail={"mesh:hero"})
+    scheduler.run_blocking()
+    assert "anim:hero" not in order and "post:hero" not in order
+    assert sorted(node.key for node in scheduler.failed_nodes()) == ["anim:hero", "mesh:hero", "post:hero", "validate:hero"]
+    assert [node.state for node in scheduler.nodes if node.key.endswith("wolf")] == [s.DONE] * 4
+    assert (scheduler.done, scheduler.total) == (4, 4)
+
+def test_ticks_and_cancel(fake_project):
+    order = list()
+    scheduler = _graph(order)
+    progress = list()
+    scheduler.progress_callbacks.append(lambda scheduler, *args: progress.append(scheduler.done))
+    scheduler.start()
+    fake_project.tick()
+    assert order == ["mesh:hero", "post:hero"]
+    scheduler.cancel()
+    fake_project.tick()
+    assert scheduler.finished and scheduler.cancelled
+    assert order == ["mesh:hero", "post:hero"]
+    assert not fake_project.tick_callbacks
+    assert progress == [1]
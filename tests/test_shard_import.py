@@ -0,0 +1,89 @@
+import json
+import os
+
+import fbx_preflight
+import shard_import
+import skeleton_cache
+from fake_unreal import rig_template
+
+
+def _info(kind, bone_count=0, size=100, prefix=""):
+    names, parents = rig_template(bone_count) if bone_count else ([], [])
+    names = [prefix + name for name in names]
+    return {"kind": kind, "bone_names": names, "bone_parents": parents, "size": size}
+
+PREFLIGHT = {
+    "SKM_Hero.fbx": _info(fbx_preflight.SKELETAL_MESH, 60, size=1000),
+    "ANIM_Hero_Run.fbx": _info(fbx_preflight.ANIMATION, 60, size=300),
+    "SKM_Wolf.fbx": _info(fbx_preflight.SKELETAL_MESH, 80, size=800),
+    "ANIM_Wolf_Bite.fbx": _info(fbx_preflight.ANIMATION, 80, size=300),
+    # no mesh in the drop, grouped by bone set
+    "ANIM_Bird_Fly.fbx": _info(fbx_preflight.ANIMATION, 40, size=200, prefix="bird_"),
+    "ANIM_Bird_Land.fbx": _info(fbx_preflight.ANIMATION, 40, size=200, prefix="bird_"),
+    "rock.fbx": _info(fbx_preflight.STATIC_MESH, size=50),
+}
+
+
+def test_dependency_groups():
+    groups = shard_import.dependency_groups(list(PREFLIGHT), PREFLIGHT)
+    assert sorted(sorted(group) for group in groups) == [
+        ["ANIM_Bird_Fly.fbx", "ANIM_Bird_Land.fbx"],
+        ["ANIM_Hero_Run.fbx", "SKM_Hero.fbx"],
+        ["ANIM_Wolf_Bite.fbx", "SKM_Wolf.fbx"],
+        ["rock.fbx"],
+    ]
+
+def test_shard_balances_groups():
+    shards = shard_import.shard({"/Game/A": list(PREFLIGHT)}, PREFLIGHT, 2)
+    assert len(shards) == 2
+    loads = [sum(PREFLIGHT[source]["size"] for source in s["/Game/A"]) for s in shards]
+    # largest first onto the least loaded: hero 1300 | wolf 1100, bird 400 | rock 50
+    assert sorted(loads) == [1350, 1500]
+    # a mesh and its animations stay together
+    for s in shards:
+        assert ("SKM_Hero.fbx" in s["/Game/A"]) == ("ANIM_Hero_Run.fbx" in s["/Game/A"])
+
+def test_shard_drops_empty_workers():
+    jobs = {"/Game/A": ["SKM_Hero.fbx", "ANIM_Hero_Run.fbx"], "/Game/B": ["rock.fbx"]}
+    shards = shard_import.shard(jobs, PREFLIGHT, 8)
+    assert sorted(map(sorted, shards)) == [["/Game/A"], ["/Game/B"]]
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+def _coordinator(tmp_path):
+    saved = tmp_path / "Saved"
+    coordinator = shard_import.ShardCoordinator({}, local=True, work_dir=str(tmp_path / "work"),
+                                                import_manifest=str(saved / "import_manifest.json"))
+    workers = [str(tmp_path / "work" / f"worker_{i:02d}") for i in range(2)]
+    return coordinator, str(saved), workers
+
+def test_merge_compression_queues(tmp_path):
+    coordinator, saved, workers = _coordinator(tmp_path)
+    _write(os.path.join(saved, shard_import.COMPRESSION_QUEUE_FILE), {"/Game/A/Run.Run": "/Game/Custom.Custom"})
+    _write(os.path.join(workers[0], shard_import.COMPRESSION_QUEUE_FILE), {"/Game/A/Run.Run": "/Engine/Default.Default",
+                                                                            "/Game/A/Walk.Walk": "/Engine/Default.Default"})
+    _write(os.path.join(workers[1], shard_import.COMPRESSION_QUEUE_FILE), {"/Game/B/Bite.Bite": "/Engine/Default.Default"})
+    assert coordinator.merge_compression_queues(workers) == 2
+    with open(os.path.join(saved, shard_import.COMPRESSION_QUEUE_FILE)) as f:
+        assert json.load(f) == {"/Game/A/Run.Run": "/Game/Custom.Custom", "/Game/A/Walk.Walk": "/Engine/Default.Default",
+                                "/Game/B/Bite.Bite": "/Engine/Default.Default"}
+
+def test_merge_skeleton_caches(tmp_path):
+    coordinator, saved, workers = _coordinator(tmp_path)
+    fp = skeleton_cache.fingerprint(*rig_template(10))
+    project = skeleton_cache.SkeletonFingerprintCache(os.path.join(saved, shard_import.SKELETON_CACHE_FILE))
+    project.put("/Game/A/SK_Hero", (10, 100.0), fp)
+    project.save()
+    for worker, stamp in zip(workers, [(12, 200.0), (10, 50.0)]):
+        cache = skeleton_cache.SkeletonFingerprintCache(os.path.join(worker, shard_import.SKELETON_CACHE_FILE))
+        cache.put("/Game/A/SK_Hero", stamp, fp)
+        cache.put(f"/Game/B/SK_{os.path.basename(worker)}", stamp, fp)
+        cache.save()
+    assert coordinator.merge_skeleton_caches(workers) == 3
+    merged = skeleton_cache.SkeletonFingerprintCache(os.path.join(saved, shard_import.SKELETON_CACHE_FILE))
+    assert merged.entries["/Game/A/SK_Hero"]["stamp"] == [12, 200.0]
+    assert sorted(merged.entries) == ["/Game/A/SK_Hero", "/Game/B/SK_worker_00", "/Game/B/SK_worker_01"]
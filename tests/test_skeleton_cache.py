@@ -0,0 +1,109 @@
+import os
+import json
+
+import skeleton_cache
+from skeleton_cache import SkeletonFingerprintCache
+from fake_unreal import rig_template
+
+
+def test_fingerprint():
+    names, parents = rig_template(20)
+    fp = skeleton_cache.fingerprint(names, parents)
+    assert fp["bone_count"] == 20
+    assert skeleton_cache.same_hierarchy(fp, skeleton_cache.fingerprint(names, parents))
+    # same bones, other parenting
+    other = skeleton_cache.fingerprint(*rig_template(20, variant=1))
+    assert skeleton_cache.related(fp, other)
+    assert not skeleton_cache.same_hierarchy(fp, other)
+    # without parents only the ordered names are compared
+    names_only = skeleton_cache.fingerprint(names)
+    assert names_only["hierarchy_hash"] is None
+    assert skeleton_cache.same_hierarchy(fp, names_only)
+    assert skeleton_cache.hierarchy_key(names_only) == names_only["names_hash"]
+
+def test_topology_ignores_bone_order():
+    names, parents = ["root", "spine", "head"], [-1, 0, 1]
+    reordered = skeleton_cache.fingerprint(["root", "head", "spine"], [-1, 2, 0])
+    fp = skeleton_cache.fingerprint(names, parents)
+    assert fp["topology_hash"] == reordered["topology_hash"]
+    assert fp["hierarchy_hash"] != reordered["hierarchy_hash"]
+
+def test_unrelated():
+    fp = skeleton_cache.fingerprint(*rig_template(20))
+    assert not skeleton_cache.related(fp, skeleton_cache.fingerprint(*rig_template(30)))
+
+
+def test_cache_stamps(tmp_path):
+    path = str(tmp_path / "skeleton_fingerprints.json")
+    cache = SkeletonFingerprintCache(path)
+    fp = skeleton_cache.fingerprint(*rig_template(10))
+    cache.put("/Game/SK_Hero", (100, 5.0), fp)
+    # unsaved packages have no stamp
+    cache.put("/Game/SK_New", None, fp)
+    assert cache.get("/Game/SK_Hero", (100, 5.0)) == fp
+    assert cache.get("/Game/SK_Hero", (100, 6.0)) is None
+    assert cache.get("/Game/SK_New", None) is None
+    cache.save()
+    assert not cache.dirty
+    assert SkeletonFingerprintCache(path).get("/Game/SK_Hero", (100, 5.0)) == fp
+
+def test_cache_prune(tmp_path):
+    cache = SkeletonFingerprintCache(str(tmp_path / "skeleton_fingerprints.json"))
+    fp = skeleton_cache.fingerprint(*rig_template(10))
+    cache.put("/Game/SK_Hero", (1, 1.0), fp)
+    cache.put("/Game/SK_Gone", (1, 1.0), fp)
+    cache.dirty = False
+    cache.prune(["/Game/SK_Hero", "/Game/SK_Other"])
+    assert list(cache.entries) == ["/Game/SK_Hero"]
+    assert cache.dirty
+
+def test_cache_of_other_version_is_ignored(tmp_path):
+    path = tmp_path / "skeleton_fingerprints.json"
+    path.write_text(json.dumps({"version": skeleton_cache.CACHE_VERSION - 1, "entries": {"/Game/SK_Hero": {}}}))
+    assert SkeletonFingerprintCache(str(path)).entries == {}
+    path.write_text("{")
+    assert SkeletonFingerprintCache(str(path)).entries == {}
+
+
+def test_fingerprints_loaded_once(fake_project):
+    import ue_utils
+    skeleton = "/Game/Characters/SK_Hero.SK_Hero"
+    fake_project.add_asset(skeleton, "Skeleton", rig_template(30), on_disk=True)
+    fp = ue_utils.get_skeleton_fingerprint(skeleton)
+    assert fp["bone_count"] == 30
+    loads = fake_project.stats["load_object"]
+    assert ue_utils.get_skeleton_fingerprint(skeleton) == fp
+    assert fake_project.stats["load_object"] == loads
+    # saving the skeleton invalidates its entry
+    fake_project.bones[skeleton] = rig_template(31)
+    fake_project.save_package("/Game/Characters/SK_Hero")
+    package_file = fake_project.package_file("/Game/Characters/SK_Hero")
+    mtime = os.path.getmtime(package_file) + 10
+    os.utime(package_file, (mtime, mtime))
+    assert ue_utils.get_skeleton_fingerprint(skeleton)["bone_count"] == 31
+
+
+def _index(**skeletons):
+    return skeleton_cache.SkeletonIndex({f"/Game/{name}.{name}": skeleton_cache.fingerprint(*rig) for name, rig in skeletons.items()})
+
+def test_match_same_hierarchy():
+    index = _index(SKL_Hero=rig_template(40), SKL_Wolf=rig_template(60))
+    assert index.match(*rig_template(40)) == ("/Game/SKL_Hero.SKL_Hero", "same hierarchy")
+
+def test_match_smallest_superset():
+    index = _index(SKL_Hero=rig_template(40), SKL_Giant=rig_template(60))
+    # an animation of the first 30 bones
+    assert index.match(*rig_template(30)) == ("/Game/SKL_Hero.SKL_Hero", "contains all 30 bones")
+    names, parents = rig_template(30, variant=1)
+    assert index.match(names, parents)[0] is None
+
+def test_match_hint_breaks_ties():
+    index = _index(SKL_Hero=rig_template(40), SKL_Villain=rig_template(40))
+    assert index.match(*rig_template(40), hint="ANIM_Hero_Run.fbx") == ("/Game/SKL_Hero.SKL_Hero", "same hierarchy, name match")
+    skeleton, reason = index.match(*rig_template(40), hint="ANIM_Wolf_Run.fbx")
+    assert skeleton is None and reason.startswith("ambiguous: 2 skeletons")
+
+def test_match_nothing():
+    index = _index(SKL_Hero=rig_template(40))
+    assert index.match([], []) == (None, "no bones")
+    assert index.match(["tail_01", "tail_02"], [-1, 0]) == (None, "no skeleton contains the animated bones")
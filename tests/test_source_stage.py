@@ -0,0 +1,71 @@
+import os
+
+from source_stage import StageCache
+
+
+def _add(cache, file_hash, name, size):
+    temp_path = cache.temp_path()
+    with open(temp_path, "wb") as f:
+        f.write(b"x" * size)
+    return cache.add(file_hash, name, temp_path)
+
+def _cached(cache):
+    return [os.path.basename(path) for path in cache.entries]
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = StageCache(str(tmp_path), 300)
+    a = _add(cache, "aa01", "a.fbx", 100)
+    _add(cache, "bb02", "b.fbx", 100)
+    _add(cache, "cc03", "c.fbx", 100)
+    assert cache.lookup("aa01", "a.fbx") == a
+    _add(cache, "dd04", "d.fbx", 100)
+    assert _cached(cache) == ["c.fbx", "a.fbx", "d.fbx"]
+    assert cache.size == 300
+    assert not os.path.exists(cache.entry_folder("bb02"))
+    assert cache.lookup("bb02", "b.fbx") is None
+
+def test_pinned_files_stay(tmp_path):
+    cache = StageCache(str(tmp_path), 150)
+    a = _add(cache, "aa01", "a.fbx", 100)
+    temp_path = cache.temp_path()
+    with open(temp_path, "wb") as f:
+        f.write(b"x" * 100)
+    b = cache.add("bb02", "b.fbx", temp_path, pinned={a})
+    # over budget rather than evicting the pinned file or the file just added
+    assert os.path.exists(a) and os.path.exists(b)
+    assert cache.size == 200
+    # evicted once no longer pinned
+    _add(cache, "cc03", "c.fbx", 10)
+    assert _cached(cache) == ["b.fbx", "c.fbx"]
+
+def test_new_copy_survives_full_cache(tmp_path):
+    cache = StageCache(str(tmp_path), 100)
+    a = _add(cache, "aa01", "a.fbx", 80)
+    b = _add(cache, "bb02", "b.fbx", 80)
+    assert not os.path.exists(a)
+    assert os.path.exists(b) and cache.entries[b] == 80
+
+def test_same_content_other_name(tmp_path):
+    cache = StageCache(str(tmp_path), 1000)
+    a = _add(cache, "aa01", "SKM_Hero.fbx", 100)
+    b = cache.lookup("aa01", "SKM_Hero_Copy.fbx")
+    assert b is not None and b != a
+    assert os.path.dirname(a) == os.path.dirname(b)
+    assert open(b, "rb").read() == open(a, "rb").read()
+    assert cache.size == 200
+
+def test_scan_restores_recency(tmp_path):
+    cache = StageCache(str(tmp_path), 1000)
+    a = _add(cache, "aa01", "a.fbx", 100)
+    b = _add(cache, "bb02", "b.fbx", 100)
+    os.utime(a, (2000000, 2000000))
+    os.utime(b, (1000000, 1000000))
+    leftover = cache.temp_path()
+    open(leftover, "wb").close()
+
+    scanned = StageCache(str(tmp_path), 1000)
+    assert _cached(scanned) == ["b.fbx", "a.fbx"]
+    assert scanned.size == 200
+    # copy of a crashed session
+    assert not os.path.exists(leftover)
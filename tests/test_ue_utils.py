@@ -0,0 +1,23 @@
+import fake_unreal
+
+
+def _skeleton(project, name, bone_count, variant=0):
+    object_path = f"/Game/Characters/{name}.{name}"
+    project.add_asset(object_path, "Skeleton", fake_unreal.rig_template(bone_count, variant), on_disk=True)
+    return object_path
+
+
+def test_unrelated_new_skeletons(fake_project):
+    import ue_utils
+    new = [_skeleton(fake_project, "SK_Hero", 53), _skeleton(fake_project, "SK_Wolf", 77)]
+    assert ue_utils.validate_skeleton(new) == "All skeletons are A-OK!"
+
+def test_diverging_skeletons(fake_project):
+    import ue_utils
+    known = _skeleton(fake_project, "SK_Hero", 60)
+    _skeleton(fake_project, "SK_Wolf", 77)
+    new = _skeleton(fake_project, "SK_Hero_v2", 60, variant=1)
+    warning, groups = ue_utils.validate_skeleton([new])
+    assert warning.startswith("[WARNING]")
+    assert sorted(name for names in groups.values() for name in names) == [known, new]
+    assert all(len(names) == 1 for names in groups.values())
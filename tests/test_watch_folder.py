@@ -0,0 +1,70 @@
+import os
+import queue
+
+
+def _reported(watcher):
+    found = list()
+    while True:
+        try:
+            found.append(os.path.basename(watcher.changes.get_nowait()))
+        except queue.Empty:
+            return found
+
+def _watcher(tmp_path):
+    import watch_folder
+    drop = tmp_path / "drop"
+    drop.mkdir()
+    return drop, watch_folder.FolderWatcher([str(drop)], settle=2.0)
+
+
+def test_reports_settled_files_once(fake_project, tmp_path):
+    drop, watcher = _watcher(tmp_path)
+    (drop / "SKM_Hero.fbx").write_bytes(b"x" * 10)
+    (drop / "notes.txt").write_bytes(b"x")
+    watcher.poll(now=100.0)
+    assert _reported(watcher) == []
+    watcher.poll(now=101.0)
+    assert _reported(watcher) == []
+    watcher.poll(now=102.0)
+    assert _reported(watcher) == ["SKM_Hero.fbx"]
+    watcher.poll(now=110.0)
+    assert _reported(watcher) == []
+
+def test_changes_restart_settling(fake_project, tmp_path):
+    drop, watcher = _watcher(tmp_path)
+    (drop / "sub").mkdir()
+    path = drop / "sub" / "ANIM_Run.fbx"
+    path.write_bytes(b"x")
+    watcher.poll(now=100.0)
+    path.write_bytes(b"x" * 20)
+    watcher.poll(now=101.0)
+    watcher.poll(now=102.5)
+    assert _reported(watcher) == []
+    watcher.poll(now=103.0)
+    assert _reported(watcher) == ["ANIM_Run.fbx"]
+
+def test_empty_files_wait(fake_project, tmp_path):
+    drop, watcher = _watcher(tmp_path)
+    path = drop / "SKM_Hero.fbx"
+    path.write_bytes(b"")
+    watcher.poll(now=100.0)
+    watcher.poll(now=105.0)
+    assert _reported(watcher) == []
+    path.write_bytes(b"x")
+    watcher.poll(now=106.0)
+    watcher.poll(now=108.0)
+    assert _reported(watcher) == ["SKM_Hero.fbx"]
+
+def test_locked_file_reported_once_readable(fake_project, tmp_path, monkeypatch):
+    import watch_folder
+    drop, watcher = _watcher(tmp_path)
+    (drop / "SKM_Hero.fbx").write_bytes(b"x" * 10)
+    locked = {"SKM_Hero.fbx"}
+    monkeypatch.setattr(watch_folder, "_readable", lambda path: os.path.basename(path) not in locked)
+    watcher.poll(now=100.0)
+    watcher.poll(now=102.0)
+    assert _reported(watcher) == []
+    # the writer closes the file without changing its size or mtime
+    locked.clear()
+    watcher.poll(now=103.0)
+    assert _reported(watcher) == ["SKM_Hero.fbx"]
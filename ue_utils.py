@@ -1,51 +1,204 @@
 import os
+import re
+import time
 # import yaml
 import unreal
 
+import fbx_preflight
+import import_cache
+import import_trace
+import skeleton_cache
+import source_stage
 
-def validate_skeleton(skeletons):
-    unreal.log("In validate_skeleton")
-    # first we get each skeleton's bone hierarchy
-    # store bone hierarchy in bone_map, bone_map[skeleton.name] = bone_hierarchy
-    # create a group dict to group skeleton. we validate the length of bone_hierarchy
-    # for skeleton in bone_map, if len(bone_hierarchy) not in group, append group[len(bone_hierarchy)] = [bone_name], else group[len(bone_hierarchy)].append(bone_name)    
-    bone_map = {}
-    for skeleton in skeletons:
+
+def get_bone_hierarchy(skeleton):
+    """
+    Returns bone names and parent indices of a loaded skeleton in reference skeleton order.
+    Parent indices are None when the engine version doesn't expose them to python.
+    """
+    ref_pose = unreal.AnimPoseExtensions.get_reference_pose(skeleton)
+    bone_names = [str(name) for name in unreal.AnimPoseExtensions.get_bone_names(ref_pose)]
+    try:
+        bone_parents = [int(index) for index in ref_pose.get_editor_property("parent_bone_indices")]
+    except Exception:
+        bone_parents = None
+    return bone_names, bone_parents
+
+def package_file(package_name):
+    # /Game/Characters/SKL_Hero -> <project>/Content/Characters/SKL_Hero.uasset
+    if not package_name.startswith("/Game/"):
+        return None
+    return os.path.join(unreal.Paths.project_content_dir(), package_name[len("/Game/"):] + ".uasset")
+
+def package_file_stamp(package_name):
+    # size and mtime of the saved package, None for unsaved or non project packages
+    filename = package_file(package_name)
+    try:
+        stat = os.stat(filename)
+    except (OSError, TypeError):
+        return None
+    return (stat.st_size, stat.st_mtime)
+
+_skeleton_caches = globals().get("_skeleton_caches", {})
+
+# set by shard_import for its workers, each one works on a private copy of the cache
+SKELETON_CACHE_VARIABLE = "ASSET_IMPORTER_SKELETON_CACHE"
+
+def get_skeleton_cache(path=None):
+    if path is None:
+        path = os.environ.get(SKELETON_CACHE_VARIABLE) or os.path.join(unreal.Paths.project_saved_dir(), "AssetImporter", "skeleton_fingerprints.json")
+    cache = _skeleton_caches.get(path)
+    if cache is None:
+        cache = _skeleton_caches[path] = skeleton_cache.SkeletonFingerprintCache(path)
+    return cache
+
+def get_skeleton_fingerprint(skeleton, force=False):
+    """
+    Fingerprint of a skeleton object path. Only loads the skeleton when the cached
+    fingerprint is missing or the package was saved since.
+    """
+    cache = get_skeleton_cache()
+    package_name = skeleton.split('.')[0]
+    stamp = package_file_stamp(package_name)
+    fp = None if force else cache.get(package_name, stamp)
+    if fp is None:
         sk_obj = unreal.load_object(None, skeleton)
+        import_trace.count("objects_loaded")
         if not isinstance(sk_obj, unreal.Skeleton):
             unreal.log_error(f"Invalid skeleton {skeleton}")
-        bone_tree = sk_obj.get_editor_property("bone_tree")
-        bone_hierarchy = [bone for bone in bone_tree]
-        bone_map[skeleton] = bone_hierarchy
+            return None
+        fp = skeleton_cache.fingerprint(*get_bone_hierarchy(sk_obj))
+        cache.put(package_name, stamp, fp)
+    return fp
 
-    group = {}
-    for skeleton, bones in bone_map.items():
-        if len(bones) not in group:
-            group[len(bones)] = [skeleton]
+def get_skeleton_index(root="/Game"):
+    """
+    Index of every skeleton in the project, built from cached fingerprints.
+    """
+    fingerprints = dict()
+    for skeleton in get_content_index(root).object_paths('Skeleton'):
+        fp = get_skeleton_fingerprint(skeleton)
+        if fp is not None:
+            fingerprints[skeleton] = fp
+    get_skeleton_cache().save()
+    return skeleton_cache.SkeletonIndex(fingerprints)
+
+@import_trace.traced("skeleton_match")
+def match_skeletons(anim_infos, root="/Game"):
+    """
+    Picks a skeleton for each animation from its preflight info.
+    Returns ({source: skeleton object path}, {source: reason unresolved})
+    """
+    skeleton_index = get_skeleton_index(root)
+    matched, unresolved = dict(), dict()
+    for source, info in anim_infos.items():
+        if info is None:
+            unresolved[source] = "not inspected"
+            continue
+        skeleton, reason = skeleton_index.match(info["bone_names"], info["bone_parents"], hint=source)
+        if skeleton:
+            unreal.log(f"[skeleton match] {os.path.basename(source)} -> {skeleton.split('.')[0]} ({reason})")
+            matched[source] = skeleton
+        else:
+            unresolved[source] = reason
+    return matched, unresolved
+
+@import_trace.traced("skeleton_match")
+def match_source_skeletons(anim_infos, mesh_infos):
+    """
+    Matches animations to skeletal meshes of the same batch by their preflight bones, for
+    skeletons that only exist once those meshes are imported.
+    Returns ({source: skeletal mesh source}, {source: reason unresolved})
+    """
+    skeleton_index = skeleton_cache.SkeletonIndex({mesh: skeleton_cache.fingerprint(info["bone_names"], info["bone_parents"])
+                                                   for mesh, info in mesh_infos.items() if info and info["bone_names"]})
+    matched, unresolved = dict(), dict()
+    for source, info in anim_infos.items():
+        if info is None:
+            unresolved[source] = "not inspected"
+            continue
+        mesh, reason = skeleton_index.match(info["bone_names"], info["bone_parents"], hint=source)
+        if mesh:
+            unreal.log(f"[skeleton match] {os.path.basename(source)} -> skeleton of {os.path.basename(mesh)} ({reason})")
+            matched[source] = mesh
         else:
-            group[len(bones)].append(skeleton)
+            unresolved[source] = reason
+    return matched, unresolved
+
+@import_trace.traced("validate")
+def validate_skeleton(new_skeletons, root="/Game"):
+    """
+    Compares newly imported skeletons against the fingerprints of every other skeleton in the
+    project. A new skeleton diverges when a related skeleton (same bone count or same bones)
+    has a different hierarchy.
+    Returns "All skeletons are A-OK!" or (warning, {group label: [skeletons]})
+    """
+    unreal.log("In validate_skeleton")
+    content_index = get_content_index(root)
+    cache = get_skeleton_cache()
+    all_skeletons = content_index.object_paths('Skeleton')
+    cache.prune([skeleton.split('.')[0] for skeleton in all_skeletons])
+
+    new_fps = {skeleton: get_skeleton_fingerprint(skeleton, force=True) for skeleton in new_skeletons}
+    new_fps = {skeleton: fp for skeleton, fp in new_fps.items() if fp is not None}
+    known_fps = dict()
+    for skeleton in all_skeletons:
+        if skeleton not in new_fps:
+            fp = get_skeleton_fingerprint(skeleton)
+            if fp is not None:
+                known_fps[skeleton] = fp
+    cache.save()
+
+    # group every skeleton involved in a divergence by hierarchy
+    group = {}
+    for skeleton, fp in new_fps.items():
+        others = list(new_fps.items()) + list(known_fps.items())
+        diverging = [(other, other_fp) for other, other_fp in others
+                     if other != skeleton and skeleton_cache.related(fp, other_fp) and not skeleton_cache.same_hierarchy(fp, other_fp)]
+        if not diverging:
+            # unrelated rigs imported together are fine
+            continue
+        for name, name_fp in [(skeleton, fp)] + diverging:
+            label = f"{name_fp['bone_count']} bones, hierarchy {skeleton_cache.hierarchy_key(name_fp)[:8]}"
+            if name not in group.setdefault(label, []):
+                group[label].append(name)
 
-    # check number of groups. If group > 1, means we have more than one skeleton hierarchy
-    if len(group) > 1:
-        return ("[WARNING] More than one skeleton hierarchy found.", group)
+    # only skeletons with a diverging related skeleton are grouped
+    if group:
+        return ("[WARNING] Skeletons with diverging bone hierarchies found.", group)
     else:
         return "All skeletons are A-OK!"
 
-def asset_import_task(asset_file, mode, destination_path, options):
+# save policies for import tasks
+SAVE_IMMEDIATE = "immediate"  # every task saves its own packages while importing
+SAVE_DEFERRED = "deferred"  # PackageSaver saves everything once the batch ends
+SAVE_EVERY_N = "every_n"  # PackageSaver saves every N imported assets
+SAVE_POLICIES = (SAVE_IMMEDIATE, SAVE_DEFERRED, SAVE_EVERY_N)
+
+def asset_import_task(asset_file, mode, destination_path, options, save_policy=SAVE_IMMEDIATE, destination_name=None):
+    # destination_name: asset to replace when it isn't named after the file (renamed by post-process)
     # task settings
     task = unreal.AssetImportTask()
     task.automated = True
     task.destination_path = destination_path
-    task.filename = asset_file
+    if destination_name:
+        task.destination_name = destination_name
+    # local copy when a source_stage.SourceStager is active
+    task.filename = source_stage.staged(asset_file)
     task.options = options
     if mode == 'replace':
         task.replace_existing = True
     elif mode == 'import':
         task.replace_existing = False
-    task.save = True
+    # deferred policies leave the packages dirty for PackageSaver
+    task.save = save_policy == SAVE_IMMEDIATE
     return task
 
-def skeletal_mesh_import_task(asset_file, mode='import', destination_path=None):
+def skeletal_mesh_import_task(asset_file, mode='import', destination_path=None, preflight=None, save_policy=SAVE_IMMEDIATE, destination_name=None):
+    # preflight: fbx_preflight info of asset_file, raises PreflightError if it is no skeletal mesh
+    if preflight is not None:
+        fbx_preflight.check(preflight, fbx_preflight.SKELETAL_MESH)
+
     # import data
     import_data = unreal.FbxSkeletalMeshImportData()
 
@@ -56,10 +209,15 @@ def skeletal_mesh_import_task(asset_file, mode='import', destination_path=None):
     options.mesh_type_to_import = unreal.FBXImportType.FBXIT_SKELETAL_MESH
     options.skeletal_mesh_import_data = import_data
 
-    task = asset_import_task(asset_file, mode, destination_path, options)
+    task = asset_import_task(asset_file, mode, destination_path, options, save_policy, destination_name)
     return task
 
-def anim_sequence_import_task(asset_file, skeleton=None, mode='import', destination_path=None):
+def anim_sequence_import_task(asset_file, skeleton=None, mode='import', destination_path=None, preflight=None, save_policy=SAVE_IMMEDIATE,
+                              destination_name=None):
+    # preflight: fbx_preflight info of asset_file, raises PreflightError if it holds no animation
+    if preflight is not None:
+        fbx_preflight.check(preflight, fbx_preflight.ANIMATION)
+
     # import data
     import_data = unreal.FbxAnimSequenceImportData()
 
@@ -72,7 +230,7 @@ def anim_sequence_import_task(asset_file, skeleton=None, mode='import', destinat
     options.anim_sequence_import_data = import_data
     options.skeleton = skeleton
     
-    task = asset_import_task(asset_file, mode, destination_path, options)
+    task = asset_import_task(asset_file, mode, destination_path, options, save_policy, destination_name)
     return task
 
 def get_all_assets(path=None):
@@ -80,6 +238,609 @@ def get_all_assets(path=None):
     eal = unreal.EditorAssetLibrary
     return eal.list_assets(path)
 
+def get_asset_registry():
+    return unreal.AssetRegistryHelpers.get_asset_registry()
+
+def asset_class_name(asset_data):
+    # UE5.1+ exposes the class as a top level asset path, older versions as a name
+    class_path = getattr(asset_data, "asset_class_path", None)
+    if class_path is not None:
+        return str(class_path.asset_name)
+    return str(asset_data.asset_class)
+
+class AssetEntry(object):
+    """
+    Registry metadata of a single asset. Built from unreal.AssetData, no object is loaded.
+    """
+    __slots__ = ("object_path", "package_name", "package_path", "asset_name", "asset_class")
+
+    def __init__(self, package_name, asset_name, asset_class):
+        self.package_name = package_name
+        self.package_path = package_name.rsplit('/', 1)[0]
+        self.asset_name = asset_name
+        self.asset_class = asset_class
+        # same format as EditorAssetLibrary.list_assets(), /Game/Path/Asset.Asset
+        self.object_path = f"{package_name}.{asset_name}"
+
+    @classmethod
+    def from_asset_data(cls, asset_data):
+        return cls(str(asset_data.package_name), str(asset_data.asset_name), asset_class_name(asset_data))
+
+    def __repr__(self):
+        return f"AssetEntry({self.asset_class}, {self.object_path})"
+
+class ContentIndex(object):
+    """
+    Persistent in-process index of the content browser.
+    Built once from asset registry metadata and kept up to date incrementally, so callers
+    can query assets by class or by package without listing the whole project again.
+    """
+    def __init__(self, root="/Game"):
+        self.root = root
+        self.by_path = {}   # object path -> AssetEntry
+        self.by_class = {}  # class name -> set of object paths
+        self.by_package = {}  # package name -> set of object paths
+        self.by_folder = {}   # package path -> set of object paths
+        self.is_built = False
+        self.events_bound = False
+
+    @import_trace.traced("scan", "ContentIndex.build")
+    def build(self):
+        self.by_path.clear()
+        for table in self._tables():
+            table.clear()
+        for asset_data in get_asset_registry().get_assets_by_path(self.root, recursive=True):
+            self._add_entry(AssetEntry.from_asset_data(asset_data))
+        import_trace.count("assets_scanned", len(self.by_path))
+        self.is_built = True
+        self._bind_events()
+        unreal.log(f"Content index built: {len(self.by_path)} assets under {self.root}")
+        return self
+
+    def ensure_built(self):
+        if not self.is_built:
+            self.build()
+        return self
+
+    def _in_root(self, package_name):
+        return package_name == self.root or package_name.startswith(self.root + '/')
+
+    def _tables(self):
+        return (self.by_class, self.by_package, self.by_folder)
+
+    @staticmethod
+    def _keys(entry):
+        return (entry.asset_class, entry.package_name, entry.package_path)
+
+    def _add_entry(self, entry):
+        if not self._in_root(entry.package_name):
+            return
+        if entry.object_path in self.by_path:
+            self._remove_entry(entry.object_path)
+        self.by_path[entry.object_path] = entry
+        for table, key in zip(self._tables(), self._keys(entry)):
+            table.setdefault(key, set()).add(entry.object_path)
+
+    def _remove_entry(self, object_path):
+        entry = self.by_path.pop(object_path, None)
+        if entry is None:
+            return None
+        for table, key in zip(self._tables(), self._keys(entry)):
+            paths = table.get(key)
+            if paths is not None:
+                paths.discard(object_path)
+                if not paths:
+                    del table[key]
+        return entry
+
+    # incremental updates
+    def add_asset_data(self, asset_data):
+        self._add_entry(AssetEntry.from_asset_data(asset_data))
+
+    def remove_asset(self, object_path):
+        self._remove_entry(str(object_path))
+
+    def rename_asset(self, old_object_path, asset_data):
+        self._remove_entry(str(old_object_path))
+        self.add_asset_data(asset_data)
+
+    def refresh_assets(self, object_paths):
+        # re-read registry metadata of the given assets, e.g. task.imported_object_paths
+        registry = get_asset_registry()
+        for object_path in object_paths:
+            package_name = str(object_path).split('.')[0]
+            self._remove_package(package_name)
+            for asset_data in registry.get_assets_by_package_name(package_name):
+                self.add_asset_data(asset_data)
+
+    @import_trace.traced("scan", "ContentIndex.refresh_path")
+    def refresh_path(self, path):
+        # re-read one folder (not recursive). Cheap way to pick up assets created as a
+        # side effect of an import (skeletons, physics assets, materials, ...)
+        registry = get_asset_registry()
+        for object_path in list(self.by_folder.get(path, ())):
+            self._remove_entry(object_path)
+        asset_datas = registry.get_assets_by_path(path, recursive=False)
+        for asset_data in asset_datas:
+            self.add_asset_data(asset_data)
+        import_trace.count("assets_scanned", len(asset_datas))
+
+    def _remove_package(self, package_name):
+        for object_path in list(self.by_package.get(package_name, ())):
+            self._remove_entry(object_path)
+
+    def _bind_events(self):
+        if self.events_bound:
+            return
+        # assets created by any import, including imports not started from this tool
+        import_subsystem = unreal.get_editor_subsystem(unreal.ImportSubsystem)
+        if import_subsystem is not None:
+            import_subsystem.on_asset_post_import.add_callable(self._on_asset_post_import)
+        else:
+            unreal.log_warning("Content index: no import subsystem, imports from outside the importer are not tracked")
+        # registry add/remove/rename delegates are only exposed to python on some engine versions
+        registry = get_asset_registry()
+        unbound = list()
+        for name, callback in (("on_asset_added", self.add_asset_data),
+                               ("on_asset_removed", self._on_asset_removed),
+                               ("on_asset_renamed", self._on_asset_renamed)):
+            delegate = getattr(registry, name, None)
+            if delegate is None:
+                unbound.append(name)
+                continue
+            try:
+                delegate.add_callable(callback)
+            except Exception as e:
+                unbound.append(f"{name} ({e})")
+        if unbound:
+            unreal.log_warning(f"Content index: asset registry {', '.join(unbound)} can't be bound on this engine version, "
+                               f"assets added, deleted or renamed outside the importer are only seen after a rebuild")
+        self.events_bound = True
+
+    def _on_asset_post_import(self, factory, created_object):
+        if created_object is not None:
+            self.refresh_assets([created_object.get_path_name()])
+
+    def _on_asset_removed(self, asset_data):
+        self.remove_asset(AssetEntry.from_asset_data(asset_data).object_path)
+
+    def _on_asset_renamed(self, asset_data, old_object_path):
+        self.rename_asset(old_object_path, asset_data)
+
+    # queries
+    def object_paths(self, *asset_classes):
+        # O(k) in the number of matching assets
+        paths = []
+        for asset_class in asset_classes:
+            paths.extend(self.by_class.get(asset_class, ()))
+        return paths
+
+    def entries(self, *asset_classes):
+        return [self.by_path[path] for path in self.object_paths(*asset_classes)]
+
+    def get(self, object_path):
+        return self.by_path.get(str(object_path))
+
+    def __len__(self):
+        return len(self.by_path)
+
+# kept across reload(ue_utils) so the index is only built once per editor session
+_content_indices = globals().get("_content_indices", {})
+
+def get_content_index(root="/Game"):
+    index = _content_indices.get(root)
+    if index is None:
+        index = _content_indices[root] = ContentIndex(root)
+    return index.ensure_built()
+
+# set by shard_import for its workers, a cache folder is used by one process at a time
+SOURCE_CACHE_VARIABLE = "ASSET_IMPORTER_SOURCE_CACHE"
+
+def get_source_cache_folder():
+    # source_stage cache, local copies of sources on network shares
+    return os.environ.get(SOURCE_CACHE_VARIABLE) or os.path.join(unreal.Paths.project_saved_dir(), "AssetImporter", "source_cache")
+
+def get_journal_folder():
+    # import_journal files of the current project
+    return os.path.join(unreal.Paths.project_saved_dir(), "AssetImporter", "journals")
+
+_import_manifests = globals().get("_import_manifests", {})
+
+# set by shard_import for its workers, each one works on a private copy of the manifest
+IMPORT_MANIFEST_VARIABLE = "ASSET_IMPORTER_MANIFEST"
+
+def get_import_manifest(path=None):
+    # import manifest of the current project, Saved/AssetImporter/import_manifest.json
+    if path is None:
+        path = os.environ.get(IMPORT_MANIFEST_VARIABLE) or os.path.join(unreal.Paths.project_saved_dir(), "AssetImporter", "import_manifest.json")
+    manifest = _import_manifests.get(path)
+    if manifest is None:
+        manifest = _import_manifests[path] = import_cache.ImportManifest(path)
+    return manifest
+
+class PackageSaver(object):
+    """
+    Collects the assets of import tasks that don't save themselves (SAVE_DEFERRED,
+    SAVE_EVERY_N) and writes them with one save_loaded_assets call per flush, instead of
+    one save per task inside the import loop.
+    on_saved: callable(object paths) called after every flush
+    """
+    def __init__(self, policy=SAVE_IMMEDIATE, every=50, on_saved=None):
+        if policy not in SAVE_POLICIES:
+            raise ValueError(f"Invalid save policy {policy!r}, expected one of {SAVE_POLICIES}")
+        self.policy = policy
+        self.every = max(1, int(every))
+        self.on_saved = on_saved
+        self.pending = dict()  # object path -> None, in import order
+        self.saved = 0
+        self.flushes = 0
+        self.seconds = 0.0
+
+    def add(self, object_paths):
+        if self.policy == SAVE_IMMEDIATE:
+            return
+        self.pending.update(dict.fromkeys(object_paths))
+        if self.policy == SAVE_EVERY_N and len(self.pending) >= self.every:
+            self.flush()
+
+    def rename(self, old_object_path, new_object_path):
+        if old_object_path in self.pending:
+            del self.pending[old_object_path]
+            self.pending[new_object_path] = None
+
+    @import_trace.traced("save", "PackageSaver.flush")
+    def flush(self):
+        """
+        Saves the pending assets, returns how many were saved.
+        """
+        if not self.pending:
+            return 0
+        started = time.perf_counter()
+        # imported assets are still loaded, this doesn't hit the disk
+        assets = [unreal.load_object(None, object_path) for object_path in self.pending]
+        assets = [asset for asset in assets if asset is not None]
+        import_trace.count("objects_loaded", len(assets))
+        if assets and not unreal.EditorAssetLibrary.save_loaded_assets(assets, True):
+            unreal.log_warning("[save] some packages could not be saved")
+        seconds = time.perf_counter() - started
+        if self.on_saved is not None:
+            self.on_saved(list(self.pending))
+        self.pending.clear()
+        self.saved += len(assets)
+        self.flushes += 1
+        self.seconds += seconds
+        import_trace.count("packages_saved", len(assets))
+        unreal.log(f"[save] {len(assets)} package(s) saved in {seconds:.2f}s")
+        return len(assets)
+
+    def report(self):
+        return {"policy": self.policy, "saved_packages": self.saved, "flushes": self.flushes, "seconds": round(self.seconds, 4)}
+
+def unload_packages(object_paths):
+    """
+    Saves what is still dirty and unloads the packages of the given assets.
+    Returns how many packages were unloaded.
+    """
+    package_names = dict.fromkeys(str(object_path).split('.')[0] for object_path in object_paths)
+    packages = [unreal.find_package(name) for name in package_names]
+    packages = [package for package in packages if package is not None]
+    if packages:
+        # unloading drops unsaved changes (renames with SAVE_IMMEDIATE)
+        unreal.EditorLoadingAndSavingUtils.save_packages(packages, True)
+        unreal.EditorLoadingAndSavingUtils.unload_packages(packages)
+    return len(packages)
+
+MB = 1024 * 1024
+GB = 1024 * MB
+
+class MemoryBudget(object):
+    """
+    Keeps an import under a process memory ceiling. Imported assets are collected per chunk,
+    once a chunk is full (chunk_size imports, or memory above the ceiling) release() saves
+    and unloads its packages and collects garbage. The next chunk is sized from the memory
+    the last chunks took per import and what is left under the ceiling.
+    memory: callable returning the process memory in bytes (import_trace.process_memory),
+    without a reading chunks keep their size
+    """
+    def __init__(self, ceiling, chunk_size=8, min_chunk=1, max_chunk=256, memory=None, headroom=0.9):
+        self.ceiling = ceiling
+        self.chunk_size = max(min_chunk, int(chunk_size))
+        self.min_chunk = min_chunk
+        self.max_chunk = max_chunk
+        self.memory = memory or import_trace.process_memory
+        self.headroom = headroom
+        self.baseline = self.memory()  # after the last release
+        self.peak = self.baseline or 0
+        self.per_import = None  # bytes, running average
+        self.object_paths = list()  # assets of the current chunk
+        self.imports = 0  # imports in the current chunk
+        self.releases = 0
+        self.unloaded = 0
+        self.seconds = 0.0
+
+    def over_ceiling(self):
+        memory = self.memory()
+        if memory is not None:
+            self.peak = max(self.peak, memory)
+        return memory is not None and memory >= self.ceiling
+
+    def full(self):
+        return self.imports >= self.chunk_size or (self.imports > 0 and self.over_ceiling())
+
+    def add(self, object_paths, imports=1):
+        """
+        Adds the assets of finished imports to the chunk. Returns True once the chunk is full.
+        """
+        self.object_paths.extend(object_paths)
+        self.imports += imports
+        return self.full()
+
+    @import_trace.traced("memory", "MemoryBudget.release")
+    def release(self, saver=None):
+        """
+        Saves (saver first, for its bookkeeping), unloads the chunk's packages and collects
+        garbage, then sizes the next chunk.
+        """
+        if not self.object_paths:
+            return 0
+        started = time.perf_counter()
+        before = self.memory()
+        self.peak = max(self.peak, before or 0)
+        if before is not None and self.baseline is not None and self.imports:
+            sample = max(before - self.baseline, 0) / self.imports
+            self.per_import = sample if self.per_import is None else (self.per_import + sample) / 2
+        if saver is not None:
+            saver.flush()
+        unloaded = unload_packages(self.object_paths)
+        unreal.SystemLibrary.collect_garbage()
+        self.baseline = self.memory()
+        import_trace.count("packages_unloaded", unloaded)
+
+        if self.per_import and self.baseline is not None:
+            available = self.ceiling * self.headroom - self.baseline
+            self.chunk_size = min(self.max_chunk, max(self.min_chunk, int(available / max(self.per_import, 1))))
+            if available <= 0:
+                unreal.log_warning(f"[memory] {self.baseline / GB:.1f} GB after unloading, above the {self.ceiling / GB:.1f} GB ceiling")
+        seconds = time.perf_counter() - started
+        self.seconds += seconds
+        self.releases += 1
+        self.unloaded += unloaded
+        if before is not None and self.baseline is not None:
+            unreal.log(f"[memory] unloaded {unloaded} package(s) in {seconds:.2f}s, {before / MB:.0f} MB -> {self.baseline / MB:.0f} MB, "
+                       f"next chunk {self.chunk_size}")
+        self.object_paths = list()
+        self.imports = 0
+        return unloaded
+
+    def report(self):
+        return {"ceiling": self.ceiling, "releases": self.releases, "unloaded_packages": self.unloaded, "seconds": round(self.seconds, 4),
+                "peak": self.peak, "per_import": round(self.per_import) if self.per_import else None, "chunk_size": self.chunk_size}
+
+@import_trace.traced("import")
+def run_import_tasks(tasks, root="/Game", saver=None):
+    """
+    Runs the import tasks and returns the object paths they produced: the tasks'
+    imported object paths plus assets created alongside them (skeleton, physics asset, ...)
+    saver: PackageSaver collecting the produced assets when tasks don't save themselves
+    """
+    content_index = get_content_index(root)
+    folders = {str(task.destination_path) for task in tasks}
+    existing = set()
+    for folder in folders:
+        existing.update(content_index.by_folder.get(folder, ()))
+
+    get_asset_tools().import_asset_tasks(tasks)
+    import_trace.count("assets_imported", len(tasks))
+
+    produced = []
+    for task in tasks:
+        imported = [str(path) for path in task.imported_object_paths]
+        content_index.refresh_assets(imported)
+        produced.extend(imported)
+        source = source_stage.original(task.filename)
+        if source != task.filename:
+            restore_source_file(imported, source)
+    for folder in folders:
+        content_index.refresh_path(folder)
+        produced.extend(content_index.by_folder.get(folder, set()) - existing)
+    # keep order, drop duplicates
+    produced = list(dict.fromkeys(produced))
+    if saver is not None:
+        saver.add(produced)
+    return produced
+
+def restore_source_file(object_paths, source):
+    # imported from a staged copy, reimports have to find the original
+    for object_path in object_paths:
+        asset = unreal.load_object(None, object_path)
+        import_data = asset.get_editor_property("asset_import_data") if asset is not None else None
+        if import_data is not None:
+            import_data.scripted_add_filename(source, 0, "")
+
+ASSET_PREFIX_MAP = {'SkeletalMesh': 'SKM', 'Skeleton': 'SKL', 'PhysicsAsset': 'PA', 'Material': 'M', 'MaterialInstanceConstant': 'MI',
+                    'Texture2D': 'T', 'AnimSequence': 'ANIM'}
+
+@import_trace.traced("post_process")
+def post_process_assets(object_paths, root="/Game", saver=None):
+    """
+    Renames the given assets to the project naming convention (ASSET_PREFIX_MAP).
+    Class and name come from registry metadata, nothing is loaded.
+    Returns the (old object path, new name) renames
+    """
+    content_index = get_content_index(root)
+    renames = list()
+    for asset in object_paths:
+        entry = content_index.get(asset)
+        if entry is None or entry.asset_class not in ASSET_PREFIX_MAP:
+            continue
+        new_name = prefixed_asset_name(entry.asset_name, ASSET_PREFIX_MAP[entry.asset_class])
+        if new_name != entry.asset_name:
+            unreal.log(f"Renaming {entry.asset_name} to {new_name}")
+            renames.append((entry.object_path, new_name))
+    return rename_assets(renames, root, saver)
+
+# characters the engine replaces with '_' when it names an asset after its source file
+INVALID_OBJECT_NAME_CHARACTERS = re.compile(r"""[\s"',./:|&!~@#(){}\[\]=;^%$`*?<>+\\]""")
+
+def source_asset_name(source):
+    # D:/drop/SKM_Hero v2.fbx -> SKM_Hero_v2
+    return INVALID_OBJECT_NAME_CHARACTERS.sub('_', os.path.splitext(os.path.basename(source))[0])
+
+def find_existing_assets(sources, asset_class, destination_path, root="/Game"):
+    """
+    Assets the sources would replace in destination_path, looked up by package path so
+    same-named assets in other folders don't count. Nothing is loaded.
+    Returns {source: existing object path}
+    """
+    content_index = get_content_index(root)
+    destination_path = destination_path.rstrip('/')
+    prefix = ASSET_PREFIX_MAP.get(asset_class)
+    existing = dict()
+    for source in sources:
+        asset_name = source_asset_name(source)
+        # the asset may have been renamed by post-process after its first import
+        names = [asset_name]
+        if prefix:
+            names.append(prefixed_asset_name(asset_name, prefix))
+        for name in names:
+            for object_path in content_index.by_package.get(f"{destination_path}/{name}", ()):
+                if content_index.by_path[object_path].asset_class == asset_class:
+                    existing[source] = object_path
+                    break
+            if source in existing:
+                break
+    return existing
+
+# per-source import actions
+NEW = "new"
+REIMPORT = "reimport"
+SKIP = "skip"
+CACHE_HIT = "cache-hit"
+
+def allowed_actions(plan_entry):
+    if plan_entry["cache_hit"]:
+        return [CACHE_HIT, REIMPORT, SKIP]
+    if plan_entry["existing"]:
+        return [REIMPORT, SKIP]
+    return [NEW, SKIP]
+
+def replaced_asset_name(plan_entry, mode):
+    # name of the existing asset a replace import goes to, it may not be the file's name anymore
+    if mode != 'replace' or not plan_entry.get("existing"):
+        return None
+    return plan_entry["existing"].rsplit('.', 1)[-1]
+
+@import_trace.traced("plan")
+def plan_imports(sources, kind, destination_path, preflight=None, skeletons=None, existing_action=REIMPORT, root="/Game"):
+    """
+    Decides what happens to each source before anything is imported.
+    skeletons: {animation source: skeleton path}, animations without one can't be cache hits yet
+    Returns {source: plan entry}, entry["action"] is one of allowed_actions(entry)
+    """
+    preflight = preflight or dict()
+    asset_class = {fbx_preflight.SKELETAL_MESH: 'SkeletalMesh', fbx_preflight.ANIMATION: 'AnimSequence'}[kind]
+    existing = find_existing_assets(sources, asset_class, destination_path, root)
+    plan = dict()
+    for source in sources:
+        info = preflight.get(source)
+        options = dict()
+        if kind == fbx_preflight.ANIMATION:
+            skeleton = (skeletons or dict()).get(source)
+            options["skeleton"] = skeleton.split('.')[0] if skeleton else None
+        cache_key = import_cache.options_key(kind, destination_path, **options)
+        cache_hit = (kind != fbx_preflight.ANIMATION or options["skeleton"] is not None) and \
+            is_cache_hit(source, cache_key, file_hash=info and info["hash"])
+        entry = {"source": source, "kind": kind, "asset_name": source_asset_name(source),
+                 "destination": (existing.get(source) or f"{destination_path.rstrip('/')}/{source_asset_name(source)}").split('.')[0],
+                 "existing": existing.get(source), "cache_hit": cache_hit, "cache_key": cache_key}
+        if cache_hit:
+            entry["action"] = CACHE_HIT
+        elif entry["existing"]:
+            entry["action"] = existing_action
+        else:
+            entry["action"] = NEW
+        plan[source] = entry
+    return plan
+
+def is_cache_hit(source, key, file_hash=None):
+    """
+    True if source was imported with the same options before, hasn't changed since and
+    its asset still exists. Existence is checked with the asset registry, the content index
+    misses deletions made outside the importer when its registry events can't be bound.
+    """
+    return get_import_manifest().is_unchanged(source, key, file_hash=file_hash, asset_exists=asset_exists)
+
+def record_imports(tasks, cache_keys, file_hashes=None):
+    """
+    Stores finished tasks in the import manifest.
+    cache_keys: {source: options key}, file_hashes: {source: known content hash}
+    """
+    manifest = get_import_manifest()
+    file_hashes = file_hashes or dict()
+    for task in tasks:
+        source = source_stage.original(task.filename)
+        imported_paths = list(task.imported_object_paths)
+        if source in cache_keys and imported_paths:
+            manifest.record(source, cache_keys[source], str(imported_paths[0]), file_hash=file_hashes.get(source))
+    manifest.save()
+
+def prefixed_asset_name(asset_name, prefix):
+    # SK_Hero -> SKM_Hero, Hero -> SKM_Hero
+    if '_' in asset_name:
+        return f"{prefix}_{asset_name.split('_', 1)[1]}"
+    return f"{prefix}_{asset_name}"
+
+def renamed_object_path(object_path, new_name):
+    folder = object_path.split('.')[0].rsplit('/', 1)[0]
+    return f"{folder}/{new_name}.{new_name}"
+
+@import_trace.traced("rename")
+def rename_assets(renames, root="/Game", saver=None):
+    """
+    Renames assets in one AssetTools call.
+    renames: list of (old object path, new asset name), assets stay in their folder
+    saver: PackageSaver whose pending assets follow the renames
+    Returns the renames that happened, the engine reports failures (name taken, ...) for
+    the whole call only.
+    """
+    if not renames:
+        return []
+    rename_data = []
+    for old_object_path, new_name in renames:
+        package_path = old_object_path.split('.')[0].rsplit('/', 1)[0]
+        rename_data.append(unreal.AssetRenameData(
+            old_object_path=unreal.SoftObjectPath(old_object_path),
+            new_object_path=unreal.SoftObjectPath(f"{package_path}/{new_name}.{new_name}"),
+            new_package_path=package_path,
+            new_name=new_name))
+    all_renamed = get_asset_tools().rename_assets(rename_data)
+
+    content_index = get_content_index(root)
+    manifest = get_import_manifest()
+    new_object_paths = list()
+    renamed = list()
+    for old_object_path, new_name in renames:
+        new_object_path = renamed_object_path(old_object_path, new_name)
+        # an existing asset under the new name made it collide, the old one is still there
+        if not all_renamed and (asset_exists(old_object_path) or not asset_exists(new_object_path)):
+            unreal.log_warning(f"Renaming {old_object_path} to {new_name} failed")
+            continue
+        renamed.append((old_object_path, new_name))
+        content_index.remove_asset(old_object_path)
+        manifest.rename_asset(old_object_path, new_object_path)
+        if saver is not None:
+            saver.rename(old_object_path, new_object_path)
+        new_object_paths.append(new_object_path)
+    content_index.refresh_assets(new_object_paths)
+    manifest.save()
+    import_trace.count("assets_renamed", len(renamed))
+    return renamed
+
+def asset_exists(object_path):
+    # registry lookup, nothing is loaded
+    package_name, _, asset_name = str(object_path).partition('.')
+    return any(str(asset_data.asset_name) == asset_name for asset_data in get_asset_registry().get_assets_by_package_name(package_name))
+
 def get_import_options():
     # ideally import options should be a separate config file for more control
     import_config_file = os.path.join(os.path.dirname(__file__), "import_config.yaml")
@@ -0,0 +1,256 @@
+"""
+Watch-folder auto-ingest: imports FBX files dropped into configured source folders.
+
+FolderWatcher polls the folders on a background thread. A file is reported once its size and
+mtime stayed the same for `settle` seconds and it can be opened, so bursts of writes and
+files still being copied are waited out. WatchIngest runs on the editor tick: it collects
+reported files, drops the ones the import manifest already has with the same size and mtime,
+and imports the rest through batch_import.BatchImport once no new file arrived for
+`batch_delay` seconds, one destination per tick. While another import runs in the editor
+(an import trace or source stager is active) files stay pending.
+
+Config (Saved/AssetImporter/watch_folders.json):
+    {
+        "folders": [{"path": "D:/drop/characters", "destination": "/Game/Characters"}],
+        "interval": 1.0,
+        "settle": 2.0,
+        "batch_delay": 1.0,
+        "mode": "replace"
+    }
+"""
+import os
+import json
+import time
+import queue
+import threading
+
+import unreal
+
+import ue_utils
+import source_stage
+import import_trace
+import batch_import
+
+CONFIG_DEFAULTS = {
+    "folders": [],
+    "interval": 1.0,
+    "settle": 2.0,
+    "batch_delay": 1.0,
+    "mode": "replace",
+}
+
+
+def config_path():
+    return os.path.join(unreal.Paths.project_saved_dir(), "AssetImporter", "watch_folders.json")
+
+def load_config(path=None):
+    path = path or config_path()
+    if not os.path.exists(path):
+        return dict(CONFIG_DEFAULTS)
+    with open(path, "r") as f:
+        return dict(CONFIG_DEFAULTS, **json.load(f))
+
+def save_config(config, path=None):
+    path = path or config_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(config, f, indent=2)
+
+
+def _readable(path):
+    # writers on Windows keep the file locked, elsewhere this only fails for unreadable files
+    try:
+        with open(path, "rb"):
+            return True
+    except OSError:
+        return False
+
+
+class FolderWatcher(object):
+    """
+    Polls folders (recursively) on a daemon thread and puts settled new or modified files
+    into `changes`. Never touches unreal, safe off the game thread.
+    """
+    def __init__(self, folders, extensions=(".fbx",), interval=1.0, settle=2.0):
+        self.folders = list(folders)
+        self.extensions = extensions
+        self.interval = interval
+        self.settle = settle
+        self.changes = queue.Queue()
+        self.stamps = dict()  # path -> (size, mtime) last seen
+        self.changed_at = dict()  # path -> time its stamp last changed, until it is reported
+        self.reported = dict()  # path -> (size, mtime) last reported
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="FolderWatcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval * 2)
+            self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                # keep watching, a share can be briefly unreachable
+                print(f"[watch folder] poll failed: {e}")
+            self._stop.wait(self.interval)
+
+    def scan(self):
+        stamps = dict()
+        stack = list(self.folders)
+        while stack:
+            folder = stack.pop()
+            try:
+                entries = list(os.scandir(folder))
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.lower().endswith(self.extensions):
+                        stat = entry.stat()
+                        stamps[entry.path.replace("\\", "/")] = (stat.st_size, stat.st_mtime)
+                except OSError:
+                    continue
+        return stamps
+
+    def poll(self, now=None):
+        now = time.time() if now is None else now
+        stamps = self.scan()
+        for path, stamp in stamps.items():
+            if self.stamps.get(path) != stamp:
+                self.changed_at[path] = now
+        self.stamps = stamps
+        for path in list(self.changed_at):
+            if path not in stamps:
+                del self.changed_at[path]
+                continue
+            if now - self.changed_at[path] < self.settle or not stamps[path][0]:
+                continue
+            if self.reported.get(path) != stamps[path]:
+                if not _readable(path):
+                    # still locked by its writer, closing it may not change its stamp
+                    continue
+                self.reported[path] = stamps[path]
+                self.changes.put(path)
+            del self.changed_at[path]
+
+
+class WatchIngest(object):
+    """
+    Imports what the watchers report, on the editor tick. One watcher per configured folder,
+    each with its own destination.
+    """
+    def __init__(self, config=None, root="/Game"):
+        self.config = dict(CONFIG_DEFAULTS, **(config or load_config()))
+        self.root = root
+        self.watchers = dict()  # FolderWatcher -> destination path
+        for folder in self.config["folders"]:
+            watcher = FolderWatcher([folder["path"]], interval=self.config["interval"], settle=self.config["settle"])
+            self.watchers[watcher] = folder["destination"]
+        self.pending = dict()  # destination -> {source: None}
+        self.last_arrival = 0.0
+        self.reports = list()  # last batch reports
+        self.importing = False
+        self._tick_handle = None
+
+    @property
+    def running(self):
+        return self._tick_handle is not None
+
+    def start(self):
+        if self.running:
+            return
+        for watcher in self.watchers:
+            watcher.start()
+        self._tick_handle = unreal.register_slate_post_tick_callback(self._on_tick)
+        unreal.log(f"[watch folder] watching {', '.join(w.folders[0] for w in self.watchers)}")
+
+    def stop(self):
+        if self._tick_handle is not None:
+            unreal.unregister_slate_post_tick_callback(self._tick_handle)
+            self._tick_handle = None
+        for watcher in self.watchers:
+            watcher.stop()
+        unreal.log("[watch folder] stopped")
+
+    def collect(self):
+        manifest = ue_utils.get_import_manifest()
+        for watcher, destination in self.watchers.items():
+            while True:
+                try:
+                    source = watcher.changes.get_nowait()
+                except queue.Empty:
+                    break
+                # unchanged since its last import, e.g. already there when watching started
+                if manifest.is_stamp_unchanged(source):
+                    continue
+                self.pending.setdefault(destination, dict())[source] = None
+                self.last_arrival = time.time()
+
+    def _on_tick(self, delta_seconds):
+        if self.importing:
+            return
+        self.collect()
+        if self.pending and time.time() - self.last_arrival >= self.config["batch_delay"] and not import_running():
+            self.ingest(limit=1)
+
+    def ingest(self, limit=None):
+        """
+        Imports what is pending, one batch per destination, at most `limit` destinations.
+        """
+        self.importing = True
+        try:
+            for destination in list(self.pending)[:limit]:
+                sources = self.pending.pop(destination)
+                unreal.log(f"[watch folder] importing {len(sources)} file(s) into {destination}")
+                manifest = {"destination": destination, "sources": list(sources), "mode": self.config["mode"]}
+                try:
+                    report = batch_import.BatchImport(manifest, self.root).run()
+                except Exception as e:
+                    unreal.log_error(f"[watch folder] import into {destination} failed: {e}")
+                    continue
+                unreal.log(f"[watch folder] {report['summary']} in {report['seconds']:.1f}s")
+                self.reports = (self.reports + [report])[-20:]
+        finally:
+            self.importing = False
+
+
+def import_running():
+    # an import of the importer window traces and stages until it finishes, its stager and
+    # tracer are not ours to replace
+    return import_trace.active() is not None or source_stage.active() is not None
+
+
+# running service, kept across module reloads so it can still be stopped
+_service = globals().get("_service")
+
+def start(config=None):
+    global _service
+    stop()
+    _service = WatchIngest(config)
+    _service.start()
+    return _service
+
+def stop():
+    global _service
+    if _service is not None:
+        _service.stop()
+        _service = None
+
+def service():
+    return _service